@@ -1,27 +1,49 @@
-import sqlite3
+# Patch before anything else is imported, as gunicorn's eventlet worker does: patching
+# walks every live object to green existing locks, so it has to run on a small heap
+import eventlet
+eventlet.monkey_patch()
+
+# .env before any project module: they read their settings (SECRET_KEY, DATABASE_PATH,
+# RESULT_BACKEND, TRAINING_WORKERS, ...) from the environment at import time
+from dotenv import load_dotenv
+load_dotenv()
+
 import tempfile
-from flask import Flask, jsonify, request
+import time
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
-from createoperations import create_csv_table, create_project_summary_table, createtable
-from auth import login_user, user_signup
+from createoperations import FEATURE_COLUMNS
+from auth import hash_password, login_user, session_user, user_signup
 from forgot_passward import resetpassword
-from werkzeug.security import generate_password_hash
-import random, string, os
-from dotenv import load_dotenv
+import random, string, os, io, json
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from datetime import datetime
-from insertoperations import insert_csv_to_transactions_table
-from qmlmodel import run_qml_model
-
-from flask_socketio import SocketIO
-import threading
-import eventlet
-eventlet.monkey_patch()
-
-# Initialize Flask app and load environment variables
+from ingestjobs import (
+    INGEST_MODES, INGEST_STALE_SEC, UPLOAD_DIR, cancel_ingest_job, count_resumable_ingest_jobs, create_ingest_job,
+    find_ingested_file, get_ingest_job, has_active_ingest, list_resumable_ingest_jobs, run_ingest_job
+)
+from insertoperations import file_fingerprint
+from deleteoperations import delete_project_data
+from scheduler import TrainingScheduler
+from resultstore import create_result_backend
+from readoperations import fetch_best_config, fetch_page, parse_read_args, stream_csv, stream_ndjson
+from projectstats import get_project_stats
+from hyperparameters import DEFAULT_HYPERPARAMETERS, expand_trials, resolve_hyperparameters, validate_sweep_options
+from migrations import migrate
+from offload import run_blocking
+from progressrelay import ProgressRelay, project_room
+from socketqueue import socketio_queue_options
+from telemetry import registry
+
+from flask_socketio import SocketIO, emit, join_room, leave_room
+
+# Initialize Flask app
 app = Flask(__name__)
-load_dotenv()
+
+# Schema setup is a one-time step (`python -m migrations` at release); here it is a
+# single PRAGMA read unless the database is behind
+migrate()
 
 # --- CORS Setup ---
 # Allow only your frontend origin, enable credentials for cookies if needed
@@ -32,15 +54,44 @@ CORS(app, resources={r"/*": {"origins": ["http://localhost:5173"]}}, supports_cr
 def add_cors_headers(response):
     response.headers.add("Access-Control-Allow-Origin", "http://localhost:5173")
     response.headers.add("Access-Control-Allow-Headers", "Content-Type,Authorization")
-    response.headers.add("Access-Control-Allow-Methods", "GET,POST,OPTIONS")
+    response.headers.add("Access-Control-Allow-Methods", "GET,POST,DELETE,OPTIONS")
     response.headers.add("Access-Control-Allow-Credentials", "true")
     return response
 
-# Initialize SocketIO with eventlet support and CORS allowed origins
-socketio = SocketIO(app, cors_allowed_origins=["http://localhost:5173"], async_mode="eventlet")
+# Per-route latency histograms for /metrics
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        registry.observe(
+            "http_request_duration_seconds", time.perf_counter() - start,
+            route=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method, status=response.status_code
+        )
+    return response
 
-# Store task results in memory
-task_results = {}
+# Initialize SocketIO with eventlet support and CORS allowed origins; with several
+# workers, emits are shared through the message queue (see socketqueue.py)
+socketio = SocketIO(
+    app, cors_allowed_origins=["http://localhost:5173"], async_mode="eventlet",
+    **socketio_queue_options()
+)
+
+# Job events reach clients only through the relay: it emits to per-project rooms,
+# coalesces progress and rate-limits it, whichever thread the event came from
+relay = ProgressRelay(
+    lambda event, data, room: socketio.emit(event, data, to=room),
+    start_background_task=socketio.start_background_task,
+    sleep=socketio.sleep
+)
+relay.start()
+
+# Training results per run (SQLite by default, see RESULT_BACKEND)
+result_store = create_result_backend()
 
 # ---------------- Utils ---------------- #
 def generate_temp_password(length=10):
@@ -78,6 +129,11 @@ def hello():
 def health_check():
     return jsonify({"status": "OK"}), 200
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text format: phase spans, route latencies, queue depths, memory high-water marks
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
 
 @app.route("/signup", methods=["POST"])
 def signup():
@@ -105,7 +161,7 @@ def signup():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
-
+@app.route("/login", methods=["POST"])
 def login():
     email = request.form.get("email")
     password = request.form.get("password")
@@ -116,6 +172,13 @@ def login():
     result, code = login_user(email, password)
     return jsonify(result), code
 
+@app.route("/session", methods=["GET"])
+def get_session():
+    # Checks the bearer token from /login by its signature alone (no database lookup)
+    user = session_user(request.headers)
+    if user is None:
+        return jsonify({"status": "error", "message": "Missing, invalid or expired session token"}), 401
+    return jsonify({"status": "success", "user": user}), 200
 
 
 @app.route("/forget_password", methods=["POST"])
@@ -125,7 +188,7 @@ def forget_user_password():
         return jsonify({"status": "error", "message": "Email is required."}), 400
 
     temp_password = generate_temp_password()
-    hashed_password = generate_password_hash(temp_password)
+    hashed_password = hash_password(temp_password)
     result, code = resetpassword(email, hashed_password)
 
     if result.get("status") == "success":
@@ -146,46 +209,176 @@ def upload_csv_simple():
         if file.filename == "":
             return jsonify({"status": "error", "message": "Empty filename"}), 400
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        # mode=append (default) adds new rows; mode=replace swaps the project's data for this file
+        mode = request.form.get("mode", "append")
+        if mode not in INGEST_MODES:
+            return jsonify({"status": "error", "message": f"Unknown mode: {mode}"}), 400
+
+        # Keep the upload on disk until its job completes so a restart can resume it
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, suffix=".csv", delete=False) as tmp:
             file.save(tmp.name)
             tmp_path = tmp.name
-        print(f"Saved temp file at {tmp_path}")
-
-        insert_csv_to_transactions_table(tmp_path, project_name)
-        os.remove(tmp_path)
+        print(f"Saved upload at {tmp_path}")
+
+        # The same file appended again is a no-op; single repeated chunks are skipped at ingest.
+        # Hashing reads the whole upload (~1 s per GB), so it runs off the event loop.
+        file_hash = run_blocking(file_fingerprint, tmp_path)
+        previous = find_ingested_file(project_name, file_hash) if mode == "append" else None
+        if previous is not None:
+            os.remove(tmp_path)
+            return jsonify({
+                "status": "success",
+                "message": f"This file was already ingested into {project_name}",
+                "job_id": previous["job_id"],
+                "duplicate": True
+            }), 200
+
+        job_id, created = create_ingest_job(project_name, tmp_path, file_hash, mode)
+        if not created:
+            os.remove(tmp_path)
+            return jsonify({
+                "status": "success",
+                "message": "This file is already being ingested",
+                "job_id": job_id,
+                "duplicate": True
+            }), 200
+        socketio.start_background_task(background_ingest, job_id)
 
-        return jsonify({"status": "success", "message": "CSV data inserted into transactions table"}), 200
+        return jsonify({
+            "status": "success",
+            "message": "CSV upload queued for ingestion",
+            "job_id": job_id
+        }), 202
 
     except Exception as e:
         print("Error in upload_csv_simple:", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
-# ---------------- Training Task (Threaded) ---------------- #
-def background_train(project_name):
-    try:
-        def progress_callback(event, data):
-            print(f"[{event}] {data}")
-            socketio.emit(event, {"project_name": project_name, **data})
-
-        results = run_qml_model(
-            project_name,
-            include_confusion_matrix=True,
-            progress_callback=progress_callback
-        )
-        task_results[project_name] = results
-        socketio.emit("training_complete", {
+@app.route("/upload_status/<job_id>", methods=["GET"])
+def get_upload_status(job_id):
+    job = get_ingest_job(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    return jsonify({"status": "success", "job": job}), 200
+
+@app.route("/upload_status/<job_id>/cancel", methods=["POST"])
+def cancel_upload(job_id):
+    # Deletes the kept upload; rows already committed stay in the project
+    if cancel_ingest_job(job_id):
+        return jsonify({"status": "success", "job_id": job_id, "message": "Ingest cancelled"}), 200
+    return jsonify({"status": "error", "message": "No queued or running ingest with this job id"}), 404
+
+# ---------------- Ingest Task (Background) ---------------- #
+def background_ingest(job_id):
+    job = get_ingest_job(job_id)
+    room = project_room(job["project_name"]) if job else None
+
+    def progress_callback(event, data):
+        relay.publish(event, {"job_id": job_id, **data}, room=room, key=job_id)
+        socketio.sleep(0)  # let other green threads run between chunks
+
+    result = run_ingest_job(job_id, progress_callback=progress_callback)
+    if result["status"] == "skipped":
+        return  # another worker is running it
+    if result["status"] == "success":
+        relay.publish("ingest_complete", {"job_id": job_id, **result}, room=room)
+    elif result["status"] == "cancelled":
+        relay.publish("ingest_cancelled", {"job_id": job_id, **result}, room=room)
+    else:
+        print("Error in background_ingest:", result["message"])
+        relay.publish("ingest_error", {"job_id": job_id, **result}, room=room)
+
+# ---------------- Training Jobs (Scheduler) ---------------- #
+def handle_training_event(job, event, data):
+    # Trainings and sweeps share this handler; their events are prefixed with job.kind
+    project_name = job.project_name
+    room = project_room(project_name)
+    if event == "telemetry":
+        # The worker's phase timings and memory peaks, sent just before it finishes
+        registry.merge(data, kind=job.kind)
+    elif event == f"{job.kind}_complete":
+        # Only the summary is pushed; the full results (curves, report, trials) are
+        # fetched on demand from /task/<project_name>?run_id=<run_id>
+        result_store.save(project_name, job.job_id, "success", data["results"])
+        relay.publish(event, {
             "project_name": project_name,
             "status": "success",
-            "results": results
-        })
-
-    except Exception as e:
-        task_results[project_name] = {"status": "error", "message": str(e)}
-        socketio.emit("training_error", {
+            "run_id": job.job_id,
+            "summary": data["results"].get("summary"),
+            "result_url": f"/task/{project_name}?run_id={job.job_id}"
+        }, room=room)
+    elif event == "baseline_complete":
+        # The classical baseline finishes long before the circuit. It goes into the job's
+        # own run record right away, still marked running; the final results (or the
+        # error) replace that record and carry the baseline along
+        result_store.save(project_name, job.job_id, "running", {"baseline": data["results"]})
+        relay.publish(event, {
+            "project_name": project_name,
+            "status": "success",
+            "run_id": job.job_id,
+            "summary": data["results"].get("summary"),
+            "result_url": f"/task/{project_name}?run_id={job.job_id}"
+        }, room=room)
+    elif event == "baseline_error":
+        relay.publish(event, {"project_name": project_name, "status": "error", "message": data.get("message")},
+                      room=room)
+    elif event in (f"{job.kind}_error", f"{job.kind}_cancelled"):
+        payload = {"status": "error", "message": data.get("message")}
+        if data.get("baseline"):
+            payload["baseline"] = data["baseline"]
+        result_store.save(project_name, job.job_id, "error", payload)
+        relay.publish(event, {
             "project_name": project_name,
             "status": "error",
-            "message": str(e)
-        })
+            "run_id": job.job_id,
+            "message": data.get("message")
+        }, room=room)
+    elif "trial" in data:
+        # A finished sweep trial is rare and worth delivering as is
+        relay.publish(event, {"project_name": project_name, **data}, room=room)
+    else:
+        relay.publish(event, {"project_name": project_name, **data}, room=room,
+                      key=(job.job_id, data.get("trial_id")))
+
+scheduler = TrainingScheduler(
+    handle_training_event,
+    start_background_task=socketio.start_background_task,
+    sleep=socketio.sleep
+)
+
+def parse_priority(value):
+    # Lower numbers are claimed first (0 before 5, FIFO within a number); missing or empty means 0
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        raise ValueError("priority must be an integer") from None
+
+def submit_training(project_name, priority=0, warm_start=False, preprocess_mode=None, sample_budget=None,
+                    hyperparameters=None, profile=False, baseline=None):
+    options = {"profile": True} if profile else {}
+    if baseline is not None:
+        options["baseline"] = baseline  # otherwise the worker's CLASSICAL_BASELINE applies
+    return scheduler.submit(
+        project_name, priority=priority, warm_start=warm_start, preprocess_mode=preprocess_mode,
+        sample_budget=sample_budget, hyperparameters=hyperparameters, **options
+    )
+
+def queue_depths():
+    training = scheduler.stats()
+    relay_stats = relay.stats()
+    ingest = count_resumable_ingest_jobs()
+    return [
+        ("training_jobs", {"state": "queued"}, training["queued"]),
+        ("training_jobs", {"state": "running"}, training["running"]),
+        ("training_jobs", {"state": "running_here"}, training["running_here"]),
+        ("ingest_jobs", {"state": "queued"}, ingest.get("queued", 0)),
+        ("ingest_jobs", {"state": "running"}, ingest.get("running", 0)),
+        ("relay_events", {"state": "queued"}, relay_stats["queued"]),
+        ("relay_events", {"state": "pending"}, relay_stats["pending"]),
+    ]
+
+registry.register_collector(queue_depths)
 
 @app.route("/train", methods=["GET"])
 def train():
@@ -194,26 +387,135 @@ def train():
         if not project_name:
             return jsonify({"status": "error", "message": "Project name is required"}), 400
 
-        # start training thread (no task_id)
-        thread = threading.Thread(target=background_train, args=(project_name,))
-        thread.start()
+        warm_start = request.args.get("warm_start", "false").lower() in ("1", "true", "yes")
+        # ?priority=<int>: queued jobs with a lower number start first
+        try:
+            priority = parse_priority(request.args.get("priority"))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        preprocess_mode = request.args.get("preprocess_mode") or None
+        sample_budget = request.args.get("sample_budget", type=int)
+        use_best_config = request.args.get("use_best_config", "false").lower() in ("1", "true", "yes")
+        hyperparameters = fetch_best_config(project_name) if use_best_config else None
+        # Any hyperparameter can also be set per run, e.g. n_components=6&n_layers=2&backend=default.qubit
+        overrides = {name: request.args[name] for name in DEFAULT_HYPERPARAMETERS if name in request.args}
+        if overrides:
+            try:
+                hyperparameters = resolve_hyperparameters({**(hyperparameters or {}), **overrides})
+            except ValueError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
+        # Opt-in cProfile capture of this run (see telemetry.PROFILE_DIR)
+        profile = request.args.get("profile", "false").lower() in ("1", "true", "yes")
+        # baseline=false skips the classical baseline that otherwise reports ahead of the circuit
+        baseline = request.args.get("baseline")
+        if baseline is not None:
+            baseline = baseline.lower() in ("1", "true", "yes")
+
+        job, created = submit_training(
+            project_name, priority=priority, warm_start=warm_start, preprocess_mode=preprocess_mode,
+            sample_budget=sample_budget, hyperparameters=hyperparameters, profile=profile, baseline=baseline
+        )
+        if not created:
+            return jsonify({
+                "status": "success",
+                "message": f"A {job.kind} is already {job.status} for {project_name}",
+                "job": job.to_dict()
+            }), 200
 
         return jsonify({
             "status": "success",
-            "message": f"Training started for {project_name}"
+            "message": f"Training queued for {project_name}",
+            "job": job.to_dict()
         }), 202
 
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route("/sweep", methods=["POST"])
+def start_sweep():
+    # Body: {"project_name", "space": {"stepsize": [0.05, 0.1], ...}, "search": "grid"|"random",
+    #        "n_trials", "sample_budget", "preprocess_mode", "priority" (lower starts first)}
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Body must be a JSON object"}), 400
+    project_name = data.get("project_name")
+    if not project_name or not isinstance(project_name, str):
+        return jsonify({"status": "error", "message": "Project name is required"}), 400
+
+    space = data.get("space") or {}
+    search = data.get("search", "grid")
+    n_trials = data.get("n_trials")
+    sample_budget = data.get("sample_budget")
+    preprocess_mode = data.get("preprocess_mode")
+    try:
+        validate_sweep_options(space, search, n_trials, sample_budget, preprocess_mode)
+        trials = expand_trials(space, search, n_trials)
+        priority = parse_priority(data.get("priority"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    job, created = scheduler.submit(
+        project_name,
+        priority=priority,
+        kind="sweep",
+        space=space,
+        search=search,
+        n_trials=n_trials,
+        sample_budget=sample_budget,
+        preprocess_mode=preprocess_mode
+    )
+    if not created:
+        return jsonify({
+            "status": "success",
+            "message": f"A {job.kind} is already {job.status} for {project_name}",
+            "job": job.to_dict()
+        }), 200
+
+    return jsonify({
+        "status": "success",
+        "message": f"Sweep of {len(trials)} trials queued for {project_name}",
+        "job": job.to_dict()
+    }), 202
+
+@app.route("/task/<project_name>/cancel", methods=["POST"])
+def cancel_task(project_name):
+    if scheduler.cancel(project_name):
+        return jsonify({"project_name": project_name, "status": "cancelled"}), 200
+    return jsonify({"status": "error", "message": "No queued or running training for this project"}), 404
+
 @app.route("/task/<project_name>", methods=["GET"])
 def get_task_result(project_name):
-    result = task_results.get(project_name)
-    if result:
-        return jsonify({"project_name": project_name, "status": "done", "result": result})
+    run_id = request.args.get("run_id")
+    job = scheduler.get_job(project_name)
+    if run_id is None and job is not None and job.active:
+        return jsonify({"project_name": project_name, "status": job.status, "job": job.to_dict()})
+
+    run = result_store.get(project_name, run_id)
+    if run:
+        response = {
+            "project_name": project_name,
+            "status": "running" if run["status"] == "running" else "done",
+            "run_id": run["run_id"],
+            "created_at": run["created_at"],
+            "result": run["result"]
+        }
+        if job is not None and job.job_id == run["run_id"]:
+            response["job"] = job.to_dict()
+        return jsonify(response)
+    if run_id is not None:
+        return jsonify({"status": "error", "message": "Unknown run id"}), 404
     else:
         return jsonify({"project_name": project_name, "status": "pending"})
 
+@app.route("/task/<project_name>/runs", methods=["GET"])
+def get_task_runs(project_name):
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit must be an integer"}), 400
+    limit = max(1, min(limit, 100))
+    return jsonify({"project_name": project_name, "runs": result_store.history(project_name, limit)})
+
 @socketio.on("connect")
 def on_connect():
     print("✅ Socket.IO: Client connected")
@@ -222,81 +524,191 @@ def on_connect():
 def on_disconnect():
     print("❌ Socket.IO: Client disconnected")
 
+@socketio.on("join_project")
+def handle_join_project(data):
+    project_name = data.get("project_name")
+    if not project_name:
+        emit("error", {"status": "error", "message": "Missing project_name"})
+        return
+    join_room(project_room(project_name))
+    emit("joined_project", {"project_name": project_name})
+
+@socketio.on("leave_project")
+def handle_leave_project(data):
+    project_name = data.get("project_name")
+    if project_name:
+        leave_room(project_room(project_name))
+
 @socketio.on("start_training")
 def handle_start_training(data):
     project_name = data.get("project_name")
     if not project_name:
-        socketio.emit("training_error", {
+        emit("training_error", {
             "status": "error",
             "message": "Missing project_name"
         })
         return
 
-    print(f"🎬 Starting training for project: {project_name}")
+    try:
+        priority = parse_priority(data.get("priority"))
+    except ValueError as e:
+        emit("training_error", {"status": "error", "message": str(e)})
+        return
 
-    thread = threading.Thread(target=background_train, args=(project_name,))
-    thread.start()
+    # The requester follows its own job without a separate join_project
+    join_room(project_room(project_name))
 
-@app.route("/projects", methods=["GET"])
-def get_all_projects():
+    job, created = submit_training(
+        project_name,
+        priority=priority,
+        warm_start=bool(data.get("warm_start")),
+        preprocess_mode=data.get("preprocess_mode"),
+        sample_budget=data.get("sample_budget")
+    )
+    print(f"🎬 Training {'queued' if created else job.status} for project: {project_name}")
+
+@socketio.on("cancel_training")
+def handle_cancel_training(data):
+    project_name = data.get("project_name")
+    if not project_name or not scheduler.cancel(project_name):
+        emit("training_error", {
+            "project_name": project_name,
+            "status": "error",
+            "message": "No queued or running training for this project"
+        })
+
+def score_transactions(project_name, csv_source=None, records=None, rows=None, columns=None):
+    # Runs via run_blocking: the first call imports the ML stack (pandas, sklearn, PennyLane)
+    # and every call parses, scores and encodes the batch, all off the event loop
+    import pandas as pd
+    from inference import predict_fraud_probabilities, rows_to_features
+
+    if csv_source is not None:
+        records = pd.read_csv(csv_source)
+    elif rows is not None:
+        records = pd.DataFrame(rows, columns=columns or FEATURE_COLUMNS)
+    fingerprint, probs = predict_fraud_probabilities(project_name, rows_to_features(records))
+    return json.dumps({
+        "status": "success",
+        "project_name": project_name,
+        "model_fingerprint": fingerprint,
+        "count": len(probs),
+        "probabilities": probs.tolist(),
+        "predictions": (probs > 0.5).astype(int).tolist()
+    })
+
+def parse_prediction_body(body):
+    # JSON body -> dict; a large batch takes a while to decode, so this runs via run_blocking too
     try:
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
 
-        cursor.execute("SELECT * FROM project_summary ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        conn.close()
+@app.route("/predict", methods=["POST"])
+def predict():
+    try:
+        inputs = {}
+        if request.files.get("file") or request.mimetype == "text/csv":
+            project_name = request.form.get("project_name") or request.args.get("project_name")
+            inputs["csv_source"] = request.files["file"] if request.files.get("file") else io.BytesIO(request.get_data())
+        else:
+            payload = run_blocking(parse_prediction_body, request.get_data())
+            project_name = payload.get("project_name") or request.args.get("project_name")
+            records = payload.get("transactions")
+            if records is None and payload.get("transaction") is not None:
+                records = [payload["transaction"]]
+            if records is not None:
+                inputs["records"] = records
+            elif payload.get("rows") is not None:
+                # Compact form: {"columns": [...], "rows": [[...], ...]} avoids repeating keys
+                inputs["rows"], inputs["columns"] = payload["rows"], payload.get("columns")
 
-        projects = [dict(row) for row in rows]
-        return jsonify({"status": "success", "projects": projects}), 200
+        if not project_name:
+            return jsonify({"status": "error", "message": "Project name is required"}), 400
+        if not inputs:
+            return jsonify({"status": "error", "message": "No transactions provided"}), 400
 
+        body = run_blocking(score_transactions, project_name, **inputs)
+        return Response(body, status=200, mimetype="application/json")
+
+    except LookupError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
-    
 
-@app.route("/view-users", methods=["GET"])
-def view_users():
+# ---------------- Read APIs (paginated / streamed) ---------------- #
+def list_rows_response(table, result_key):
     try:
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM users")
-        rows = cursor.fetchall()
-        conn.close()
+        args = parse_read_args(table, request.args)
+        response_format = request.args.get("format", "json")
+
+        if response_format == "ndjson":
+            return Response(stream_with_context(stream_ndjson(table, **args)), mimetype="application/x-ndjson")
+        if response_format == "csv":
+            return Response(
+                stream_with_context(stream_csv(table, **args)),
+                mimetype="text/csv",
+                headers={"Content-Disposition": f"attachment; filename={table}.csv"}
+            )
+
+        rows, next_cursor = fetch_page(table, **args)
+        return jsonify({"status": "success", result_key: rows, "next_cursor": next_cursor}), 200
+
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-        users = [dict(row) for row in rows]
-        return jsonify({"status": "success", "users": users}), 200
+@app.route("/projects", methods=["GET"])
+def get_all_projects():
+    return list_rows_response("project_summary", "projects")
 
+@app.route("/projects/<project_name>/data", methods=["DELETE"])
+def delete_project_rows(project_name):
+    # Bulk delete of one project's transactions (its model results are kept)
+    if has_active_ingest(project_name):
+        return jsonify({"status": "error", "message": f"An upload is still being ingested for {project_name}"}), 409
+    try:
+        deleted = delete_project_data(project_name)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
+    return jsonify({"status": "success", "message": f"Deleted {deleted} rows", "rows": deleted}), 200
 
+@app.route("/projects/<project_name>/stats", methods=["GET"])
+def get_project_stats_route(project_name):
+    # Row/fraud counts and per-column min/max/mean/variance, maintained at ingest time
+    stats = get_project_stats(project_name)
+    if stats is None:
+        return jsonify({"status": "error", "message": f"No data found for project: {project_name}"}), 404
+    return jsonify({"status": "success", "stats": stats}), 200
 
+@app.route("/view-users", methods=["GET"])
+def view_users():
+    return list_rows_response("users", "users")
 
 @app.route("/view_transactions", methods=["GET"])
 def view_transactions():
-    try:
-        conn = sqlite3.connect("database.db")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Fetch all rows from transactions table
-        cursor.execute("SELECT * FROM transactions")
-        rows = cursor.fetchall()
-        conn.close()
-
-        transactions = [dict(row) for row in rows]
-        return jsonify({"status": "success", "transactions": transactions}), 200
-
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    # ?project_name=&class=&columns=Time,Amount&limit=&cursor=<next_cursor>&format=json|ndjson|csv
+    return list_rows_response("transactions", "transactions")
 
 # ------------- Initialization outside __main__ ------------- #
-# This ensures DB tables are ready on import (for Gunicorn)
-create_csv_table()
-createtable()
-create_project_summary_table()
+# Every worker runs the janitor: uploads interrupted by a crash or restart (or orphaned
+# by a dead worker) resume from their last committed chunk, and the atomic claim in
+# run_ingest_job makes sure only one worker picks each of them up
+def ingest_janitor():
+    while True:
+        try:
+            for pending_job in list_resumable_ingest_jobs():
+                socketio.start_background_task(background_ingest, pending_job["job_id"])
+        except Exception as e:
+            print("❌ Error in ingest janitor:", e)
+        socketio.sleep(INGEST_STALE_SEC)
+
+socketio.start_background_task(ingest_janitor)
+scheduler.start()
 
 # ------------- Run server if executed directly ------------- #
 if __name__ == "__main__":
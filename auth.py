@@ -1,31 +1,183 @@
+import os
+import secrets
 import sqlite3
+import threading
+from collections import deque
 
-from flask import jsonify
-def login_user(email,password):
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import db
+from offload import run_blocking
+
+# Passwords are stored as salted werkzeug hashes ("scrypt:32768:8:1$<salt>$<hash>"). The KDF
+# is slow on purpose (~100 ms), so under eventlet it runs on the OS thread pool
+# (offload.run_blocking): hashlib releases the GIL inside it and the hub keeps serving
+# other requests. At most AUTH_HASH_CONCURRENCY hashes run at once (each scrypt
+# also holds 32 MB); further sign-ins queue in arrival order instead of oversubscribing
+# the CPU.
+#
+# A successful login returns a signed, timestamped session token (itsdangerous) carrying
+# the user's id, name and email; session_user() checks it without touching the database.
+# Every worker must share SECRET_KEY for tokens to be valid across workers and restarts.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+AUTH_HASH_CONCURRENCY = int(os.getenv("AUTH_HASH_CONCURRENCY", str(os.cpu_count() or 2)))
+AUTH_OFFLOAD = os.getenv("AUTH_OFFLOAD", "true").lower() in ("1", "true", "yes")
+SESSION_TOKEN_TTL_SEC = int(os.getenv("SESSION_TOKEN_TTL_SEC", str(7 * 24 * 3600)))
+SECRET_KEY = os.getenv("SECRET_KEY")
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+HASH_PREFIXES = ("scrypt:", "pbkdf2:")
+
+if not SECRET_KEY:
+    # A generated key is per process: with several workers a token would only be accepted
+    # by the worker that issued it
+    if WEB_CONCURRENCY > 1:
+        raise RuntimeError("SECRET_KEY must be set when running more than one worker (WEB_CONCURRENCY > 1)")
+    print("⚠️ SECRET_KEY is not set: session tokens only stay valid in this process")
+    SECRET_KEY = secrets.token_hex(32)
+
+
+class HashSlots:
+    # Counting semaphore that hands a freed slot straight to the longest waiter. A plain
+    # semaphore lets newly arriving sign-ins take it first, which starved some requests
+    # for seconds under load (benchmarks/bench_login). Green under eventlet's patching.
+    def __init__(self, size):
+        self._free = size
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                return self
+            ready = threading.Event()
+            self._waiters.append(ready)
+        try:
+            ready.wait()
+        except BaseException:
+            # Killed while queued: pass on a slot that was already handed over
+            with self._lock:
+                if not ready.is_set():
+                    self._waiters.remove(ready)
+                    raise
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+
+_hash_slots = HashSlots(AUTH_HASH_CONCURRENCY)
+_serializer = URLSafeTimedSerializer(SECRET_KEY, salt="session")
+_missing_user_hash = None
+
+
+def _run_kdf(fn, *args):
+    with _hash_slots:
+        return run_blocking(fn, *args) if AUTH_OFFLOAD else fn(*args)
+
+
+def hash_password(password):
+    return _run_kdf(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(stored_hash, password):
+    return _run_kdf(check_password_hash, stored_hash, password)
+
+
+def missing_user_hash():
+    # Verified against when the email is unknown, so a miss costs as much as a wrong password
+    global _missing_user_hash
+    if _missing_user_hash is None:
+        _missing_user_hash = hash_password(secrets.token_hex(16))
+    return _missing_user_hash
+
+
+def is_password_hash(value):
+    return value.startswith(HASH_PREFIXES) and value.count("$") == 2
+
+
+def issue_session_token(user):
+    return _serializer.dumps({"uid": user["id"], "username": user["username"], "email": user["email"]})
+
+
+def verify_session_token(token):
+    # The token's payload, or None when it is forged, malformed or older than the TTL
+    try:
+        return _serializer.loads(token, max_age=SESSION_TOKEN_TTL_SEC)
+    except (BadSignature, SignatureExpired):
+        return None
+
+
+def session_user(headers):
+    # "Authorization: Bearer <token>" -> payload, or None
+    scheme, _, token = (headers.get("Authorization") or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return verify_session_token(token.strip())
+
+
+def login_user(email, password):
     try:
-        cann=sqlite3.connect('database.db')
-        cursor=cann.cursor()
-        cursor.execute("SELECT * FROM users WHERE email=? AND password=?", (email, password))
-        user = cursor.fetchone()
-        cann.close()
-        if user:
-            return (jsonify({"message": "Login successful!"}), 200)
-        else:
-            return (jsonify({"message": "Invalid email or password!"}), 401)
+        user = db.fetch_one("SELECT id, username, email, password FROM users WHERE email = ? COLLATE NOCASE",
+                            (email.strip(),))
+        valid = verify_password(user["password"] if user else missing_user_hash(), password)
+        if user and valid:
+            return {
+                "status": "success",
+                "message": "Login successful!",
+                "token": issue_session_token(user),
+                "expires_in": SESSION_TOKEN_TTL_SEC,
+                "user": {"id": user["id"], "username": user["username"], "email": user["email"]}
+            }, 200
+        return {"status": "error", "message": "Invalid email or password!"}, 401
     except Exception as e:
         print("Error logging in user:", e)
-        return (jsonify({"message": "Login failed!"}), 500)
-    
+        return {"status": "error", "message": "Login failed!"}, 500
 
 
-def user_signup(username,email,password):
+def user_signup(username, email, password):
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO users (username, email, password) VALUES (?, ?, ?)", (username, email, password))
-        conn.commit()
-        conn.close()
+        db.execute_write("INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+                         (username, email.strip(), hash_password(password)))
         return {"status": "success", "message": "User created successfully!"}, 201
+    except sqlite3.IntegrityError:
+        return {"status": "error", "message": "An account with this email already exists."}, 409
     except Exception as e:
         print("Error signing up user:", e)
-        return ({"message": "User creation failed!"},500)
\ No newline at end of file
+        return {"status": "error", "message": "User creation failed!"}, 500
+
+
+# ---------------- Schema steps (run by migrations) ---------------- #
+def create_users_email_index():
+    # One account per email, compared case-insensitively like the lookups above.
+    # Existing duplicates are left for an operator to resolve rather than deleted here; the
+    # index is skipped until then (`python -m migrations` retries it) and the app still starts.
+    duplicates = db.fetch_all(
+        "SELECT id, email FROM users WHERE email COLLATE NOCASE IN "
+        "(SELECT email FROM users GROUP BY email COLLATE NOCASE HAVING COUNT(*) > 1) ORDER BY email COLLATE NOCASE, id",
+        as_dict=False
+    )
+    if duplicates:
+        print(f"⚠️ Unique email index skipped, {len(duplicates)} accounts share an email (id, email): "
+              f"{[tuple(row) for row in duplicates]}")
+        return
+    with db.transaction() as conn:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email COLLATE NOCASE)")
+
+
+def hash_plaintext_passwords():
+    # Accounts created before hashing stored the password itself
+    rows = db.fetch_all("SELECT id, password FROM users", as_dict=False)
+    plaintext = [(user_id, password) for user_id, password in rows if not is_password_hash(password)]
+    for user_id, password in plaintext:
+        db.execute_write("UPDATE users SET password = ? WHERE id = ?",
+                         (generate_password_hash(password, method=PASSWORD_HASH_METHOD), user_id))
+    if plaintext:
+        print(f"🔐 Hashed {len(plaintext)} plaintext passwords")
@@ -0,0 +1,74 @@
+# Usage: python -m benchmarks.bench_circuit_width [rows] [epochs] [qubit counts, e.g. 2,4,6,8]
+# Accuracy against runtime per circuit width: for each qubit count (= PCA components) and
+# each circuit/backend variant, the same fit_weights loop the training worker runs, with
+# the mean epoch time, the final evaluation time over the test split and the test AUC.
+import sys
+import time
+
+import numpy as np
+from pennylane import numpy as pnp
+
+from benchmarks.synthetic import make_creditcard_frame
+from createoperations import FEATURE_COLUMNS
+from hyperparameters import circuit_options, resolve_hyperparameters, weight_shape
+from metrics import binary_metrics
+from preprocessing import run_preprocessing, validation_subset
+from qmlmodel import fit_weights, make_predictors
+
+VARIANTS = (
+    {"backend": "auto"},
+    {"backend": "lightning.qubit"},
+    {"backend": "default.qubit"},
+    {"backend": "auto", "n_layers": 3},
+    {"backend": "auto", "n_layers": 3, "reupload": True},
+)
+
+
+def measure(data, n_qubits, config):
+    params = resolve_hyperparameters({**config, "n_components": n_qubits})
+    np.random.seed(0)
+    predict_all, loss_fn = make_predictors(n_qubits, backend=params["backend"], **circuit_options(params))
+    shape = weight_shape(n_qubits, params["ansatz"], params["n_layers"])
+    weights = pnp.array(pnp.random.randn(*shape), requires_grad=True)
+
+    start = time.perf_counter()
+    weights, history, _ = fit_weights(data["X_train"], data["y_train"], data["X_val"], data["y_val"], weights,
+                                      params, predict_all, loss_fn)
+    train_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    probs = predict_all(data["X_test"], weights)
+    eval_sec = time.perf_counter() - start
+    return {
+        **{name: params[name] for name in ("backend", "n_layers", "reupload")},
+        "parameters": int(np.prod(shape)),
+        "epoch_sec": round(train_sec / params["epochs"], 4),
+        "eval_sec": round(eval_sec, 4),
+        "eval_rows_per_sec": round(len(probs) / eval_sec),
+        "test_auc": round(binary_metrics(data["y_test"], probs)["auc"], 4),
+    }
+
+
+def run(n_rows=20000, epochs=5, qubit_counts=(2, 4, 6, 8)):
+    frame = make_creditcard_frame(n_rows, fraud_ratio=0.02)
+    X, y = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64), frame["Class"].to_numpy()
+    report = {"rows": n_rows, "epochs": epochs, "widths": {}}
+    for n_qubits in qubit_counts:
+        _, pca, X_train, X_test, y_train, y_test, _ = run_preprocessing(X, y, "memory", n_components=n_qubits)
+        X_val, y_val = validation_subset(X_test, y_test)
+        data = {"X_train": X_train, "y_train": y_train, "X_val": X_val, "y_val": y_val,
+                "X_test": X_test, "y_test": y_test}
+        report["widths"][n_qubits] = {
+            "pca_variance": round(float(pca.explained_variance_ratio_.sum()), 4),
+            "test_rows": len(X_test),
+            "runs": [measure(data, n_qubits, {**variant, "epochs": epochs}) for variant in VARIANTS],
+        }
+        for result in report["widths"][n_qubits]["runs"]:
+            print(n_qubits, result)
+    return report
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(int(args[0]) if args else 20000, int(args[1]) if len(args) > 1 else 5,
+        tuple(int(n) for n in args[2].split(",")) if len(args) > 2 else (2, 4, 6, 8))
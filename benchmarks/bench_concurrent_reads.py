@@ -0,0 +1,97 @@
+# Usage: python -m benchmarks.bench_concurrent_reads [rows] [readers]
+# Measures read latency and "database is locked" failures while a bulk upload is running,
+# for the old per-call sqlite3.connect() path and for the pooled WAL data-access layer.
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import db
+from benchmarks.bench_ingest import legacy_insert
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table
+from insertoperations import insert_csv_to_transactions_table
+
+READ_QUERY = "SELECT COUNT(*), SUM(Class) FROM transactions WHERE project_name = ?"
+# The old layout lives in its own file; legacy_insert writes it and legacy_read reads it
+LEGACY_DB = "legacy.db"
+
+
+def legacy_read():
+    conn = sqlite3.connect(LEGACY_DB)
+    try:
+        return conn.execute(READ_QUERY, ("seed",)).fetchone()
+    finally:
+        conn.close()
+
+
+def pooled_read():
+    return db.fetch_one(READ_QUERY, ("seed",), as_dict=False)
+
+
+def measure(writer, reader, n_readers):
+    latencies, errors = [], []
+    done = threading.Event()
+
+    def read_loop():
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                reader()
+                latencies.append(time.perf_counter() - start)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=read_loop) for _ in range(n_readers)]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    writer()
+    write_sec = time.perf_counter() - start
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "write_sec": round(write_sec, 3),
+        "reads": len(latencies),
+        "reads_per_sec": round(len(latencies) / write_sec, 1),
+        "read_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2) if latencies else None,
+        "read_p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 2) if latencies else None,
+        "read_errors": len(errors),
+    }
+
+
+def run(n_rows=200000, n_readers=4):
+    report = {"rows": n_rows, "readers": n_readers}
+    cwd = os.getcwd()
+    for mode in ("legacy", "pooled"):
+        workdir = tempfile.mkdtemp(prefix=f"bench_reads_{mode}_")
+        os.chdir(workdir)
+        try:
+            csv_path = write_creditcard_csv(os.path.join(workdir, "data.csv"), n_rows)
+            seed_path = write_creditcard_csv(os.path.join(workdir, "seed.csv"), 20000, seed=1)
+            if mode == "legacy":
+                legacy_insert(seed_path, "seed", LEGACY_DB)
+                report[mode] = measure(lambda: legacy_insert(csv_path, "bulk", LEGACY_DB), legacy_read, n_readers)
+            else:
+                create_csv_table()
+                insert_csv_to_transactions_table(seed_path, "seed")
+                report[mode] = measure(
+                    lambda: insert_csv_to_transactions_table(csv_path, "bulk"), pooled_read, n_readers
+                )
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,52 @@
+# Usage: python -m benchmarks.bench_fast_training [rows] [sample_budget]
+# End-to-end run_qml_model time on the full project vs. a stratified sample budget, at two
+# project sizes to show fast mode scaling with the budget rather than the data.
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table, create_project_summary_table
+from insertoperations import insert_csv_to_transactions_table
+
+
+def run(n_rows=200000, sample_budget=4000):
+    workdir = tempfile.mkdtemp(prefix="bench_fast_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        create_csv_table()
+        create_project_summary_table()
+        sizes = (n_rows // 4, n_rows)
+        for size in sizes:
+            insert_csv_to_transactions_table(
+                write_creditcard_csv(os.path.join(workdir, f"{size}.csv"), size, seed=size), f"bench_{size}"
+            )
+        from qmlmodel import run_qml_model
+
+        report = {"sample_budget": sample_budget}
+        for size in sizes:
+            for label, budget in (("full", 0), ("fast", sample_budget)):
+                np.random.seed(0)
+                start = time.perf_counter()
+                summary = run_qml_model(f"bench_{size}", sample_budget=budget)["summary"]
+                report[f"{label}_{size}"] = {
+                    "total_sec": round(time.perf_counter() - start, 2),
+                    "train_size": summary["train_size"],
+                    "validation_size": summary["validation_size"],
+                    "roc_auc": summary["roc_auc"],
+                }
+        print(report)
+        return report
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,67 @@
+# Usage: python -m benchmarks.bench_feature_store [projects] [rows_per_project]
+# Compares loading a project from SQLite (packed rows decoded with np.frombuffer) with the
+# memory-mapped feature store.
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table
+from featurestore import load_project_arrays
+from insertoperations import insert_csv_to_transactions_table
+from transactionstore import load_project_rows
+
+
+def sql_load(project_name):
+    return load_project_rows(project_name)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    X, y = fn(*args)
+    float(X[:, 0].sum()) + float(y.sum())  # touch the data so memory maps are paged in
+    return time.perf_counter() - start
+
+
+def run(n_projects=4, rows_per_project=100000):
+    workdir = tempfile.mkdtemp(prefix="bench_store_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        create_csv_table()
+        for i in range(n_projects):
+            csv_path = write_creditcard_csv(os.path.join(workdir, f"p{i}.csv"), rows_per_project, seed=i)
+            insert_csv_to_transactions_table(csv_path, f"project_{i}")
+
+        target = f"project_{n_projects - 1}"
+        conn = sqlite3.connect("database.db")
+        conn.execute("DROP INDEX idx_transaction_rows_project")
+        conn.commit()
+        unindexed = timed(sql_load, target)
+        conn.execute("CREATE INDEX idx_transaction_rows_project ON transaction_rows (project_id)")
+        conn.commit()
+        conn.close()
+        indexed = timed(sql_load, target)
+        store = timed(load_project_arrays, target)
+
+        report = {
+            "projects": n_projects,
+            "rows_per_project": rows_per_project,
+            "sql_full_scan_sec": round(unindexed, 4),
+            "sql_indexed_sec": round(indexed, 4),
+            "feature_store_sec": round(store, 4),
+            "speedup_vs_full_scan": round(unindexed / store, 1),
+        }
+        print(report)
+        return report
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
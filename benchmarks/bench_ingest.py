@@ -0,0 +1,71 @@
+# Usage: python -m benchmarks.bench_ingest [rows]
+# Runs in a scratch directory so the real database.db is never touched.
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table
+from insertoperations import TRANSACTION_COLUMNS, insert_csv_to_transactions_table
+
+
+def legacy_insert(file_path, project_name, db_path="legacy.db"):
+    # Reference copy of the old iterrows() path into the old column-wise table (in its
+    # own database file), kept only for comparison
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, "
+        + ", ".join(f"{col} REAL" for col in TRANSACTION_COLUMNS) + ")"
+    )
+    for chunk in pd.read_csv(file_path, chunksize=5000):
+        data = []
+        for _, row in chunk.iterrows():
+            data.append((project_name, *[row.get(col, None) for col in TRANSACTION_COLUMNS]))
+        cursor.executemany(
+            f'''INSERT INTO transactions
+            (project_name, {", ".join(TRANSACTION_COLUMNS)})
+            VALUES ({",".join(["?"] * (len(TRANSACTION_COLUMNS) + 1))})''',
+            data
+        )
+        conn.commit()
+    conn.close()
+
+
+def run(n_rows=100000):
+    workdir = tempfile.mkdtemp(prefix="bench_ingest_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        create_csv_table()
+        csv_path = write_creditcard_csv(os.path.join(workdir, "data.csv"), n_rows)
+
+        start = time.perf_counter()
+        legacy_insert(csv_path, "legacy")
+        legacy_rate = n_rows / (time.perf_counter() - start)
+
+        copy_path = shutil.copy(csv_path, os.path.join(workdir, "copy.csv"))
+        result = insert_csv_to_transactions_table(copy_path, "vectorized")
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+
+        report = {
+            "rows": n_rows,
+            "legacy_rows_per_sec": round(legacy_rate, 1),
+            "vectorized_rows_per_sec": result["rows_per_sec"],
+            "speedup": round(result["rows_per_sec"] / legacy_rate, 2),
+        }
+        print(report)
+        return report
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
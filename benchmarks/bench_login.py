@@ -0,0 +1,126 @@
+# Usage: python -m benchmarks.bench_login [requests] [concurrency]
+# Concurrent sign-in load against `python app.py` (eventlet, as deployed) on a throwaway
+# database: `concurrency` clients POST /login for seeded users while a probe keeps
+# requesting /health, once with the password KDF on the thread pool (AUTH_OFFLOAD=true)
+# and once inline on the event loop. Reports login throughput and p50/p99 latency for both
+# routes. Exits non-zero when the offloaded run's /login or /health p99 goes over
+# LOGIN_P99_BUDGET_MS / LOGIN_HEALTH_P99_BUDGET_MS.
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmarks.bench_startup import REPO_DIR
+from benchmarks.bench_workers import free_port
+
+LOGIN_P99_BUDGET_MS = float(os.getenv("LOGIN_P99_BUDGET_MS", "2000"))
+LOGIN_HEALTH_P99_BUDGET_MS = float(os.getenv("LOGIN_HEALTH_P99_BUDGET_MS", "100"))
+USERS = 16
+
+
+def start_server(workdir, offload):
+    port = free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_DIR,
+        "PORT": str(port),
+        "DATABASE_PATH": os.path.join(workdir, "login.db"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "SECRET_KEY": "bench",
+        "AUTH_OFFLOAD": "true" if offload else "false",
+    }
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "app.py")], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if requests.get(url + "/health", timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("app.py did not answer /health within 120s")
+
+
+def percentiles(samples_sec):
+    samples = np.asarray(samples_sec) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 2),
+        "p99_ms": round(float(np.percentile(samples, 99)), 2),
+        "max_ms": round(float(samples.max()), 2),
+    }
+
+
+def measure(url, n_requests, concurrency):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency + 1))
+    for i in range(USERS):
+        session.post(url + "/signup", data={"name": f"user{i}", "email": f"user{i}@bench.test",
+                                            "password": f"secret-{i}"}, timeout=30)
+
+    def login(i):
+        user = i % USERS
+        start = time.perf_counter()
+        response = session.post(url + "/login", data={"email": f"user{user}@bench.test",
+                                                      "password": f"secret-{user}"}, timeout=60)
+        if response.status_code != 200:
+            raise RuntimeError(f"/login returned {response.status_code}")
+        return time.perf_counter() - start
+
+    health, stop = [], threading.Event()
+
+    def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            session.get(url + "/health", timeout=60).raise_for_status()
+            health.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(concurrency) as pool:
+            logins = list(pool.map(login, range(n_requests)))
+    finally:
+        stop.set()
+        prober.join()
+    wall = time.perf_counter() - start
+    return {
+        "logins_per_sec": round(n_requests / wall, 1),
+        "login": percentiles(logins),
+        "health": percentiles(health),
+    }
+
+
+def run(n_requests=200, concurrency=8):
+    report = {"cpu_count": os.cpu_count(), "requests": n_requests, "concurrency": concurrency}
+    for label, offload in (("offloaded", True), ("inline", False)):
+        workdir = tempfile.mkdtemp(prefix="bench_login_")
+        process = None
+        try:
+            process, url = start_server(workdir, offload)
+            report[label] = measure(url, n_requests, concurrency)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(30)
+            shutil.rmtree(workdir, ignore_errors=True)
+    print(report)
+    offloaded = report["offloaded"]
+    return report, (offloaded["login"]["p99_ms"] <= LOGIN_P99_BUDGET_MS
+                    and offloaded["health"]["p99_ms"] <= LOGIN_HEALTH_P99_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    _, within_budget = run(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                           int(sys.argv[2]) if len(sys.argv) > 2 else 8)
+    sys.exit(0 if within_budget else 1)
@@ -0,0 +1,49 @@
+# Usage: python -m benchmarks.bench_metrics [max_rows]
+# Per-epoch metric cost: separate sklearn accuracy/F1/AUC calls vs. one sorted pass in
+# metrics.binary_metrics vs. the histogram approximation, at growing validation sizes.
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+
+from metrics import binary_metrics
+
+
+def sklearn_metrics(y_true, scores):
+    y_pred = (scores > 0.5).astype(int)
+    return accuracy_score(y_true, y_pred), f1_score(y_true, y_pred), roc_auc_score(y_true, scores)
+
+
+def timed(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return round(float(np.median(times)) * 1000, 2)
+
+
+def run(max_rows=1000000):
+    rng = np.random.default_rng(0)
+    report = {}
+    n_rows = 10000
+    while n_rows <= max_rows:
+        y_true = (rng.random(n_rows) < 0.5).astype(np.int64)
+        scores = np.clip(rng.normal(0.45 + 0.1 * y_true, 0.15), 0, 1)
+        exact = binary_metrics(y_true, scores)
+        approx = binary_metrics(y_true, scores, approximate=True)
+        report[n_rows] = {
+            "sklearn_ms": timed(sklearn_metrics, y_true, scores),
+            "single_pass_ms": timed(binary_metrics, y_true, scores),
+            "histogram_ms": timed(lambda: binary_metrics(y_true, scores, approximate=True)),
+            "auc_matches_sklearn": bool(np.isclose(exact["auc"], roc_auc_score(y_true, scores))),
+            "histogram_auc_error": float(abs(approx["auc"] - exact["auc"])),
+        }
+        n_rows *= 10
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,73 @@
+# Usage: python -m benchmarks.bench_predict [requests_per_size]
+# Trains a small project in a scratch directory, then measures /predict latency through
+# the Flask test client for several batch sizes.
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_creditcard_frame, write_creditcard_csv
+from createoperations import FEATURE_COLUMNS
+
+BATCH_SIZES = (1, 100, 1000, 10000)
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 2)
+
+
+def run(requests_per_size=20):
+    workdir = tempfile.mkdtemp(prefix="bench_predict_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app as web
+        from insertoperations import insert_csv_to_transactions_table
+        from qmlmodel import run_qml_model
+
+        insert_csv_to_transactions_table(
+            write_creditcard_csv(os.path.join(workdir, "train.csv"), 2000, fraud_ratio=0.05), "bench"
+        )
+        run_qml_model("bench")
+
+        client = web.app.test_client()
+        frame = make_creditcard_frame(max(BATCH_SIZES), seed=1)[FEATURE_COLUMNS]
+        report = {}
+        for fmt in ("records", "rows", "csv"):
+            for size in BATCH_SIZES:
+                batch = frame.iloc[:size]
+                if fmt == "csv":
+                    request_kwargs = {
+                        "query_string": {"project_name": "bench"},
+                        "data": batch.to_csv(index=False),
+                        "content_type": "text/csv",
+                    }
+                elif fmt == "rows":
+                    request_kwargs = {"json": {"project_name": "bench", "rows": batch.values.tolist()}}
+                else:
+                    request_kwargs = {"json": {"project_name": "bench", "transactions": batch.to_dict("records")}}
+
+                client.post("/predict", **request_kwargs)  # first call loads the model into the cache
+                latencies = []
+                for _ in range(requests_per_size):
+                    start = time.perf_counter()
+                    response = client.post("/predict", **request_kwargs)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.json
+                report[f"{fmt}_batch_{size}"] = {
+                    "p50_ms": percentile_ms(latencies, 50),
+                    "p99_ms": percentile_ms(latencies, 99),
+                    "rows_per_sec": round(size * len(latencies) / sum(latencies), 1),
+                }
+        print(report)
+        return report
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,45 @@
+# Usage: python -m benchmarks.bench_preprocessing [rows] [chunk_rows]
+# Compares peak memory and throughput of in-memory and streaming preprocessing on the
+# memory-mapped feature store of one project. Peak memory is traced (tracemalloc) here only.
+import os
+import shutil
+import sys
+import tempfile
+
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table
+from featurestore import load_project_arrays
+from insertoperations import insert_csv_to_transactions_table
+from preprocessing import PREPROCESS_CHUNK_ROWS, run_preprocessing
+
+
+def run(n_rows=500000, chunk_rows=PREPROCESS_CHUNK_ROWS):
+    workdir = tempfile.mkdtemp(prefix="bench_preprocess_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        create_csv_table()
+        insert_csv_to_transactions_table(write_creditcard_csv(os.path.join(workdir, "data.csv"), n_rows), "bench")
+        X, y = load_project_arrays("bench")
+
+        report = {"rows": n_rows, "raw_data_mb": round(X.nbytes / 1e6, 1)}
+        for mode in ("memory", "streaming"):
+            *_, X_train, X_test, y_train, y_test, stats = run_preprocessing(X, y, mode, chunk_rows, trace_memory=True)
+            report[mode] = {
+                "duration_sec": stats["duration_sec"],
+                "rows_per_sec": stats["rows_per_sec"],
+                "peak_mem_mb": stats["peak_mem_mb"],
+                "train_size": len(X_train),
+                "test_fraud_ratio": round(float(y_test.mean()), 3),
+            }
+        report["peak_mem_ratio"] = round(report["memory"]["peak_mem_mb"] / report["streaming"]["peak_mem_mb"], 1)
+        print(report)
+        return report
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,105 @@
+# Usage: python -m benchmarks.bench_startup [runs]
+# Cold-start budget check for the web process, against a throwaway database:
+#   import       wall time of `import app` in a fresh interpreter (schema already migrated),
+#                plus which heavy ML modules that import dragged in (should be none)
+#   first byte   from spawning `python app.py` until GET /health answers 200
+#   migration    `python -m migrations` on an empty database
+# Exits non-zero when a median goes over STARTUP_IMPORT_BUDGET_SEC / STARTUP_FIRST_BYTE_BUDGET_SEC.
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import requests
+
+from benchmarks.bench_workers import free_port
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_SEC = float(os.getenv("STARTUP_IMPORT_BUDGET_SEC", "1.5"))
+FIRST_BYTE_BUDGET_SEC = float(os.getenv("STARTUP_FIRST_BYTE_BUDGET_SEC", "3.0"))
+HEAVY_MODULES = ("pennylane", "sklearn", "imblearn", "pandas", "scipy")
+
+IMPORT_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app\n"
+    "elapsed = time.perf_counter() - start\n"
+    f"print(elapsed, ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+)
+
+
+def environment(workdir):
+    return {
+        **os.environ,
+        "PYTHONPATH": REPO_DIR,
+        "DATABASE_PATH": os.path.join(workdir, "startup.db"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+    }
+
+
+def time_migration(workdir):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "migrations"], cwd=workdir, env=environment(workdir), check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def time_import(workdir):
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=workdir, env=environment(workdir),
+                            check=True, capture_output=True, text=True).stdout.strip().splitlines()[-1]
+    elapsed, _, heavy = output.partition(" ")
+    return float(elapsed), [m for m in heavy.split(",") if m]
+
+
+def time_first_byte(workdir):
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "app.py")], cwd=workdir,
+                               env={**environment(workdir), "PORT": str(port)},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + 120
+        while time.perf_counter() < deadline:
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                    return time.perf_counter() - start
+            except requests.RequestException:
+                time.sleep(0.02)
+        raise RuntimeError("app.py did not answer /health within 120s")
+    finally:
+        process.terminate()
+        process.wait(30)
+
+
+def run(runs=5):
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        migration = time_migration(workdir)
+        imports = [time_import(workdir) for _ in range(runs)]
+        first_bytes = [time_first_byte(workdir) for _ in range(runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    heavy = sorted({m for _, loaded in imports for m in loaded})
+    report = {
+        "migration_sec": round(migration, 3),
+        "import_sec": round(float(np.median([t for t, _ in imports])), 3),
+        "first_byte_sec": round(float(np.median(first_bytes)), 3),
+        "heavy_modules_on_import": heavy,
+        "budgets": {"import_sec": IMPORT_BUDGET_SEC, "first_byte_sec": FIRST_BYTE_BUDGET_SEC},
+    }
+    print(report)
+    over = report["import_sec"] > IMPORT_BUDGET_SEC or report["first_byte_sec"] > FIRST_BYTE_BUDGET_SEC
+    if over or heavy:
+        print("❌ Startup budget exceeded")
+        return report, False
+    print("✅ Startup within budget")
+    return report, True
+
+
+if __name__ == "__main__":
+    _, ok = run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,117 @@
+# Usage: python -m benchmarks.bench_storage [rows]
+# Column-wise transactions table (31 REAL columns + project_name per row, the layout before
+# packed storage) against packed transaction_rows (float32 blob + project id), each in its
+# own scratch database: bytes on disk per row, insert rows/sec with the same parsed chunks,
+# and the time to load one project back into NumPy.
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import FEATURE_COLUMNS, TRANSACTION_COLUMNS
+from insertoperations import INGEST_CHUNK_ROWS, chunk_to_columns
+from transactionstore import iter_project_blocks, pack_features
+
+PROJECT = "bench"
+
+COLUMN_SCHEMA = (
+    "CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT, "
+    + ", ".join(f"{col} REAL" for col in FEATURE_COLUMNS) + ", Class INTEGER)"
+)
+PACKED_SCHEMA = (
+    "CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL)",
+    "CREATE TABLE transaction_rows (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER NOT NULL, "
+    "Class INTEGER, features BLOB NOT NULL)",
+    "CREATE VIEW transactions AS SELECT r.id AS id, p.name AS project_name, r.Class AS Class, "
+    "r.features AS features FROM transaction_rows r JOIN projects p ON p.id = r.project_id",
+)
+
+
+def chunks(csv_path):
+    return [chunk_to_columns(chunk) for chunk in pd.read_csv(csv_path, usecols=TRANSACTION_COLUMNS,
+                                                             dtype=np.float64, chunksize=INGEST_CHUNK_ROWS)]
+
+
+def insert_columns(conn, parsed):
+    sql = (f"INSERT INTO transactions (project_name, {', '.join(TRANSACTION_COLUMNS)}) "
+           f"VALUES ({', '.join(['?'] * (len(TRANSACTION_COLUMNS) + 1))})")
+    for features, labels in parsed:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(sql, zip([PROJECT] * len(labels), *features.tolist(), labels.tolist()))
+        conn.execute("COMMIT")
+
+
+def insert_packed(conn, parsed):
+    conn.execute("INSERT INTO projects (name) VALUES (?)", (PROJECT,))
+    for features, labels in parsed:
+        conn.execute("BEGIN IMMEDIATE")
+        _, blobs = pack_features(features)
+        conn.executemany("INSERT INTO transaction_rows (project_id, Class, features) VALUES (1, ?, ?)",
+                         zip(labels.tolist(), blobs))
+        conn.execute("COMMIT")
+
+
+def load_columns(conn):
+    rows = conn.execute(
+        f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions WHERE project_name = ?", (PROJECT,)
+    ).fetchall()
+    block = np.array(rows, dtype=np.float64)
+    return block[:, :-1], block[:, -1]
+
+
+def load_packed(conn):
+    blocks = list(iter_project_blocks(conn, PROJECT, INGEST_CHUNK_ROWS))
+    return np.concatenate([X for X, _ in blocks]), np.concatenate([y for _, y in blocks])
+
+
+def measure(path, schema, insert, load, parsed, n_rows, index_sql):
+    conn = db.connect(path)
+    for statement in schema:
+        conn.execute(statement)
+    conn.execute(index_sql)
+    start = time.perf_counter()
+    insert(conn, parsed)
+    insert_sec = time.perf_counter() - start
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(path)
+
+    start = time.perf_counter()
+    X, y = load(conn)
+    load_sec = time.perf_counter() - start
+    conn.close()
+    assert X.shape == (n_rows, len(FEATURE_COLUMNS))
+    return {
+        "bytes_per_row": round(size / n_rows, 1),
+        "db_bytes": size,
+        "insert_rows_per_sec": round(n_rows / insert_sec),
+        "load_sec": round(load_sec, 4),
+    }
+
+
+def run(n_rows=200000):
+    workdir = tempfile.mkdtemp(prefix="bench_storage_")
+    try:
+        parsed = chunks(write_creditcard_csv(os.path.join(workdir, "data.csv"), n_rows))
+        report = {
+            "rows": n_rows,
+            "columns": measure(os.path.join(workdir, "columns.db"), (COLUMN_SCHEMA,), insert_columns, load_columns,
+                               parsed, n_rows, "CREATE INDEX idx_project ON transactions (project_name)"),
+            "packed": measure(os.path.join(workdir, "packed.db"), PACKED_SCHEMA, insert_packed, load_packed,
+                              parsed, n_rows, "CREATE INDEX idx_project ON transaction_rows (project_id)"),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    for metric in ("bytes_per_row", "insert_rows_per_sec", "load_sec"):
+        report[f"{metric}_ratio"] = round(report["packed"][metric] / report["columns"][metric], 2)
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,249 @@
+# Usage: python -m benchmarks.bench_suite [--sizes 10000,50000] [--fraud-ratios 0.0017,0.01,0.1]
+#                                         [--epochs 3] [--requests 200] [--output PATH] [--compare PATH]
+# End-to-end regression suite. For every size x imbalance ratio it generates a synthetic
+# creditcard-schema CSV and measures:
+#   ingest    insert_csv_to_transactions_table rows/sec
+#   training  load, SMOTE, scale, PCA, per-epoch circuit time and final evaluation,
+#             timed separately with the same building blocks run_qml_model uses
+#   http      latency percentiles of the read routes through the Flask test client
+# Results (plus commit and machine info) are written as JSON, by default to
+# benchmark_results/<commit>.json; --compare prints the change against an earlier file.
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table, create_project_summary_table
+from insertoperations import insert_csv_to_transactions_table
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmark_results")
+HTTP_ROUTES = (
+    "/health",
+    "/projects",
+    "/view_transactions?project_name={project}&limit=100",
+    "/view_transactions?project_name={project}&limit=1000&format=ndjson",
+    "/task/{project}/runs",
+)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentiles(samples_sec):
+    samples = np.asarray(samples_sec) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p90_ms": round(float(np.percentile(samples, 90)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, round(time.perf_counter() - start, 4)
+
+
+def bench_ingest(csv_path, project_name, n_rows):
+    result, duration = timed(insert_csv_to_transactions_table, csv_path, project_name)
+    if result["status"] != "success":
+        raise RuntimeError(result["message"])
+    return {"duration_sec": duration, "rows_per_sec": round(n_rows / duration)}
+
+
+def bench_training(project_name, epochs):
+    from pennylane import numpy as pnp
+
+    from metrics import binary_metrics
+    from preprocessing import N_COMPONENTS, _oversample, _split
+    from qmlmodel import fit_weights, load_training_arrays, make_predictors, resolve_hyperparameters, weight_shape
+
+    np.random.seed(0)
+    phases = {}
+    (X, y), phases["load_sec"] = timed(load_training_arrays, project_name)
+    (X_res, y_res), phases["smote_sec"] = timed(_oversample, X, y)
+    X_scaled, phases["scale_sec"] = timed(StandardScaler().fit_transform, X_res)
+    pca = PCA(n_components=N_COMPONENTS)
+    X_pca, phases["pca_sec"] = timed(pca.fit_transform, X_scaled)
+    X_train, X_test, y_train, y_test = _split(X_pca, y_res)
+
+    params = resolve_hyperparameters({"epochs": epochs})
+    n_qubits = pca.n_components_
+    (predict_all, loss_fn), phases["circuit_build_sec"] = timed(make_predictors, n_qubits, params["ansatz"])
+    weights = pnp.array(pnp.random.randn(*weight_shape(n_qubits, params["ansatz"], params["n_layers"])),
+                        requires_grad=True)
+
+    epoch_times, last = [], [time.perf_counter()]
+
+    def on_epoch(epoch, metrics):
+        now = time.perf_counter()
+        epoch_times.append(now - last[0])
+        last[0] = now
+
+    weights, history, _ = fit_weights(X_train, y_train, X_test, y_test, weights, params, predict_all, loss_fn,
+                                      on_epoch)
+    # Each epoch is one minibatch gradient step plus scoring the validation (here: test) split
+    phases["epoch_sec"] = {
+        "mean": round(float(np.mean(epoch_times)), 4),
+        "first": round(epoch_times[0], 4),
+        "min": round(float(np.min(epoch_times)), 4),
+    }
+
+    def evaluate():
+        return binary_metrics(y_test, predict_all(X_test, weights), include_roc=True)
+
+    final, phases["eval_sec"] = timed(evaluate)
+    phases["train_rows"] = len(X_train)
+    phases["test_rows"] = len(X_test)
+    phases["auc"] = round(final["auc"], 4)
+    return phases
+
+
+def measure_http(project_name, n_requests):
+    # Runs in the child process started by bench_http: importing app.py monkey-patches the
+    # process for eventlet and starts its background tasks, which must not outlive the
+    # scratch directory
+    import app as webapp
+
+    client = webapp.app.test_client()
+    report = {}
+    for route in HTTP_ROUTES:
+        path = route.format(project=project_name)
+        with client.get(path) as response:
+            response.get_data()  # warm caches and the connection pool
+        latencies = []
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            with client.get(path) as response:
+                response.get_data()  # streamed routes only do their work while the body is read
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 500:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        report[route] = {"requests": n_requests, **percentiles(latencies)}
+    return report
+
+
+def bench_http(project_name, n_requests, workdir):
+    output = os.path.join(workdir, "http.json")
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_suite", "--http-project", project_name,
+         "--requests", str(n_requests), "--output", output],
+        cwd=workdir, env={**os.environ, "PYTHONPATH": REPO_DIR}, check=True
+    )
+    with open(output) as f:
+        return json.load(f)
+
+
+def flatten(report, prefix=""):
+    flat = {}
+    for name, value in report.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, key + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[key] = value
+    return flat
+
+
+def compare(old, new):
+    # Relative change for every numeric metric present in both runs
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    print(f"📊 {old['commit']} -> {new['commit']}")
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"  {key}: {before} -> {after} ({change})")
+
+
+def run(sizes=(10000, 50000), fraud_ratios=(0.0017, 0.01, 0.1), epochs=3, n_requests=200, output=None):
+    commit = git_commit()
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    results = {"ingest": {}, "training": {}}
+    try:
+        create_csv_table()
+        create_project_summary_table()
+        projects = []
+        for n_rows in sizes:
+            for ratio in fraud_ratios:
+                name = f"bench_{n_rows}_{ratio}"
+                csv_path = write_creditcard_csv(os.path.join(workdir, f"{name}.csv"), n_rows, ratio, seed=n_rows)
+                results["ingest"][name] = {"rows": n_rows, "fraud_ratio": ratio,
+                                           **bench_ingest(csv_path, name, n_rows)}
+                print(f"📥 {name}: {results['ingest'][name]['rows_per_sec']} rows/s")
+                results["training"][name] = bench_training(name, epochs)
+                print(f"🧠 {name}: {results['training'][name]}")
+                projects.append(name)
+        results["http"] = bench_http(projects[-1], n_requests, workdir)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {"sizes": list(sizes), "fraud_ratios": list(fraud_ratios), "epochs": epochs,
+                   "requests": n_requests},
+        "results": results,
+    }
+    output = output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Benchmark results written to {output}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,50000")
+    parser.add_argument("--fraud-ratios", default="0.0017,0.01,0.1")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--http-project", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.http_project:
+        with open(args.output, "w") as f:
+            json.dump(measure_http(args.http_project, args.requests), f)
+        return
+
+    report = run(
+        tuple(int(n) for n in args.sizes.split(",")),
+        tuple(float(r) for r in args.fraud_ratios.split(",")),
+        args.epochs, args.requests, args.output
+    )
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+# Usage: python -m benchmarks.bench_training_epoch [rows]
+# Times run_qml_model per epoch in per-sample and batched execution on the same seed.
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import write_creditcard_csv
+from createoperations import create_csv_table, create_project_summary_table
+from insertoperations import insert_csv_to_transactions_table
+
+
+def run(n_rows=3000):
+    workdir = tempfile.mkdtemp(prefix="bench_epoch_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        create_csv_table()
+        create_project_summary_table()
+        insert_csv_to_transactions_table(
+            write_creditcard_csv(os.path.join(workdir, "data.csv"), n_rows, fraud_ratio=0.05), "bench"
+        )
+        from qmlmodel import run_qml_model
+
+        report = {"rows": n_rows}
+        curves = {}
+        for mode, batched in (("per_sample", False), ("batched", True)):
+            epoch_times = []
+
+            def on_progress(event, data):
+                if "duration_sec" in data:
+                    epoch_times.append(data["duration_sec"])
+
+            np.random.seed(0)
+            start = time.perf_counter()
+            results = run_qml_model("bench", progress_callback=on_progress, batched=batched)
+            report[f"{mode}_total_sec"] = round(time.perf_counter() - start, 3)
+            report[f"{mode}_median_epoch_sec"] = float(np.median(epoch_times))
+            curves[mode] = results["charts"]["loss_curve"]
+
+        report["speedup_per_epoch"] = round(
+            report["per_sample_median_epoch_sec"] / max(report["batched_median_epoch_sec"], 1e-3), 1
+        )
+        report["loss_curves_match"] = bool(np.allclose(curves["per_sample"], curves["batched"]))
+        print(report)
+        return report
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,101 @@
+# Usage: python -m benchmarks.bench_workers [workers,...] [requests] [concurrency]
+# Starts the app under gunicorn (eventlet workers, WEB_CONCURRENCY=N, SQLite message queue)
+# against a throwaway database and measures GET throughput and latency at each worker
+# count. Throughput can only scale up to the number of CPU cores on the machine.
+# BENCH_WORKER_CLASS overrides the worker class (gunicorn >= 24 no longer ships eventlet;
+# "sync" still measures how plain HTTP throughput scales with processes).
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+ROUTES = ("/health", "/projects")
+WORKER_CLASS = os.getenv("BENCH_WORKER_CLASS", "eventlet")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, workdir):
+    port = free_port()
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "DATABASE_PATH": os.path.join(workdir, "bench.db"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "SECRET_KEY": "bench",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "--worker-class", WORKER_CLASS, "--workers", str(workers),
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if requests.get(url + "/health", timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"gunicorn with {workers} workers did not come up")
+
+
+def load(url, n_requests, concurrency):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def one(i):
+        start = time.perf_counter()
+        session.get(url + ROUTES[i % len(ROUTES)], timeout=30).raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = np.array(list(pool.map(one, range(n_requests))))
+    wall = time.perf_counter() - start
+    return {
+        "requests_per_sec": round(n_requests / wall, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+    }
+
+
+def run(worker_counts=(1, 2, 4), n_requests=2000, concurrency=32):
+    report = {"cpu_count": os.cpu_count(), "worker_class": WORKER_CLASS}
+    for workers in worker_counts:
+        workdir = tempfile.mkdtemp(prefix="bench_workers_")
+        process = None
+        try:
+            process, url = start_server(workers, workdir)
+            load(url, min(200, n_requests), concurrency)  # warm up every worker
+            report[workers] = load(url, n_requests, concurrency)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(30)
+            shutil.rmtree(workdir, ignore_errors=True)
+    base = report[worker_counts[0]]["requests_per_sec"]
+    for workers in worker_counts:
+        report[workers]["speedup"] = round(report[workers]["requests_per_sec"] / base, 2)
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    run(
+        tuple(int(n) for n in sys.argv[1].split(",")) if len(sys.argv) > 1 else (1, 2, 4),
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 32,
+    )
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from insertoperations import TRANSACTION_COLUMNS
+
+
+def make_creditcard_frame(n_rows, fraud_ratio=0.0017, seed=0):
+    # Same schema as the Kaggle creditcard dump: Time, V1-V28, Amount, Class
+    rng = np.random.default_rng(seed)
+    data = {"Time": np.sort(rng.uniform(0, 172792, n_rows))}
+    y = (rng.random(n_rows) < fraud_ratio).astype(np.int64)
+    shift = y[:, None] * rng.normal(0, 2, 28)[None, :]
+    v = rng.normal(0, 1, (n_rows, 28)) + shift
+    for i in range(28):
+        data[f"V{i + 1}"] = v[:, i]
+    data["Amount"] = np.round(rng.exponential(88.0, n_rows), 2)
+    data["Class"] = y
+    return pd.DataFrame(data, columns=TRANSACTION_COLUMNS)
+
+
+def write_creditcard_csv(path, n_rows, fraud_ratio=0.0017, seed=0):
+    make_creditcard_frame(n_rows, fraud_ratio, seed).to_csv(path, index=False)
+    return path
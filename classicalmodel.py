@@ -0,0 +1,81 @@
+import time
+import numpy as np
+from pennylane import numpy as pnp
+
+from hyperparameters import resolve_hyperparameters
+from insertoperations import save_baseline_summary
+from qmlmodel import build_results, final_metrics, fit_weights, load_training_arrays, prepare_training_data
+
+# Classical baseline: logistic regression on the same cached scaler/PCA features as the
+# quantum model, trained by the same fit_weights loop (so the same curves, metrics and
+# results format) with large minibatches. It finishes in seconds and runs ahead of the
+# circuit, so a project has results while the quantum training is still going.
+BASELINE_MODEL = "logistic_regression"
+BASELINE_HYPERPARAMETERS = {
+    "epochs": 60,
+    "stepsize": 0.1,
+    "batch_size": 2048,
+    "optimizer": "adam",
+}
+
+
+def make_linear_predictors():
+    # weights: (n_features + 1,), the last entry is the bias
+    def predict_all(X, weights):
+        z = np.asarray(X) @ np.asarray(weights)[:-1] + float(weights[-1])
+        return np.exp(-np.logaddexp(0, -z))  # sigmoid without overflow
+
+    def loss_fn(X, y, weights):
+        z = pnp.dot(X, weights[:-1]) + weights[-1]
+        return pnp.mean(pnp.logaddexp(0, z) - y * z)  # log-loss on the logits
+
+    return predict_all, loss_fn
+
+
+def run_classical_model(project_name, include_confusion_matrix=False, preprocess_mode=None, sample_budget=None,
+                        hyperparameters=None):
+    # Same sampling and preprocessing arguments as run_qml_model, so both share one cached
+    # pipeline; only n_components is taken from the quantum hyperparameters
+    n_components = resolve_hyperparameters(hyperparameters)["n_components"]
+    params = {**BASELINE_HYPERPARAMETERS, "n_components": n_components}
+    X, y = load_training_arrays(project_name)
+    total_samples = len(y)
+    fraud_count = int(np.nansum(y))
+
+    data = prepare_training_data(project_name, X, y, preprocess_mode, sample_budget, n_components)
+    predict_all, loss_fn = make_linear_predictors()
+    weights = pnp.zeros(data["X_train"].shape[1] + 1, requires_grad=True)
+
+    # Minibatches come from the global RNG; restoring it afterwards keeps the quantum run
+    # that follows identical to one without a baseline
+    rng_state = np.random.get_state()
+    training_start = time.time()
+    try:
+        weights, history, y_val_probs = fit_weights(
+            data["X_train"], data["y_train"], data["X_val"], data["y_val"], weights, params, predict_all, loss_fn
+        )
+    finally:
+        np.random.set_state(rng_state)
+    training_sec = time.time() - training_start
+
+    final = final_metrics(data, predict_all, weights, y_val_probs)
+    results = build_results(project_name, total_samples, data, final, history, include_confusion_matrix, {
+        "model": BASELINE_MODEL,
+        "pca_variance": data["pca"].explained_variance_ratio_.tolist(),
+        "training_sec": round(training_sec, 2),
+        "preprocessing_cached": data["cached"],
+        "preprocessing": data["preprocessing"],
+        "hyperparameters": params
+    })
+    print(f"📈 Baseline for {project_name}: AUC {final['auc']:.4f} in {training_sec:.2f}s")
+
+    save_baseline_summary(
+        project_name=project_name,
+        total_samples=total_samples,
+        fraud_count=fraud_count,
+        model=BASELINE_MODEL,
+        accuracy=final["accuracy"],
+        f1_score=final["f1"],
+        auc=final["auc"]
+    )
+    return results
@@ -1,89 +1,185 @@
 import datetime
-import sqlite3
 from datetime import date 
 from flask import jsonify
-import sqlite3
+
+import db
+
+TRANSACTION_COLUMNS = [
+    "Time", "V1", "V2", "V3", "V4", "V5", "V6",
+    "V7", "V8", "V9", "V10", "V11", "V12", "V13",
+    "V14", "V15", "V16", "V17", "V18", "V19", "V20",
+    "V21", "V22", "V23", "V24", "V25", "V26", "V27",
+    "V28", "Amount", "Class"
+]
+FEATURE_COLUMNS = TRANSACTION_COLUMNS[:-1]
+
 def createtable():
     try:
-        conn=sqlite3.connect('database.db')
-        cursor=conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS users
-                        (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username TEXT NOT NULL,
-                        email TEXT NOT NULL,
-                        password TEXT NOT NULL
-                    )''')
-        conn.commit()
-        conn.close()
+        with db.transaction() as conn:
+            cursor=conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS users
+                            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            username TEXT NOT NULL,
+                            email TEXT NOT NULL,
+                            password TEXT NOT NULL
+                        )''')
     except Exception as e:
         print("Error creating table:", e)
         
 
+def create_transactions_view(cursor):
+    # The old column-wise schema, decoded on the fly; `features` passes the raw blob
+    # through for readers that decode whole batches with NumPy.
+    # blob_float32 is a Python function registered by db.connect(), not SQLite: the view
+    # only works on connections opened through db.py. The sqlite3 CLI or a plain
+    # sqlite3.connect() fails with "no such function: blob_float32" (register it with
+    # conn.create_function("blob_float32", 2, db.blob_float32) first), but can still read
+    # transaction_rows and projects directly.
+    decoded = ",\n".join(
+        f"                   blob_float32(r.features, {i}) AS {column}" for i, column in enumerate(FEATURE_COLUMNS)
+    )
+    cursor.execute(f"""
+        CREATE VIEW IF NOT EXISTS transactions AS
+            SELECT r.id AS id,
+                   p.name AS project_name,
+{decoded},
+                   r.Class AS Class,
+                   r.features AS features
+            FROM transaction_rows r JOIN projects p ON p.id = r.project_id
+    """)
+
+
 def create_csv_table():
     try:
-        conn=sqlite3.connect('database.db')
-        cursor=conn.cursor()
-        cursor.execute("""
-CREATE TABLE  IF NOT EXISTS transactions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    project_name text,    -- new column to identify project
-    Time REAL,
-    V1 REAL,
-    V2 REAL,
-    V3 REAL,
-    V4 REAL,
-    V5 REAL,
-    V6 REAL,
-    V7 REAL,
-    V8 REAL,
-    V9 REAL,
-    V10 REAL,
-    V11 REAL,
-    V12 REAL,
-    V13 REAL,
-    V14 REAL,
-    V15 REAL,
-    V16 REAL,
-    V17 REAL,
-    V18 REAL,
-    V19 REAL,
-    V20 REAL,
-    V21 REAL,
-    V22 REAL,
-    V23 REAL,
-    V24 REAL,
-    V25 REAL,
-    V26 REAL,
-    V27 REAL,
-    V28 REAL,
-    Amount REAL,
-    Class INTEGER
-    );
-
-""")
-        conn.commit()
-        conn.close()
+        with db.transaction() as conn:
+            cursor=conn.cursor()
+            # Transactions are stored packed (see transactionstore.py): one row per
+            # transaction with its features as a float32 blob and an integer project id
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS projects (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS transaction_rows (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_id INTEGER NOT NULL REFERENCES projects (id),
+                    Class INTEGER,
+                    features BLOB NOT NULL
+                )
+            """)
+            # Every per-project read (training, feature store rebuilds) filters on the project
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transaction_rows_project ON transaction_rows (project_id)")
+            # Databases from before packed storage still have a transactions table here;
+            # migrations.convert_column_transactions replaces it with the view
+            legacy = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'"
+            ).fetchone()
+            if not legacy:
+                create_transactions_view(cursor)
+            # Aggregates maintained with every ingested chunk (see projectstats.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS project_stats (
+                    project_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    rows INTEGER NOT NULL DEFAULT 0,
+                    fraud_count INTEGER NOT NULL DEFAULT 0,
+                    moments TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Content fingerprints that make repeated uploads no-ops: whole files per
+            # project, and each ingested chunk (sha256 of its parsed values)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    project_name TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    job_id TEXT,
+                    rows INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (project_name, file_hash)
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ingested_chunks (
+                    project_name TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    PRIMARY KEY (project_name, chunk_hash)
+                ) WITHOUT ROWID
+            """)
     except Exception as e:
         print("Error creating table:", e)
 def create_project_summary_table():
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS project_summary (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_name TEXT UNIQUE NOT NULL,
-                total_samples INTEGER,
-                fraud_count INTEGER,
-                accuracy REAL,
-                f1_score REAL,
-                auc REAL,
-                status TEXT DEFAULT 'Idle',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        conn.commit()
-        conn.close()
+        with db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS project_summary (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_name TEXT UNIQUE NOT NULL,
+                    total_samples INTEGER,
+                    fraud_count INTEGER,
+                    accuracy REAL,
+                    f1_score REAL,
+                    auc REAL,
+                    status TEXT DEFAULT 'Idle',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    best_config TEXT,
+                    best_score REAL,
+                    baseline_model TEXT,
+                    baseline_accuracy REAL,
+                    baseline_f1_score REAL,
+                    baseline_auc REAL
+                );
+            """)
+            # Databases created before hyperparameter sweeps (best_*) or the classical
+            # baseline (baseline_*) lack those columns
+            cursor.execute("PRAGMA table_info(project_summary)")
+            existing = {row[1] for row in cursor.fetchall()}
+            for column, column_type in (("best_config", "TEXT"), ("best_score", "REAL"), ("baseline_model", "TEXT"),
+                                        ("baseline_accuracy", "REAL"), ("baseline_f1_score", "REAL"),
+                                        ("baseline_auc", "REAL")):
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE project_summary ADD COLUMN {column} {column_type}")
         print("✅ project_summary table created or already exists.")
     except Exception as e:
         print("❌ Error creating project_summary table:", e)
+
+
+def create_ingest_jobs_table():
+    try:
+        with db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    project_name TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    status TEXT DEFAULT 'queued',
+                    rows_done INTEGER DEFAULT 0,
+                    chunks_done INTEGER DEFAULT 0,
+                    total_rows INTEGER,
+                    message TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    file_hash TEXT,
+                    mode TEXT DEFAULT 'append'
+                );
+            """)
+            # Databases created before deduplicated ingest lack file_hash and mode
+            cursor.execute("PRAGMA table_info(ingest_jobs)")
+            existing = {row[1] for row in cursor.fetchall()}
+            for column, column_type in (("file_hash", "TEXT"), ("mode", "TEXT DEFAULT 'append'")):
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE ingest_jobs ADD COLUMN {column} {column_type}")
+            # One queued/running job per uploaded file and project, across web workers
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_ingest_jobs_active_file ON ingest_jobs (project_name, file_hash) "
+                "WHERE status IN ('queued', 'running') AND file_hash IS NOT NULL"
+            )
+        print("✅ ingest_jobs table created or already exists.")
+    except Exception as e:
+        print("❌ Error creating ingest_jobs table:", e)
@@ -0,0 +1,156 @@
+import math
+import os
+import queue
+import sqlite3
+import struct
+import threading
+from contextlib import contextmanager
+
+from telemetry import span
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "30000"))
+STATEMENT_CACHE_SIZE = 256
+FLOAT32_DIGITS = 7
+_FLOAT32 = struct.Struct("<f")
+
+# One data-access layer for every module:
+#  * reads borrow a connection from a fixed-size pool (queue.Queue, so under eventlet's
+#    monkey patching a borrower waiting on an empty pool parks its green thread only);
+#  * writes go through a single dedicated writer connection handed out by a one-slot queue,
+#    so writers in this process line up FIFO instead of racing for SQLite's lock and
+#    failing with "database is locked";
+#  * WAL mode lets readers keep reading while that writer commits.
+
+
+def apply_pragmas(conn):
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable across application crashes under WAL; only an OS crash can lose
+    # the last transactions
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+def blob_float32(blob, index):
+    # SQL function blob_float32(blob, i): the i-th value of a packed little-endian float32
+    # vector, rounded to float32's significant digits (used by the transactions view)
+    if blob is None:
+        return None
+    value = _FLOAT32.unpack_from(blob, 4 * index)[0]
+    if value == 0 or not math.isfinite(value):
+        return value
+    scale = 10.0 ** (FLOAT32_DIGITS - 1 - math.floor(math.log10(abs(value))))
+    return round(value * scale) / scale
+
+
+def connect(path=None):
+    # Standalone connection for long-lived cursors (streamed responses) and tools
+    conn = sqlite3.connect(
+        path or DATABASE_PATH,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    apply_pragmas(conn)
+    conn.create_function("blob_float32", 2, blob_float32, deterministic=True)
+    return conn
+
+
+class ConnectionPool:
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.pid = os.getpid()
+        self._readers = queue.Queue()
+        self._writer = queue.Queue(maxsize=1)
+        self._created = 0
+        self._size = size
+        self._lock = threading.Lock()
+
+        writer = connect(path)
+        writer.execute("PRAGMA cache_size=-65536")  # 64 MB page cache for bulk ingest
+        self._writer.put(writer)
+
+    def _borrow_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                return connect(self.path)
+        return self._readers.get()
+
+    @contextmanager
+    def read(self):
+        conn = self._borrow_reader()
+        try:
+            yield conn
+        finally:
+            conn.row_factory = None
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self):
+        # Yields the writer inside BEGIN IMMEDIATE; commits on success, rolls back on error
+        conn = self._writer.get()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.row_factory = None
+            self._writer.put(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    # Rebuilt after a fork or when the working directory changes a relative DATABASE_PATH
+    global _pool
+    path = os.path.abspath(DATABASE_PATH)
+    if _pool is None or _pool.pid != os.getpid() or _pool.path != path:
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid() or _pool.path != path:
+                _pool = ConnectionPool(path)
+    return _pool
+
+
+def read_connection():
+    return get_pool().read()
+
+
+def transaction():
+    return get_pool().write()
+
+
+# ---------------- Convenience helpers ---------------- #
+def fetch_one(query, params=(), as_dict=True):
+    with span("db_read"), read_connection() as conn:
+        if as_dict:
+            conn.row_factory = sqlite3.Row
+        row = conn.execute(query, params).fetchone()
+    return dict(row) if (row is not None and as_dict) else row
+
+
+def fetch_all(query, params=(), as_dict=True):
+    with span("db_read"), read_connection() as conn:
+        if as_dict:
+            conn.row_factory = sqlite3.Row
+        rows = conn.execute(query, params).fetchall()
+    return [dict(row) for row in rows] if as_dict else rows
+
+
+def execute_write(query, params=()):
+    with span("db_write"), transaction() as conn:
+        cursor = conn.execute(query, params)
+        return cursor.rowcount
@@ -0,0 +1,36 @@
+import os
+
+import db
+from featurestore import drop_project_store
+from projectstats import reset_project_stats
+from transactionstore import project_id
+
+DELETE_BATCH_ROWS = int(os.getenv("DELETE_BATCH_ROWS", "50000"))
+
+
+def delete_project_data(project_name, batch_rows=DELETE_BATCH_ROWS):
+    # Removes a project's transactions in id batches found through idx_transaction_rows_project,
+    # releasing the writer between batches; other projects' rows are never touched or
+    # rewritten. Its aggregates, feature store and ingest fingerprints go last, so
+    # re-running after an interruption finishes the job.
+    deleted = 0
+    with db.read_connection() as conn:
+        pid = project_id(conn, project_name)
+    while pid is not None:
+        with db.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM transaction_rows WHERE id IN "
+                "(SELECT id FROM transaction_rows WHERE project_id = ? LIMIT ?)",
+                (pid, batch_rows)
+            )
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_rows:
+            break
+
+    with db.transaction() as conn:
+        reset_project_stats(conn, project_name)
+        conn.execute("DELETE FROM ingested_chunks WHERE project_name = ?", (project_name,))
+        conn.execute("DELETE FROM ingested_files WHERE project_name = ?", (project_name,))
+    drop_project_store(project_name)
+    print(f"🗑️ Deleted {deleted} rows for project: {project_name}")
+    return deleted
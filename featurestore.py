@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+
+import db
+from createoperations import FEATURE_COLUMNS
+from transactionstore import iter_project_blocks
+
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "feature_store")
+REBUILD_FETCH_ROWS = 50000
+
+# Layout per project: X.f64 is a row-major (rows, 30) float64 matrix, y.i64 the labels,
+# meta.json the committed row count. Files are appended at ingest time and memory-mapped
+# for training, so loading a project never materialises a DataFrame.
+
+
+def project_store_dir(project_name):
+    slug = re.sub(r"[^A-Za-z0-9_.-]", "_", project_name)[:64]
+    digest = hashlib.sha1(project_name.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(FEATURE_STORE_DIR, f"{slug}-{digest}")
+
+
+def _paths(project_name):
+    base = project_store_dir(project_name)
+    return (
+        base,
+        os.path.join(base, "X.f64"),
+        os.path.join(base, "y.i64"),
+        os.path.join(base, "meta.json"),
+    )
+
+
+def _read_rows(meta_path):
+    if not os.path.exists(meta_path):
+        return 0
+    with open(meta_path) as f:
+        return json.load(f)["rows"]
+
+
+def _write_rows(meta_path, rows):
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"rows": rows, "columns": FEATURE_COLUMNS}, f)
+    os.replace(tmp_path, meta_path)
+
+
+def drop_project_store(project_name):
+    shutil.rmtree(project_store_dir(project_name), ignore_errors=True)
+
+
+def append_project_chunk(project_name, features, labels):
+    # features: (n_features, n_rows) as produced by insertoperations.chunk_to_columns
+    if labels.dtype.kind != "i":
+        # Missing labels cannot be stored as int64; training falls back to SQLite
+        drop_project_store(project_name)
+        return
+
+    if labels.shape[0] == 0:
+        return
+
+    base, x_path, y_path, meta_path = _paths(project_name)
+    os.makedirs(base, exist_ok=True)
+    rows = _read_rows(meta_path)
+
+    x_block = np.ascontiguousarray(features.T, dtype=np.float64)
+    y_block = np.ascontiguousarray(labels, dtype=np.int64)
+    for path, block in ((x_path, x_block), (y_path, y_block)):
+        with open(path, "ab") as f:
+            # Anything past the committed row count is a partial write from a crash
+            f.truncate(rows * (block.nbytes // block.shape[0]))
+            block.tofile(f)
+
+    _write_rows(meta_path, rows + labels.shape[0])
+
+
+def rebuild_project_store(project_name, conn):
+    drop_project_store(project_name)
+    for X, labels in iter_project_blocks(conn, project_name, REBUILD_FETCH_ROWS):
+        if np.isnan(labels).any():
+            drop_project_store(project_name)
+            return False
+        append_project_chunk(project_name, X.T, labels.astype(np.int64))
+    return True
+
+
+def load_project_arrays(project_name):
+    # Returns (X, y) as read-only memory maps, rebuilding the store from SQLite when it is
+    # missing or out of step with the transactions table. Returns (None, None) when the
+    # project cannot be represented (no rows, or rows with a missing Class).
+    base, x_path, y_path, meta_path = _paths(project_name)
+
+    with db.read_connection() as conn:
+        expected = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE project_name = ?", (project_name,)
+        ).fetchone()[0]
+
+        if expected and _read_rows(meta_path) != expected:
+            print(f"🧱 Rebuilding feature store for {project_name}")
+            if not rebuild_project_store(project_name, conn):
+                return None, None
+
+    rows = _read_rows(meta_path)
+    if not expected or rows != expected:
+        return None, None
+
+    X = np.memmap(x_path, dtype=np.float64, mode="r", shape=(rows, len(FEATURE_COLUMNS)))
+    y = np.memmap(y_path, dtype=np.int64, mode="r", shape=(rows,))
+    return X, y
@@ -1,11 +1,8 @@
-import sqlite3
-def resetpassword(email, new_password):
+import db
+def resetpassword(email, hashed_password):
+   # Expects an already hashed password (auth.hash_password)
    try:
-      conn = sqlite3.connect("database.db")
-      cursor = conn.cursor()
-      cursor.execute("UPDATE users SET password = ? WHERE email = ?", (new_password, email))
-      conn.commit()
-      conn.close()
-      return {"status": "success"}
+      db.execute_write("UPDATE users SET password = ? WHERE email = ? COLLATE NOCASE", (hashed_password, email.strip()))
+      return {"status": "success"}, 200
    except Exception as e:
-      return {"status": "error", "message": str(e)}
+      return {"status": "error", "message": str(e)}, 500
@@ -0,0 +1,128 @@
+import itertools
+import os
+
+import numpy as np
+
+# Training hyperparameters and sweep spaces, validated without the ML stack: the web
+# process checks /sweep requests with these, while the circuits and optimizers they name
+# live in qmlmodel and are only imported by the training worker.
+
+N_COMPONENTS = 2
+# One qubit per PCA component, so n_components is the circuit width. A state vector holds
+# 2**n_qubits amplitudes per row, which bounds how wide a circuit is still worth simulating.
+MAX_CIRCUIT_QUBITS = int(os.getenv("MAX_CIRCUIT_QUBITS", "16"))
+
+# ansatz name -> trainable parameters per qubit (qmlmodel.ANSATZES holds the circuit blocks)
+ANSATZ_PARAMS = {
+    "rot_cnot": 3,
+    "rot_ring": 3,
+    "ry_cz": 1,
+}
+
+OPTIMIZER_NAMES = ("gd", "momentum", "adagrad", "adam")
+
+# Simulator for training (qmlmodel.make_predictors):
+#   auto           - adjoint gradients on lightning.qubit, evaluation broadcast on default.qubit
+#   lightning.qubit - everything on lightning; its kernels use OpenMP (see LIGHTNING_NUM_THREADS
+#                     in trainworker)
+#   default.qubit  - everything on default.qubit, backprop over the broadcast minibatch
+BACKEND_NAMES = ("auto", "lightning.qubit", "default.qubit")
+
+# Hyperparameters that change the circuit itself (and so the shape of a saved model)
+CIRCUIT_HYPERPARAMETERS = ("ansatz", "n_layers", "reupload")
+
+DEFAULT_HYPERPARAMETERS = {
+    "epochs": 10,
+    "stepsize": 0.1,
+    "batch_size": 64,
+    "n_components": N_COMPONENTS,
+    "ansatz": "rot_cnot",
+    "optimizer": "gd",
+    "n_layers": 1,
+    "reupload": False,  # re-encode the features before every layer, not just the first
+    "backend": "auto",
+}
+
+SWEEP_MAX_TRIALS = int(os.getenv("SWEEP_MAX_TRIALS", "64"))
+DEFAULT_RANDOM_TRIALS = 16
+SWEEP_SEED = 42
+SEARCH_NAMES = ("grid", "random")
+
+# Preprocessing pipelines (preprocessing.run_preprocessing); "auto" picks one by data size
+PREPROCESS_MODES = ("memory", "streaming")
+
+
+def resolve_hyperparameters(overrides=None):
+    params = {**DEFAULT_HYPERPARAMETERS, **(overrides or {})}
+    if params["ansatz"] not in ANSATZ_PARAMS:
+        raise ValueError(f"Unknown ansatz: {params['ansatz']}")
+    if params["optimizer"] not in OPTIMIZER_NAMES:
+        raise ValueError(f"Unknown optimizer: {params['optimizer']}")
+    if params["backend"] not in BACKEND_NAMES:
+        raise ValueError(f"Unknown backend: {params['backend']}")
+    for name in ("epochs", "batch_size", "n_components", "n_layers"):
+        params[name] = int(params[name])
+        if params[name] < 1:
+            raise ValueError(f"{name} must be at least 1")
+    if params["n_components"] > MAX_CIRCUIT_QUBITS:
+        raise ValueError(f"n_components must be at most {MAX_CIRCUIT_QUBITS} (one qubit each)")
+    params["stepsize"] = float(params["stepsize"])
+    params["reupload"] = str(params["reupload"]).lower() in ("1", "true", "yes")
+    return params
+
+
+def _optional_int(name, value, minimum):
+    # JSON integers only: "5" or true is a client bug, not something to coerce
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < minimum):
+        raise ValueError(f"{name} must be an integer of at least {minimum}")
+
+
+def validate_sweep_options(space, search="grid", n_trials=None, sample_budget=None, preprocess_mode=None):
+    # Types of a /sweep body, checked before expand_trials so a malformed request is a 400
+    if not isinstance(space, dict):
+        raise ValueError("space must be an object of {hyperparameter: [values]}")
+    for name, values in space.items():
+        for value in values if isinstance(values, list) else [values]:
+            if isinstance(value, (list, dict)) or value is None:
+                raise ValueError(f"Values for {name} must be strings, numbers or booleans")
+    if search not in SEARCH_NAMES:
+        raise ValueError(f"Unknown search: {search}")
+    _optional_int("n_trials", n_trials, 1)
+    _optional_int("sample_budget", sample_budget, 0)  # 0 trains on every row
+    if preprocess_mode is not None and preprocess_mode not in ("auto",) + PREPROCESS_MODES:
+        raise ValueError(f"Unknown preprocessing mode: {preprocess_mode}")
+
+
+def circuit_options(params):
+    return {name: params.get(name, DEFAULT_HYPERPARAMETERS[name]) for name in CIRCUIT_HYPERPARAMETERS}
+
+
+def weight_shape(n_qubits, ansatz="rot_cnot", n_layers=1):
+    # A single layer keeps the original (n_qubits, params) shape, so models saved before
+    # layers existed still load and warm-start
+    if n_layers == 1:
+        return (n_qubits, ANSATZ_PARAMS[ansatz])
+    return (n_layers, n_qubits, ANSATZ_PARAMS[ansatz])
+
+
+def expand_trials(space=None, search="grid", n_trials=None, seed=SWEEP_SEED):
+    # space: {hyperparameter: [values]}; anything left out keeps its default
+    space = {name: values if isinstance(values, list) else [values] for name, values in (space or {}).items()}
+    unknown = [name for name in space if name not in DEFAULT_HYPERPARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters: {unknown}")
+    if any(not values for values in space.values()):
+        raise ValueError("Every hyperparameter needs at least one value")
+
+    names = list(space)
+    grid = [dict(zip(names, combo)) for combo in itertools.product(*(space[name] for name in names))]
+    if search == "random":
+        count = min(n_trials or DEFAULT_RANDOM_TRIALS, len(grid))
+        picks = np.random.default_rng(seed).choice(len(grid), count, replace=False)
+        grid = [grid[i] for i in sorted(picks)]
+    elif search != "grid":
+        raise ValueError(f"Unknown search: {search}")
+
+    if len(grid) > SWEEP_MAX_TRIALS:
+        raise ValueError(f"Sweep has {len(grid)} trials (max {SWEEP_MAX_TRIALS}); use search=random")
+    return [resolve_hyperparameters(config) for config in grid]
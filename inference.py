@@ -0,0 +1,94 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from createoperations import FEATURE_COLUMNS
+from modelregistry import latest_fingerprint, load_model_record, load_preprocessed, model_version, record_circuit
+from offload import native_threading
+from qmlmodel import build_circuit, predict_batch
+
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "8"))
+MAX_PREDICT_ROWS = int(os.getenv("MAX_PREDICT_ROWS", "50000"))
+
+
+class ModelCache:
+    # Small LRU of loaded models keyed by (project, fingerprint, model.json mtime): new data
+    # gives a new fingerprint, and retraining on the same data rewrites model.json under
+    # the same one, so either way the next lookup misses and loads the new weights (one
+    # stat per lookup). Predictions run on tpool threads (app.py), hence the native lock.
+    def __init__(self, capacity=MODEL_CACHE_SIZE):
+        self.capacity = capacity
+        self._models = OrderedDict()
+        self._circuits = {}
+        self._lock = native_threading.Lock()
+
+    def get(self, project_name):
+        fingerprint = latest_fingerprint(project_name)
+        if fingerprint is None:
+            raise LookupError(f"No trained model for project: {project_name}")
+
+        key = (project_name, fingerprint, model_version(project_name, fingerprint))
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+        model = self._load(project_name, fingerprint)
+        with self._lock:
+            # Older versions of this project's model are never asked for again
+            for stale in [cached for cached in self._models if cached[0] == project_name]:
+                del self._models[stale]
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.capacity:
+                self._models.popitem(last=False)
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def _load(self, project_name, fingerprint):
+        record = load_model_record(project_name, fingerprint)
+        pipeline = load_preprocessed(project_name, fingerprint)
+        if record is None or pipeline is None:
+            raise LookupError(f"Model files missing for project: {project_name}")
+
+        # (n_qubits, params), or (n_layers, n_qubits, params) for layered circuits
+        n_qubits = record["weights"].shape[-2]
+        options = record_circuit(record)
+        key = (n_qubits, *options.values())
+        if key not in self._circuits:
+            self._circuits[key] = build_circuit(n_qubits, "default.qubit", diff_method="backprop", **options)
+        return {
+            "fingerprint": fingerprint,
+            "scaler": pipeline["scaler"],
+            "pca": pipeline["pca"],
+            "weights": record["weights"],
+            "circuit": self._circuits[key],
+        }
+
+
+model_cache = ModelCache()
+
+
+def rows_to_features(rows):
+    # rows: list of dicts keyed by column name, or a DataFrame parsed from CSV
+    frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame.from_records(rows)
+    missing_cols = [col for col in FEATURE_COLUMNS if col not in frame.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns: {missing_cols}")
+    if len(frame) == 0:
+        raise ValueError("No transactions to score")
+    if len(frame) > MAX_PREDICT_ROWS:
+        raise ValueError(f"Too many rows: {len(frame)} (max {MAX_PREDICT_ROWS})")
+    return frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+
+def predict_fraud_probabilities(project_name, X):
+    model = model_cache.get(project_name)
+    X_pca = model["pca"].transform(model["scaler"].transform(X))
+    probs = predict_batch(model["circuit"], X_pca, model["weights"])
+    return model["fingerprint"], probs
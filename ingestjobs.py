@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import uuid
+
+import db
+from deleteoperations import delete_project_data
+from insertoperations import count_csv_rows, insert_csv_to_transactions_table
+from offload import run_blocking
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+# Jobs left in these states by a crash, a restart or a transient error are picked up
+# again by the janitor
+RESUMABLE_STATUSES = ("queued", "running")
+# A running job whose progress has not moved for this long is assumed to have lost its worker
+INGEST_STALE_SEC = int(os.getenv("INGEST_STALE_SEC", "60"))
+# "append" adds the file's new rows to the project; "replace" deletes the project's rows
+# first, so the project ends up holding exactly the uploaded file
+INGEST_MODES = ("append", "replace")
+
+
+def create_ingest_job(project_name, file_path, file_hash=None, mode="append"):
+    # Returns (job_id, created). The same file uploaded again while its first job is still
+    # queued or running (double submit, client retry) gets that job back instead.
+    if mode not in INGEST_MODES:
+        raise ValueError(f"Unknown ingest mode: {mode}")
+    job_id = uuid.uuid4().hex
+    try:
+        db.execute_write(
+            "INSERT INTO ingest_jobs (job_id, project_name, file_path, file_hash, mode) VALUES (?, ?, ?, ?, ?)",
+            (job_id, project_name, file_path, file_hash, mode)
+        )
+    except sqlite3.IntegrityError:
+        existing = db.fetch_one(
+            "SELECT job_id FROM ingest_jobs WHERE project_name = ? AND file_hash = ? AND status IN ('queued', 'running')",
+            (project_name, file_hash)
+        )
+        if existing is None:
+            raise
+        return existing["job_id"], False
+    return job_id, True
+
+
+def find_ingested_file(project_name, file_hash):
+    # The completed ingest of this exact file into the project, if any
+    return db.fetch_one(
+        "SELECT * FROM ingested_files WHERE project_name = ? AND file_hash = ?", (project_name, file_hash)
+    )
+
+
+def has_active_ingest(project_name):
+    return db.fetch_one(
+        "SELECT 1 FROM ingest_jobs WHERE project_name = ? AND status IN ('queued', 'running') LIMIT 1",
+        (project_name,), as_dict=False
+    ) is not None
+
+
+def get_ingest_job(job_id):
+    return db.fetch_one("SELECT * FROM ingest_jobs WHERE job_id = ?", (job_id,))
+
+
+def list_resumable_ingest_jobs():
+    return db.fetch_all(
+        f"SELECT * FROM ingest_jobs WHERE status IN ({','.join('?' * len(RESUMABLE_STATUSES))}) ORDER BY created_at",
+        RESUMABLE_STATUSES
+    )
+
+
+def claim_ingest_job(job_id, stale_sec=INGEST_STALE_SEC):
+    # Atomically take ownership so two web workers never ingest the same upload. A job
+    # can be claimed while queued, or while running with no progress for stale_sec.
+    with db.transaction() as conn:
+        cursor = conn.execute(
+            "UPDATE ingest_jobs SET status = 'running', updated_at = CURRENT_TIMESTAMP "
+            "WHERE job_id = ? AND (status = 'queued' OR (status = 'running' AND updated_at < datetime('now', ?)))",
+            (job_id, f"-{int(stale_sec)} seconds")
+        )
+        return cursor.rowcount == 1
+
+
+def count_resumable_ingest_jobs():
+    # {status: count} for queued/running jobs
+    return dict(db.fetch_all(
+        f"SELECT status, COUNT(*) FROM ingest_jobs WHERE status IN ({','.join('?' * len(RESUMABLE_STATUSES))}) "
+        "GROUP BY status",
+        RESUMABLE_STATUSES, as_dict=False
+    ))
+
+
+def update_ingest_job(job_id, **fields):
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    db.execute_write(
+        f"UPDATE ingest_jobs SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+        (*fields.values(), job_id)
+    )
+
+
+def run_ingest_job(job_id, progress_callback=None):
+    job = get_ingest_job(job_id)
+    if job is None:
+        return {"status": "error", "message": f"Unknown ingest job: {job_id}"}
+    if not claim_ingest_job(job_id):
+        return {"status": "skipped", "message": f"Ingest job {job_id} is owned by another worker"}
+
+    if not os.path.exists(job["file_path"]):
+        update_ingest_job(job_id, status="error", message="Uploaded file is no longer available")
+        return {"status": "error", "message": "Uploaded file is no longer available"}
+
+    total_rows = job["total_rows"]
+    if total_rows is None:
+        total_rows = run_blocking(count_csv_rows, job["file_path"])  # reads the whole upload
+    update_ingest_job(job_id, status="running", total_rows=total_rows)
+    if job["rows_done"]:
+        print(f"🔁 Resuming ingest job {job_id} at row {job['rows_done']}")
+    elif job["mode"] == "replace":
+        # Before the first chunk only, so a resumed replace keeps what it already loaded
+        delete_project_data(job["project_name"])
+
+    result = insert_csv_to_transactions_table(
+        job["file_path"],
+        job["project_name"],
+        job_id=job_id,
+        progress_callback=progress_callback
+    )
+
+    if result["status"] == "success":
+        update_ingest_job(job_id, status="completed", message=result["message"])
+        if job["file_hash"]:
+            db.execute_write(
+                "INSERT OR REPLACE INTO ingested_files (project_name, file_hash, job_id, rows) VALUES (?, ?, ?, ?)",
+                (job["project_name"], job["file_hash"], job_id, result["rows"])
+            )
+    elif result["status"] == "cancelled":
+        _remove_upload(job["file_path"])
+    elif result.get("resumable"):
+        # The upload and the committed progress are kept; the janitor picks the job up
+        # again and it continues from its last committed chunk. Unless it was cancelled.
+        db.execute_write(
+            "UPDATE ingest_jobs SET status = 'queued', message = ?, updated_at = CURRENT_TIMESTAMP "
+            "WHERE job_id = ? AND status = 'running'",
+            (f"Will retry: {result['message']}", job_id)
+        )
+    else:
+        update_ingest_job(job_id, status="error", message=result["message"])
+        _remove_upload(job["file_path"])
+    return result
+
+
+def cancel_ingest_job(job_id):
+    # Stops a queued or running job and deletes its upload. A running ingest notices before
+    # its next chunk commits; the rows it already committed stay in the project.
+    with db.transaction() as conn:
+        job = conn.execute("SELECT status, file_path FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if job is None or job[0] not in RESUMABLE_STATUSES:
+            return False
+        conn.execute(
+            "UPDATE ingest_jobs SET status = 'cancelled', message = 'Cancelled', updated_at = CURRENT_TIMESTAMP "
+            "WHERE job_id = ?", (job_id,)
+        )
+    _remove_upload(job[1])
+    return True
+
+
+def _remove_upload(file_path):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
@@ -1,61 +1,215 @@
-import sqlite3
-import pandas as pd
-
-import sqlite3
-import pandas as pd
+import time
+import hashlib
+import json
+import numpy as np
 import os
 
-def insert_csv_to_transactions_table(file_path, project_name):
+import db
+from createoperations import FEATURE_COLUMNS, TRANSACTION_COLUMNS
+from featurestore import append_project_chunk
+from offload import run_blocking
+from projectstats import update_project_stats
+from telemetry import span
+from transactionstore import pack_features, project_id
+
+INGEST_CHUNK_ROWS = 50000
+
+
+class IngestCancelled(Exception):
+    pass
+
+# pandas is imported on first use: the web process imports this module for ingest and
+# should not pay for pandas until an upload actually arrives
+
+
+def read_csv_header(file_path):
+    import pandas as pd
+
+    header = list(pd.read_csv(file_path, nrows=0).columns)
+    missing_cols = [col for col in TRANSACTION_COLUMNS if col not in header]
+    if missing_cols:
+        raise ValueError(f"Missing columns in CSV: {missing_cols}")
+    return header
+
+
+def chunk_fingerprint(features, labels):
+    # Hash of the parsed values, so formatting differences (quoting, trailing zeros) in an
+    # otherwise identical upload still match
+    digest = hashlib.sha256(features.tobytes())
+    digest.update(labels.tobytes())
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_to_columns(chunk):
+    # Column-wise conversion: one typed array per column instead of one Series per row.
+    # Features come back transposed (n_features, n_rows) so each column is contiguous.
+    features = np.ascontiguousarray(chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64).T)
+    labels = chunk["Class"].to_numpy(dtype=np.float64)
+    if not np.isnan(labels).any():
+        labels = labels.astype(np.int64)
+    return features, labels
+
+
+def read_next_chunk(chunks, skip):
+    # Next batch from the CSV reader, after dropping `skip` rows an earlier run committed:
+    # (features, labels, blobs, chunk_hash, rows still to skip), or None at the end of the file.
+    # Rows are stored as float32; the fingerprint, aggregates and feature store use those
+    # stored values, so rebuilding any of them from SQLite gives the same result.
+    while True:
+        with span("csv_parse"):
+            chunk = next(chunks, None)
+            if chunk is None:
+                return None
+            if skip:
+                dropped = min(skip, len(chunk))
+                chunk, skip = chunk.iloc[dropped:], skip - dropped
+                if chunk.empty:
+                    continue
+            features, labels = chunk_to_columns(chunk)
+            packed, blobs = pack_features(features)
+            features = np.ascontiguousarray(packed.T, dtype=np.float64)
+        return features, labels, blobs, chunk_fingerprint(features, labels), skip
+
+
+def write_chunk(conn, project_name, features, labels, blobs, chunk_hash, job_id, rows_done, chunks_done):
+    # The statements of one batch, inside the caller's write transaction. Returns whether the
+    # rows were new: a chunk whose fingerprint the project already has (repeated upload,
+    # retry) is skipped.
+    is_new = conn.execute(
+        "INSERT OR IGNORE INTO ingested_chunks (project_name, chunk_hash, rows) VALUES (?, ?, ?)",
+        (project_name, chunk_hash, len(blobs))
+    ).rowcount == 1
+    if is_new:
+        pid = project_id(conn, project_name, create=True)
+        conn.executemany(
+            "INSERT INTO transaction_rows (project_id, Class, features) VALUES (?, ?, ?)",
+            zip([pid] * len(blobs), labels.tolist(), blobs)
+        )
+        update_project_stats(conn, project_name, features, labels)
+    # A job cancelled meanwhile is no longer running: roll this chunk back and stop
+    if job_id and conn.execute(
+        "UPDATE ingest_jobs SET rows_done = ?, chunks_done = ?, updated_at = CURRENT_TIMESTAMP "
+        "WHERE job_id = ? AND status = 'running'",
+        (rows_done + len(blobs), chunks_done + 1, job_id)
+    ).rowcount != 1:
+        raise IngestCancelled(f"Ingest job {job_id} was cancelled")
+    return is_new
+
+
+def insert_csv_to_transactions_table(file_path, project_name, chunksize=INGEST_CHUNK_ROWS,
+                                     job_id=None, progress_callback=None):
     try:
-        conn = sqlite3.connect("database.db")
-        cursor = conn.cursor()
-
-        required_columns = [
-            "Time", "V1", "V2", "V3", "V4", "V5", "V6",
-            "V7", "V8", "V9", "V10", "V11", "V12", "V13",
-            "V14", "V15", "V16", "V17", "V18", "V19", "V20",
-            "V21", "V22", "V23", "V24", "V25", "V26", "V27",
-            "V28", "Amount", "Class"
-        ]
-
-        # Read CSV in chunks
-        chunksize = 5000
-        for chunk in pd.read_csv(file_path, chunksize=chunksize):
-            # Check for missing columns in this chunk
-            missing_cols = [col for col in required_columns if col not in chunk.columns]
-            if missing_cols:
-                raise ValueError(f"Missing columns in CSV chunk: {missing_cols}")
-
-            # Prepare data safely
-            data = []
-            for _, row in chunk.iterrows():
-                row_data = [row.get(col, None) for col in required_columns]  # safer
-                data.append((project_name, *row_data))
-
-            # Bulk insert
-            cursor.executemany(
-                f'''INSERT INTO transactions
-                (project_name, {", ".join(required_columns)})
-                VALUES ({",".join(["?"] * (len(required_columns) + 1))})''',
-                data
+        start = time.perf_counter()
+        read_csv_header(file_path)  # fails early on missing columns
+
+        # A resumed job skips the rows its earlier run already committed
+        rows_done, chunks_done, total_rows = 0, 0, None
+        if job_id:
+            job = db.fetch_one(
+                "SELECT rows_done, chunks_done, total_rows FROM ingest_jobs WHERE job_id = ?", (job_id,), as_dict=False
             )
-            conn.commit()
+            if job is None:
+                raise ValueError(f"Unknown ingest job: {job_id}")
+            rows_done, chunks_done, total_rows = job
 
-        conn.close()
-        os.remove(file_path)
+        import pandas as pd
+
+        # A resumed job skips its committed rows by record count, as parsed: quoted fields may
+        # span lines, so a line count (skiprows) could land mid-record. Committed chunks are
+        # whole, so the chunks after the skip line up with those of the first run.
+        reader = pd.read_csv(
+            file_path,
+            usecols=TRANSACTION_COLUMNS,
+            dtype={col: np.float64 for col in TRANSACTION_COLUMNS},
+            chunksize=chunksize,
+        )
+        skip = rows_done
+        inserted, duplicates = 0, 0
+        chunks = iter(reader)
+        while True:
+            # Parsing and the insert are ~0.5 s of CPU per 50k-row chunk: both run via
+            # run_blocking so a background ingest does not stall the event loop. The writer
+            # is taken here, on the calling (green) thread, and only used on the pool thread.
+            prepared = run_blocking(read_next_chunk, chunks, skip)
+            if prepared is None:
+                break
+            features, labels, blobs, chunk_hash, skip = prepared
 
-        return {"status": "success", "message": "CSV uploaded in chunks safely."}
+            # One transaction per batch; job progress, the chunk fingerprint and the project
+            # aggregates commit together with the rows. The writer is released between
+            # batches so other writes are not starved.
+            with span("db_insert"), db.transaction() as conn:
+                is_new = run_blocking(
+                    write_chunk, conn, project_name, features, labels, blobs, chunk_hash,
+                    job_id, rows_done, chunks_done
+                )
+            rows_done += len(blobs)
+            chunks_done += 1
+            if is_new:
+                inserted += len(blobs)
+                with span("feature_store_append"):
+                    append_project_chunk(project_name, features, labels)
+            else:
+                duplicates += len(blobs)
 
+            if progress_callback:
+                progress_callback("ingest_progress", {
+                    "project_name": project_name,
+                    "rows_done": rows_done,
+                    "chunks_done": chunks_done,
+                    "total_rows": total_rows,
+                    "progress": round(rows_done / total_rows * 100, 2) if total_rows else None,
+                })
+
+        duration = time.perf_counter() - start
+        processed = inserted + duplicates
+        rows_per_sec = processed / duration if duration > 0 else float(processed)
+        print(f"📥 Ingested {inserted} rows for {project_name} in {duration:.2f}s ({rows_per_sec:,.0f} rows/sec)"
+              + (f", skipped {duplicates} duplicate rows" if duplicates else ""))
+
+        result = {
+            "status": "success",
+            "message": "CSV uploaded in chunks safely.",
+            "rows": inserted,
+            "duplicate_rows": duplicates,
+            "duration_sec": round(duration, 3),
+            "rows_per_sec": round(rows_per_sec, 1),
+        }
+        os.remove(file_path)
+        return result
+
+    except IngestCancelled as e:
+        return {"status": "cancelled", "message": str(e)}
     except Exception as e:
-        return {"status": "error", "message": str(e)}
+        # ValueError covers what is wrong with the file itself (missing columns, values
+        # that do not parse); retrying cannot fix those. Anything else (database busy,
+        # disk full) may pass, so the job can resume from its last committed chunk.
+        return {"status": "error", "message": str(e), "resumable": not isinstance(e, ValueError)}
+
+
+def count_csv_rows(file_path):
+    # Line count minus the header; used only for progress percentages
+    lines, last = 0, b""
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last and last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
 
 
 def save_project_summary(project_name, total_samples, fraud_count, accuracy, f1_score, auc, status="Completed"):
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        db.execute_write("""
             INSERT INTO project_summary (
                 project_name, total_samples, fraud_count, accuracy, f1_score, auc, status
             ) VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -68,8 +222,42 @@ def save_project_summary(project_name, total_samples, fraud_count, accuracy, f1_
                 status=excluded.status;
         """, (project_name, total_samples, fraud_count, accuracy, f1_score, auc, status))
 
-        conn.commit()
-        conn.close()
         print(f"📌 Project summary saved for: {project_name}")
     except Exception as e:
         print("❌ Error saving project summary:", e)
+
+
+def save_baseline_summary(project_name, total_samples, fraud_count, model, accuracy, f1_score, auc):
+    # The classical baseline's metrics sit next to the quantum model's in the same row
+    try:
+        db.execute_write("""
+            INSERT INTO project_summary (
+                project_name, total_samples, fraud_count, baseline_model, baseline_accuracy, baseline_f1_score,
+                baseline_auc
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(project_name) DO UPDATE SET
+                total_samples=excluded.total_samples,
+                fraud_count=excluded.fraud_count,
+                baseline_model=excluded.baseline_model,
+                baseline_accuracy=excluded.baseline_accuracy,
+                baseline_f1_score=excluded.baseline_f1_score,
+                baseline_auc=excluded.baseline_auc;
+        """, (project_name, total_samples, fraud_count, model, accuracy, f1_score, auc))
+
+        print(f"📌 Baseline summary saved for: {project_name}")
+    except Exception as e:
+        print("❌ Error saving baseline summary:", e)
+
+
+def save_best_config(project_name, config, score):
+    try:
+        db.execute_write("""
+            INSERT INTO project_summary (project_name, best_config, best_score) VALUES (?, ?, ?)
+            ON CONFLICT(project_name) DO UPDATE SET
+                best_config=excluded.best_config,
+                best_score=excluded.best_score;
+        """, (project_name, json.dumps(config), score))
+
+        print(f"🏆 Best hyperparameters saved for: {project_name}")
+    except Exception as e:
+        print("❌ Error saving best hyperparameters:", e)
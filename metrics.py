@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+
+# Binary classification metrics from one pass over the scores sorted in descending order:
+# the cumulative true/false positive counts at each distinct score give the ROC curve and
+# AUC, and the counts at the 0.5 threshold give the confusion matrix, accuracy and F1.
+# Above METRICS_EXACT_MAX_ROWS scores the sort is replaced by a METRICS_AUC_BINS histogram
+# (O(n), constant memory, AUC off by at most the ties inside one bin), which StreamingMetrics
+# also uses to score a test set chunk by chunk. Per-epoch curves switch to the histogram
+# much earlier (METRICS_EPOCH_EXACT_MAX_ROWS) since they run on every optimiser step.
+METRICS_EXACT_MAX_ROWS = int(os.getenv("METRICS_EXACT_MAX_ROWS", "2000000"))
+METRICS_EPOCH_EXACT_MAX_ROWS = int(os.getenv("METRICS_EPOCH_EXACT_MAX_ROWS", "50000"))
+METRICS_AUC_BINS = int(os.getenv("METRICS_AUC_BINS", "4096"))
+THRESHOLD = 0.5
+
+
+def _drop_collinear(fps, tps):
+    # Same ROC point reduction as sklearn's drop_intermediate
+    if len(fps) <= 2:
+        return fps, tps
+    keep = np.r_[True, np.logical_or(np.diff(fps, 2), np.diff(tps, 2)), True]
+    return fps[keep], tps[keep]
+
+
+def _summarise(tp, fp, tn, fn, fps, tps, include_roc):
+    # fps/tps: cumulative counts at decreasing thresholds, ending at (negatives, positives)
+    n = tp + fp + tn + fn
+    positives, negatives = tp + fn, fp + tn
+    f1_denominator = 2 * tp + fp + fn
+    metrics = {
+        "accuracy": (tp + tn) / n if n else 0.0,
+        "f1": 2 * tp / f1_denominator if f1_denominator else 0.0,
+        "confusion_matrix": [[int(tn), int(fp)], [int(fn), int(tp)]],
+    }
+
+    if positives and negatives:
+        fps, tps = _drop_collinear(np.r_[0, fps], np.r_[0, tps])
+        fpr, tpr = fps / negatives, tps / positives
+        metrics["auc"] = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+    else:
+        fpr, tpr = np.array([0, 1]), np.array([0, 1])
+        metrics["auc"] = 0.5
+    if include_roc:
+        metrics["fpr"], metrics["tpr"] = fpr, tpr
+    return metrics
+
+
+def binary_metrics(y_true, scores, include_roc=False, approximate=None):
+    y_true = np.asarray(y_true).astype(np.int64, copy=False)
+    scores = np.asarray(scores, dtype=np.float64)
+    if approximate is None:
+        approximate = len(scores) > METRICS_EXACT_MAX_ROWS
+    if approximate:
+        stream = StreamingMetrics()
+        stream.update(y_true, scores)
+        return stream.result(include_roc)
+
+    order = np.argsort(scores, kind="mergesort")[::-1]
+    sorted_scores, sorted_true = scores[order], y_true[order]
+    cum_tp = np.cumsum(sorted_true)
+
+    # Last index of each run of equal scores
+    ends = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1] if len(scores) else np.empty(0, int)
+    tps = cum_tp[ends] if len(scores) else np.empty(0)
+    fps = ends + 1 - tps
+
+    predicted_positive = int(np.count_nonzero(sorted_scores > THRESHOLD))
+    positives = int(cum_tp[-1]) if len(scores) else 0
+    tp = int(cum_tp[predicted_positive - 1]) if predicted_positive else 0
+    fp = predicted_positive - tp
+    fn = positives - tp
+    tn = len(scores) - predicted_positive - fn
+    return _summarise(tp, fp, tn, fn, fps, tps, include_roc)
+
+
+class StreamingMetrics:
+    # Accumulates per-class score histograms and threshold counts over chunks
+
+    def __init__(self, bins=METRICS_AUC_BINS):
+        self.bins = bins
+        self.positive_hist = np.zeros(bins, dtype=np.int64)
+        self.negative_hist = np.zeros(bins, dtype=np.int64)
+        self.tp = self.fp = self.tn = self.fn = 0
+
+    def update(self, y_true, scores):
+        y_true = np.asarray(y_true).astype(bool)
+        scores = np.asarray(scores, dtype=np.float64)
+        idx = np.clip((scores * self.bins).astype(np.int64), 0, self.bins - 1)
+        self.positive_hist += np.bincount(idx[y_true], minlength=self.bins)
+        self.negative_hist += np.bincount(idx[~y_true], minlength=self.bins)
+
+        predicted = scores > THRESHOLD
+        self.tp += int(np.count_nonzero(predicted & y_true))
+        self.fp += int(np.count_nonzero(predicted & ~y_true))
+        self.fn += int(np.count_nonzero(~predicted & y_true))
+        self.tn += int(np.count_nonzero(~predicted & ~y_true))
+
+    def result(self, include_roc=False):
+        nonempty = (self.positive_hist + self.negative_hist)[::-1] > 0
+        tps = np.cumsum(self.positive_hist[::-1])[nonempty]
+        fps = np.cumsum(self.negative_hist[::-1])[nonempty]
+        return _summarise(self.tp, self.fp, self.tn, self.fn, fps, tps, include_roc)
+
+
+def streaming_metrics(predict, X, y_true, chunk_rows, include_roc=False):
+    # Scores X chunk by chunk without keeping every prediction in memory
+    stream = StreamingMetrics()
+    for start in range(0, len(X), chunk_rows):
+        stream.update(y_true[start:start + chunk_rows], predict(X[start:start + chunk_rows]))
+    return stream.result(include_roc)
+
+
+def classification_report_dict(confusion, labels=(0, 1)):
+    # Same layout as sklearn's classification_report(output_dict=True), from the confusion matrix
+    confusion = np.asarray(confusion, dtype=np.float64)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    correct = np.diag(confusion)
+    total = support.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, correct / predicted, 0.0)
+        recall = np.where(support > 0, correct / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    report = {
+        str(label): {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1-score": float(f1[i]),
+            "support": int(support[i]),
+        }
+        for i, label in enumerate(labels)
+    }
+    weights = support / total if total else np.zeros_like(support)
+    report["accuracy"] = float(correct.sum() / total) if total else 0.0
+    report["macro avg"] = {
+        "precision": float(precision.mean()),
+        "recall": float(recall.mean()),
+        "f1-score": float(f1.mean()),
+        "support": int(total),
+    }
+    report["weighted avg"] = {
+        "precision": float((precision * weights).sum()),
+        "recall": float((recall * weights).sum()),
+        "f1-score": float((f1 * weights).sum()),
+        "support": int(total),
+    }
+    return report
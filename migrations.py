@@ -0,0 +1,116 @@
+# `python -m migrations` runs ahead of the app at release: same .env (DATABASE_PATH) first
+from dotenv import load_dotenv
+load_dotenv()
+
+import numpy as np
+
+import db
+from auth import create_users_email_index, hash_plaintext_passwords
+from createoperations import (
+    FEATURE_COLUMNS, create_csv_table, create_ingest_jobs_table, create_project_summary_table,
+    create_transactions_view, createtable
+)
+from resultstore import create_task_runs_table
+from scheduler import create_training_jobs_table
+from socketqueue import create_socketio_messages_table
+from transactionstore import pack_features, project_id
+
+# One-time schema setup: `python -m migrations` runs every create_* step and records
+# SCHEMA_VERSION in the database header (PRAGMA user_version). Web workers only compare
+# that number on startup and run the steps themselves when the database is behind, so a
+# deploy without the release step still works. Bump SCHEMA_VERSION whenever a step gains
+# a table, column or index.
+SCHEMA_VERSION = 4
+CONVERT_BATCH_ROWS = 50000
+
+
+def convert_column_transactions(batch_rows=CONVERT_BATCH_ROWS):
+    # Version 2: a column-wise transactions table (31 REAL columns and a project_name per
+    # row) is copied into packed transaction_rows batch by batch, keeping its ids so
+    # existing cursors and references stay valid, and is then replaced by the view.
+    # Each batch commits on its own; a rerun continues after the last copied id.
+    legacy = db.fetch_one(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'", as_dict=False
+    )
+    if legacy is None:
+        return
+
+    copied = 0
+    while True:
+        with db.transaction() as conn:
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transaction_rows").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT id, COALESCE(project_name, ''), Class, {', '.join(FEATURE_COLUMNS)} FROM transactions "
+                "WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_rows)
+            ).fetchall()
+            if not rows:
+                break
+            ids, names, labels = zip(*(row[:3] for row in rows))
+            _, blobs = pack_features(np.array([row[3:] for row in rows], dtype=np.float64).T)
+            conn.executemany(
+                "INSERT INTO transaction_rows (id, project_id, Class, features) VALUES (?, ?, ?, ?)",
+                zip(ids, [project_id(conn, name, create=True) for name in names], labels, blobs)
+            )
+        copied += len(rows)
+
+    with db.transaction() as conn:
+        conn.execute("DROP TABLE transactions")
+        create_transactions_view(conn.cursor())
+    # Hand the freed pages back to the filesystem (VACUUM cannot run inside a transaction,
+    # and under WAL the rewritten pages only reach the main file at a checkpoint)
+    conn = db.connect()
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    print(f"📦 Converted {copied} transactions to packed rows")
+
+
+MIGRATION_STEPS = (
+    createtable,
+    create_users_email_index,
+    hash_plaintext_passwords,
+    create_csv_table,
+    convert_column_transactions,
+    create_project_summary_table,
+    create_ingest_jobs_table,
+    create_training_jobs_table,
+    create_task_runs_table,
+    create_socketio_messages_table,
+)
+
+REQUIRED_TABLES = (
+    "users", "projects", "transaction_rows", "transactions", "project_stats", "ingested_files", "ingested_chunks",
+    "project_summary", "ingest_jobs", "training_jobs", "task_runs", "socketio_messages",
+)
+
+
+def schema_version():
+    return db.fetch_one("PRAGMA user_version", as_dict=False)[0]
+
+
+def migrate(force=False):
+    current = schema_version()
+    if current >= SCHEMA_VERSION and not force:
+        return current
+
+    for step in MIGRATION_STEPS:
+        step()
+    # Some create_* helpers log and swallow their errors; only record the version once
+    # every table is really there, so the next start retries
+    existing = {row[0] for row in db.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')", as_dict=False
+    )}
+    missing = [table for table in REQUIRED_TABLES if table not in existing]
+    if missing:
+        raise RuntimeError(f"Schema migration incomplete, missing tables: {missing}")
+    with db.transaction() as conn:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    print(f"✅ Database schema migrated from version {current} to {SCHEMA_VERSION}")
+    return SCHEMA_VERSION
+
+
+if __name__ == "__main__":
+    migrate(force=True)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+
+from featurestore import project_store_dir
+from hyperparameters import circuit_options
+
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "model_registry")
+
+# Bump when the preprocessing steps change so older cached pipelines are not reused
+PREPROCESS_VERSION = "smote42-standard-pca2-split20"
+STREAMING_PREPROCESS_VERSION = "standard-ipca2-smote42-split20"
+FINGERPRINT_CHUNK_ROWS = 65536
+
+# Layout: <registry>/<project dir>/<fingerprint>/preprocess.joblib holds the fitted scaler,
+# PCA and train/test split; model.json the circuit weights, the circuit they belong to
+# (ansatz, n_layers, reupload) and metrics. latest.json in the project dir points at the
+# most recently trained fingerprint.
+
+
+def _project_dir(project_name):
+    return os.path.join(MODEL_REGISTRY_DIR, os.path.basename(project_store_dir(project_name)))
+
+
+def _model_dir(project_name, fingerprint):
+    return os.path.join(_project_dir(project_name), fingerprint)
+
+
+def _atomic_write_json(path, payload):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def data_fingerprint(X, y, preprocess_version=PREPROCESS_VERSION):
+    digest = hashlib.sha256(preprocess_version.encode("utf-8"))
+    digest.update(str(X.shape).encode("utf-8"))
+    for start in range(0, len(X), FINGERPRINT_CHUNK_ROWS):
+        digest.update(np.ascontiguousarray(X[start:start + FINGERPRINT_CHUNK_ROWS]))
+    digest.update(np.ascontiguousarray(y))
+    return digest.hexdigest()[:16]
+
+
+def load_preprocessed(project_name, fingerprint):
+    path = os.path.join(_model_dir(project_name, fingerprint), "preprocess.joblib")
+    if not os.path.exists(path):
+        return None
+    try:
+        # Arrays are memory-mapped, so loading just the scaler/PCA for scoring stays cheap
+        return joblib.load(path, mmap_mode="r")
+    except Exception as e:
+        print("❌ Error loading cached preprocessing:", e)
+        return None
+
+
+def save_preprocessed(project_name, fingerprint, scaler, pca, X_train, X_test, y_train, y_test):
+    model_dir = _model_dir(project_name, fingerprint)
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, "preprocess.joblib")
+    joblib.dump({
+        "scaler": scaler,
+        "pca": pca,
+        "X_train": X_train,
+        "X_test": X_test,
+        "y_train": y_train,
+        "y_test": y_test,
+    }, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def save_model(project_name, fingerprint, weights, metrics, circuit):
+    model_dir = _model_dir(project_name, fingerprint)
+    os.makedirs(model_dir, exist_ok=True)
+    _atomic_write_json(os.path.join(model_dir, "model.json"), {
+        "project_name": project_name,
+        "fingerprint": fingerprint,
+        "weights": np.asarray(weights, dtype=np.float64).tolist(),
+        "circuit": circuit_options(circuit),
+        "metrics": metrics,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    })
+    _atomic_write_json(os.path.join(_project_dir(project_name), "latest.json"), {"fingerprint": fingerprint})
+    print(f"🗂️ Model saved to registry: {project_name}@{fingerprint}")
+
+
+def load_model_record(project_name, fingerprint):
+    path = os.path.join(_model_dir(project_name, fingerprint), "model.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        record = json.load(f)
+    record["weights"] = np.array(record["weights"], dtype=np.float64)
+    return record
+
+
+def model_version(project_name, fingerprint):
+    # model.json is replaced on every training, also on unchanged data (same fingerprint);
+    # its mtime tells a cached copy from the current one. None when there is no model.
+    try:
+        return os.stat(os.path.join(_model_dir(project_name, fingerprint), "model.json")).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def record_circuit(record):
+    # Records saved before "circuit" existed only have it in the training hyperparameters
+    return circuit_options(record.get("circuit") or record["metrics"].get("hyperparameters", {}))
+
+
+def latest_fingerprint(project_name):
+    path = os.path.join(_project_dir(project_name), "latest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["fingerprint"]
+
+
+def load_warm_start_weights(project_name, fingerprint, shape, circuit):
+    # Prefer weights trained on exactly this data, else the project's latest model. Only
+    # weights of the same circuit qualify: equal shapes alone do not mean the same gates
+    # (rot_cnot and rot_ring, or re-uploading on and off)
+    circuit = circuit_options(circuit)
+    for candidate in (fingerprint, latest_fingerprint(project_name)):
+        if candidate is None:
+            continue
+        record = load_model_record(project_name, candidate)
+        if record is not None and record["weights"].shape == tuple(shape) and record_circuit(record) == circuit:
+            return record["weights"]
+    return None
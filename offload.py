@@ -0,0 +1,18 @@
+from eventlet import patcher, tpool
+
+# CPU-bound or import-heavy work called from a request handler. Under eventlet (app.py
+# monkey-patches first) it runs on the OS thread pool, tpool, which has EVENTLET_THREADPOOL_SIZE
+# threads, so the hub keeps serving other requests and sockets. NumPy, hashlib and the
+# lightning simulator release the GIL while they work. Without monkey-patching, as in
+# `python -m migrations`, scripts and gunicorn sync workers, it simply calls fn.
+#
+# Code run this way must not block on green primitives: a contended green lock cannot be
+# woken from another OS thread. Share state between such calls with native locks
+# (patcher.original("threading")).
+native_threading = patcher.original("threading")
+
+
+def run_blocking(fn, *args, **kwargs):
+    if patcher.is_monkey_patched("thread"):
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
@@ -0,0 +1,178 @@
+import os
+import resource
+import time
+import tracemalloc
+
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from hyperparameters import N_COMPONENTS, PREPROCESS_MODES
+from modelregistry import PREPROCESS_VERSION, STREAMING_PREPROCESS_VERSION
+from telemetry import registry, span
+
+# "memory" is the original pipeline (SMOTE -> scale -> PCA on full copies of the data).
+# "streaming" never holds more than PREPROCESS_CHUNK_ROWS raw rows: the scaler and
+# IncrementalPCA are fitted chunk by chunk, and oversampling runs on the
+# (rows, n_components) projection instead of the 30-column matrix.
+# "auto" picks streaming once the raw matrix is larger than PREPROCESS_MEMORY_BUDGET_MB.
+PREPROCESS_MODE = os.getenv("PREPROCESS_MODE", "auto")
+PREPROCESS_CHUNK_ROWS = int(os.getenv("PREPROCESS_CHUNK_ROWS", "100000"))
+PREPROCESS_MEMORY_BUDGET_MB = float(os.getenv("PREPROCESS_MEMORY_BUDGET_MB", "512"))
+# tracemalloc makes preprocessing several times slower, so the Python-heap high-water mark
+# is only measured on request (benchmarks, PREPROCESS_TRACE_MEMORY=true); otherwise the
+# stats carry the process's peak RSS, which costs nothing to read
+PREPROCESS_TRACE_MEMORY = os.getenv("PREPROCESS_TRACE_MEMORY", "false").lower() in ("1", "true", "yes")
+
+# Fast training: TRAINING_SAMPLE_BUDGET > 0 trains on a stratified, class-balanced sample of
+# at most that many rows instead of the whole project; per-epoch metrics then use a fixed
+# VALIDATION_ROWS subset of the test split. 0 keeps full-data training.
+TRAINING_SAMPLE_BUDGET = int(os.getenv("TRAINING_SAMPLE_BUDGET", "0"))
+VALIDATION_ROWS = int(os.getenv("VALIDATION_ROWS", "1000"))
+SAMPLE_SEED = 42
+
+
+def resolve_preprocess_mode(X, mode=None):
+    mode = mode or PREPROCESS_MODE
+    if mode == "auto":
+        return "streaming" if X.nbytes / 1e6 > PREPROCESS_MEMORY_BUDGET_MB else "memory"
+    if mode not in PREPROCESS_MODES:
+        raise ValueError(f"Unknown preprocessing mode: {mode}")
+    return mode
+
+
+def preprocess_version(mode, n_components=N_COMPONENTS):
+    version = STREAMING_PREPROCESS_VERSION if mode == "streaming" else PREPROCESS_VERSION
+    return version if n_components == N_COMPONENTS else f"{version}-k{n_components}"
+
+
+def stratified_sample_indices(y, budget, seed=SAMPLE_SEED):
+    # Up to budget // n_classes rows per class; a class with fewer rows is taken whole and
+    # SMOTE tops it up later. Indices come back sorted so memory-mapped reads stay sequential.
+    y = np.asarray(y)
+    classes = np.unique(y)
+    per_class = max(1, budget // len(classes))
+    rng = np.random.default_rng(seed)
+    picks = []
+    for label in classes:
+        members = np.flatnonzero(y == label)
+        if len(members) > per_class:
+            members = rng.choice(members, per_class, replace=False)
+        picks.append(members)
+    return np.sort(np.concatenate(picks))
+
+
+def validation_subset(X, y, n_rows=VALIDATION_ROWS, seed=SAMPLE_SEED):
+    if not n_rows or len(y) <= n_rows:
+        return X, y
+    _, X_val, _, y_val = train_test_split(
+        X, y, test_size=n_rows, random_state=seed, stratify=y if len(np.unique(y)) > 1 else None
+    )
+    return X_val, y_val
+
+
+def _oversample(X, y):
+    if len(np.unique(y)) > 1 and len(y) > 10:
+        with span("smote"):
+            return SMOTE(random_state=42).fit_resample(X, y)
+    return X, y
+
+
+def _split(X, y):
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+
+def _chunk_bounds(n_rows, chunk_rows, min_rows):
+    # IncrementalPCA needs at least n_components rows per batch, so a short tail is
+    # folded into the previous chunk
+    bounds = [(start, min(start + chunk_rows, n_rows)) for start in range(0, n_rows, chunk_rows)]
+    if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] < min_rows:
+        bounds[-2:] = [(bounds[-2][0], n_rows)]
+    return bounds
+
+
+def preprocess_in_memory(X, y, n_components=N_COMPONENTS):
+    X_res, y_res = _oversample(X, y)
+
+    scaler = StandardScaler()
+    with span("scale"):
+        X_scaled = scaler.fit_transform(X_res)
+    n_components = min(n_components, X_scaled.shape[1])
+    pca = PCA(n_components=n_components)
+    with span("pca"):
+        X_pca = pca.fit_transform(X_scaled)
+
+    return (scaler, pca, *_split(X_pca, y_res))
+
+
+def preprocess_streaming(X, y, chunk_rows=PREPROCESS_CHUNK_ROWS, n_components=N_COMPONENTS, scaler=None):
+    # X may be a memory map; each pass reads it one chunk at a time. A scaler already fitted
+    # on exactly these rows (e.g. from the ingest-time moments) saves the first pass.
+    n_components = min(n_components, X.shape[1])
+    bounds = _chunk_bounds(len(X), max(chunk_rows, n_components), n_components)
+
+    if scaler is None:
+        scaler = StandardScaler()
+        with span("scale"):
+            for start, stop in bounds:
+                scaler.partial_fit(X[start:stop])
+
+    pca = IncrementalPCA(n_components=n_components)
+    with span("pca"):
+        for start, stop in bounds:
+            pca.partial_fit(scaler.transform(X[start:stop]))
+
+        X_pca = np.empty((len(X), n_components), dtype=np.float64)
+        for start, stop in bounds:
+            X_pca[start:stop] = pca.transform(scaler.transform(X[start:stop]))
+
+    X_res, y_res = _oversample(X_pca, np.asarray(y))
+    return (scaler, pca, *_split(X_res, y_res))
+
+
+def run_preprocessing(X, y, mode=None, chunk_rows=PREPROCESS_CHUNK_ROWS, n_components=N_COMPONENTS,
+                      scaler=None, trace_memory=None):
+    # Returns (scaler, pca, X_train, X_test, y_train, y_test, stats) where stats records
+    # the mode, throughput, the process's peak RSS and, with trace_memory, the Python-heap
+    # high-water mark of this call (NumPy buffers included).
+    # A prefitted scaler is only used in streaming mode, where scaling precedes SMOTE.
+    mode = resolve_preprocess_mode(X, mode)
+    trace_memory = PREPROCESS_TRACE_MEMORY if trace_memory is None else trace_memory
+    tracing = tracemalloc.is_tracing()
+    if trace_memory:
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    peak = None
+    start = time.perf_counter()
+    try:
+        if mode == "streaming":
+            outputs = preprocess_streaming(X, y, chunk_rows, n_components, scaler)
+        else:
+            outputs = preprocess_in_memory(X, y, n_components)
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if trace_memory and not tracing:
+            tracemalloc.stop()
+    duration = time.perf_counter() - start
+
+    stats = {
+        "mode": mode,
+        "rows": len(X),
+        "chunk_rows": chunk_rows if mode == "streaming" else None,
+        "scaler_from_moments": mode == "streaming" and scaler is not None,
+        "duration_sec": round(duration, 3),
+        "rows_per_sec": round(len(X) / duration) if duration else None,
+        "peak_mem_mb": round(peak / 1e6, 1) if peak is not None else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 / 1e6, 1),
+        "raw_data_mb": round(X.nbytes / 1e6, 1),
+    }
+    if peak is not None:
+        registry.set_max("preprocess_peak_bytes", peak, mode=mode)
+    memory = f"heap peak {stats['peak_mem_mb']} MB" if peak is not None else f"peak RSS {stats['peak_rss_mb']} MB"
+    print(f"🧮 Preprocessed {len(X)} rows ({mode}) in {duration:.2f}s, {memory}")
+    return (*outputs, stats)
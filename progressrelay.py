@@ -0,0 +1,99 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+PROGRESS_MIN_INTERVAL_SEC = float(os.getenv("PROGRESS_MIN_INTERVAL_SEC", "0.5"))
+
+
+def project_room(project_name):
+    return f"project:{project_name}"
+
+
+class ProgressRelay:
+    # Any thread (ingest tasks, scheduler event pumps, request handlers) publishes here;
+    # one background task owns the actual Socket.IO emits.
+    #  * publish(..., key=...) marks an event as coalescible: only the newest payload per
+    #    key is kept, and a key is emitted at most once every min_interval seconds.
+    #  * events without a key (completions, errors) go out immediately, after anything
+    #    still pending for the same room so clients never see progress after completion.
+
+    def __init__(self, emit, min_interval=PROGRESS_MIN_INTERVAL_SEC, start_background_task=None,
+                 sleep=time.sleep):
+        self._emit = emit  # emit(event, data, room)
+        self.min_interval = min_interval
+        self._start_background_task = start_background_task or self._start_thread
+        self._sleep = sleep
+        self._queue = queue.Queue()
+        self._pending = OrderedDict()
+        self._last_sent = {}
+        self._started = False
+        self._lock = threading.Lock()
+        self.published = 0
+        self.emitted = 0
+
+    @staticmethod
+    def _start_thread(target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._start_background_task(self._run)
+
+    def publish(self, event, data, room=None, key=None):
+        self.published += 1
+        self._queue.put((event, data, room, key))
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "emitted": self.emitted,
+            "pending": len(self._pending),
+            "queued": self._queue.qsize(),
+        }
+
+    # ---------------- Delivery loop ---------------- #
+    def _run(self):
+        while True:
+            try:
+                self._drain()
+                self._flush()
+            except Exception as e:
+                print("❌ Error in progress relay:", e)
+            self._sleep(self.min_interval / 4)
+
+    def _drain(self):
+        while True:
+            try:
+                event, data, room, key = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if key is None:
+                self._flush(room=room, force=True)
+                self._send(event, data, room)
+                # A final event ends the room's current job; forget its throttle timestamps
+                for sent_key in [k for k in self._last_sent if k[0] == room]:
+                    del self._last_sent[sent_key]
+            else:
+                self._pending[(room, event, key)] = data
+
+    def _flush(self, room=None, force=False):
+        now = time.monotonic()
+        for pending_key in list(self._pending):
+            pending_room, event, _ = pending_key
+            if room is not None and pending_room != room:
+                continue
+            if not force and now - self._last_sent.get(pending_key, 0) < self.min_interval:
+                continue
+            self._last_sent[pending_key] = now
+            self._send(event, self._pending.pop(pending_key), pending_room)
+
+    def _send(self, event, data, room):
+        self.emitted += 1
+        self._emit(event, data, room)
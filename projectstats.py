@@ -0,0 +1,198 @@
+import json
+import threading
+
+import numpy as np
+
+import db
+from createoperations import FEATURE_COLUMNS
+from transactionstore import display_values, iter_project_blocks
+
+REBUILD_FETCH_ROWS = 50000
+
+# Per-project aggregates kept in project_stats and updated in the same transaction as each
+# ingested chunk: row count, labelled rows, fraud count and, per feature column, the
+# non-missing count, min, max, mean and M2 (sum of squared deviations), merged chunk by
+# chunk with Chan et al.'s pairwise update. Every update bumps the project's version; the
+# in-process cache below (one per web worker) re-reads a project only when its stored version
+# moved. A project's row is never deleted, only emptied (moments "null") with yet another
+# version, so a version number is never reused and no worker can take old numbers for current.
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def chunk_moments(features, labels):
+    # features: (n_features, n_rows) as produced by insertoperations.chunk_to_columns
+    labelled = ~np.isnan(labels.astype(np.float64))
+    if not np.isnan(features).any():
+        mean = features.mean(axis=1)
+        return {
+            "rows": int(labels.shape[0]),
+            "labelled_rows": int(labelled.sum()),
+            "fraud_count": int(labels[labelled].sum()),
+            "count": [features.shape[1]] * features.shape[0],
+            "mean": mean.tolist(),
+            "m2": np.einsum("ij,ij->i", features - mean[:, None], features - mean[:, None]).tolist(),
+            "min": features.min(axis=1).tolist(),
+            "max": features.max(axis=1).tolist(),
+        }
+
+    count = np.sum(~np.isnan(features), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, np.nansum(features, axis=1) / np.maximum(count, 1), 0.0)
+        m2 = np.nansum((features - mean[:, None]) ** 2, axis=1)
+    empty = count == 0
+    return {
+        "rows": int(labels.shape[0]),
+        "labelled_rows": int(labelled.sum()),
+        "fraud_count": int(labels[labelled].sum()),
+        "count": count.tolist(),
+        "mean": mean.tolist(),
+        "m2": m2.tolist(),
+        "min": np.where(empty, np.inf, np.nanmin(np.where(empty[:, None], 0, features), axis=1)).tolist(),
+        "max": np.where(empty, -np.inf, np.nanmax(np.where(empty[:, None], 0, features), axis=1)).tolist(),
+    }
+
+
+def merge_moments(a, b):
+    if a is None:
+        return b
+    n_a, n_b = np.array(a["count"], dtype=np.float64), np.array(b["count"], dtype=np.float64)
+    n = n_a + n_b
+    mean_a, mean_b = np.array(a["mean"]), np.array(b["mean"])
+    delta = mean_b - mean_a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, mean_a + delta * n_b / np.maximum(n, 1), 0.0)
+        m2 = np.array(a["m2"]) + np.array(b["m2"]) + np.where(n > 0, delta ** 2 * n_a * n_b / np.maximum(n, 1), 0.0)
+    return {
+        "rows": a["rows"] + b["rows"],
+        "labelled_rows": a["labelled_rows"] + b["labelled_rows"],
+        "fraud_count": a["fraud_count"] + b["fraud_count"],
+        "count": n.astype(np.int64).tolist(),
+        "mean": mean.tolist(),
+        "m2": m2.tolist(),
+        "min": np.minimum(a["min"], b["min"]).tolist(),
+        "max": np.maximum(a["max"], b["max"]).tolist(),
+    }
+
+
+def update_project_stats(conn, project_name, features, labels):
+    # Called inside the ingest chunk's write transaction
+    row = conn.execute(
+        "SELECT moments FROM project_stats WHERE project_name = ?", (project_name,)
+    ).fetchone()
+    moments = merge_moments(json.loads(row[0]) if row else None, chunk_moments(features, labels))
+    conn.execute(
+        """
+        INSERT INTO project_stats (project_name, version, rows, fraud_count, moments, updated_at)
+        VALUES (?, 1, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(project_name) DO UPDATE SET
+            version = version + 1, rows = excluded.rows, fraud_count = excluded.fraud_count,
+            moments = excluded.moments, updated_at = CURRENT_TIMESTAMP
+        """,
+        (project_name, moments["rows"], moments["fraud_count"], json.dumps(moments))
+    )
+
+
+def reset_project_stats(conn, project_name):
+    # For anything that removes a project's rows; the next read rebuilds from transactions
+    conn.execute(
+        "UPDATE project_stats SET version = version + 1, rows = 0, fraud_count = 0, moments = 'null', "
+        "updated_at = CURRENT_TIMESTAMP WHERE project_name = ?",
+        (project_name,)
+    )
+
+
+def rebuild_project_stats(project_name):
+    # Backfill for projects ingested before project_stats existed: one pass over SQLite
+    moments = None
+    with db.read_connection() as conn:
+        for X, labels in iter_project_blocks(conn, project_name, REBUILD_FETCH_ROWS):
+            moments = merge_moments(moments, chunk_moments(np.ascontiguousarray(X.T), labels))
+    if moments is None:
+        return
+    with db.transaction() as conn:
+        # Fills a missing or reset row only: an ingest that got there first already has the moments
+        conn.execute(
+            """
+            INSERT INTO project_stats (project_name, version, rows, fraud_count, moments) VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT(project_name) DO UPDATE SET
+                version = version + 1, rows = excluded.rows, fraud_count = excluded.fraud_count,
+                moments = excluded.moments, updated_at = CURRENT_TIMESTAMP
+            WHERE moments = 'null'
+            """,
+            (project_name, moments["rows"], moments["fraud_count"], json.dumps(moments))
+        )
+
+
+def _summarise(project_name, version, moments):
+    count = np.array(moments["count"], dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.where(count > 0, np.array(moments["m2"]) / np.maximum(count, 1), np.nan)
+    columns = {
+        column: {
+            "count": int(count[i]),
+            "min": float(display_values(moments["min"][i])) if count[i] else None,
+            "max": float(display_values(moments["max"][i])) if count[i] else None,
+            "mean": moments["mean"][i] if count[i] else None,
+            "variance": float(variance[i]) if count[i] else None,
+        }
+        for i, column in enumerate(FEATURE_COLUMNS)
+    }
+    labelled = moments["labelled_rows"]
+    return {
+        "project_name": project_name,
+        "version": version,
+        "rows": moments["rows"],
+        "labelled_rows": labelled,
+        "fraud_count": moments["fraud_count"],
+        "fraud_ratio": round(moments["fraud_count"] / labelled, 6) if labelled else None,
+        "columns": columns,
+    }
+
+
+def get_project_stats(project_name, rebuild=True):
+    # O(1): a primary-key version lookup, and the moments are only re-read when it changed
+    row = db.fetch_one(
+        "SELECT version, moments = 'null' FROM project_stats WHERE project_name = ?", (project_name,), as_dict=False
+    )
+    if row is None or row[1]:
+        if not rebuild:
+            return None
+        rebuild_project_stats(project_name)
+        return get_project_stats(project_name, rebuild=False)
+
+    with _cache_lock:
+        cached = _cache.get(project_name)
+    if cached is not None and cached["version"] == row[0]:
+        return cached
+
+    row = db.fetch_one(
+        "SELECT version, moments FROM project_stats WHERE project_name = ?", (project_name,), as_dict=False
+    )
+    if row is None or row[1] == "null":
+        return None
+    stats = _summarise(project_name, row[0], json.loads(row[1]))
+    with _cache_lock:
+        _cache[project_name] = stats
+    return stats
+
+
+def scaler_from_stats(stats):
+    # A fitted StandardScaler equivalent to partial_fit over every row of the project,
+    # or None when a column has missing values (the scaler would need per-column counts).
+    # Only the training worker needs it, so sklearn stays out of the web process.
+    from sklearn.preprocessing import StandardScaler
+
+    counts = {column["count"] for column in stats["columns"].values()}
+    if counts != {stats["rows"]} or not stats["rows"]:
+        return None
+    mean = np.array([column["mean"] for column in stats["columns"].values()])
+    var = np.array([column["variance"] for column in stats["columns"].values()])
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+    scaler.n_samples_seen_ = np.int64(stats["rows"])
+    scaler.n_features_in_ = len(mean)
+    return scaler
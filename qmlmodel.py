@@ -1,134 +1,335 @@
 import time
 import numpy as np
-import pandas as pd
-import sqlite3
-from sklearn.model_selection import train_test_split
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import (
-    accuracy_score, f1_score, roc_auc_score, classification_report, roc_curve, confusion_matrix
-)
-from imblearn.over_sampling import SMOTE
 import pennylane as qml
 from pennylane import numpy as pnp
 
+from featurestore import load_project_arrays
+from hyperparameters import circuit_options, resolve_hyperparameters, weight_shape
 from insertoperations import save_project_summary
-
-def run_qml_model(project_name, include_confusion_matrix=False, progress_callback=None):
-    import time
-    conn = sqlite3.connect("database.db")
-    query = """
-        SELECT Time, V1, V2, V3, V4, V5, V6, V7, V8, V9,
-               V10, V11, V12, V13, V14, V15, V16, V17,
-               V18, V19, V20, V21, V22, V23, V24, V25,
-               V26, V27, V28, Amount, Class
-        FROM transactions
-        WHERE project_name = ?
-    """
-    df = pd.read_sql_query(query, conn, params=(project_name,))
-    conn.close()
-
-    if df.empty:
-        raise ValueError(f"No data found for project: {project_name}")
-
-    X = df.drop("Class", axis=1).values
-    y = df["Class"].values
-
-    if len(np.unique(y)) > 1 and len(y) > 10:
-        X_res, y_res = SMOTE(random_state=42).fit_resample(X, y)
-    else:
-        X_res, y_res = X, y
-
-    X_scaled = StandardScaler().fit_transform(X_res)
-    n_components = min(2, X_scaled.shape[1])
-    pca = PCA(n_components=n_components)
-    X_pca = pca.fit_transform(X_scaled)
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_pca, y_res, test_size=0.2, random_state=42, stratify=y_res
-    )
-
-    # ---------------- Quantum Circuit ---------------- #
-    n_qubits = n_components
-    dev = qml.device("lightning.qubit", wires=n_qubits)
-
-    def feature_map(x):
-        qml.AngleEmbedding(x, wires=range(n_qubits), rotation='Y')
-
-    def variational_block(weights):
-        for i in range(n_qubits):
-            qml.Rot(*weights[i], wires=i)
-        for i in range(n_qubits - 1):
-            qml.CNOT(wires=[i, i + 1])
-
-    @qml.qnode(dev)
+from metrics import (
+    METRICS_EPOCH_EXACT_MAX_ROWS, METRICS_EXACT_MAX_ROWS, binary_metrics, classification_report_dict,
+    streaming_metrics
+)
+from preprocessing import (
+    N_COMPONENTS, TRAINING_SAMPLE_BUDGET, preprocess_version, resolve_preprocess_mode, run_preprocessing,
+    stratified_sample_indices, validation_subset
+)
+from modelregistry import (
+    data_fingerprint, load_preprocessed, load_warm_start_weights, save_model, save_preprocessed
+)
+from projectstats import get_project_stats, scaler_from_stats
+from telemetry import span
+from transactionstore import load_project_rows
+
+EVAL_CHUNK_ROWS = 65536
+# A broadcast evaluation holds one state vector per row: chunks shrink as the circuit widens
+# so a chunk stays at about this many amplitudes (16 MiB of complex128)
+EVAL_CHUNK_AMPLITUDES = 2 ** 20
+
+# ---------------- Quantum Circuit ---------------- #
+def feature_map(x, n_qubits):
+    qml.AngleEmbedding(x, wires=range(n_qubits), rotation='Y')
+
+def variational_block(weights, n_qubits):
+    for i in range(n_qubits):
+        qml.Rot(*weights[i], wires=i)
+    for i in range(n_qubits - 1):
+        qml.CNOT(wires=[i, i + 1])
+
+def ring_block(weights, n_qubits):
+    variational_block(weights, n_qubits)
+    if n_qubits > 2:
+        qml.CNOT(wires=[n_qubits - 1, 0])
+
+def ry_cz_block(weights, n_qubits):
+    for i in range(n_qubits):
+        qml.RY(weights[i][0], wires=i)
+    for i in range(n_qubits - 1):
+        qml.CZ(wires=[i, i + 1])
+
+# name -> circuit block (parameters per qubit: hyperparameters.ANSATZ_PARAMS)
+ANSATZES = {
+    "rot_cnot": variational_block,
+    "rot_ring": ring_block,
+    "ry_cz": ry_cz_block,
+}
+
+OPTIMIZERS = {
+    "gd": qml.GradientDescentOptimizer,
+    "momentum": qml.MomentumOptimizer,
+    "adagrad": qml.AdagradOptimizer,
+    "adam": qml.AdamOptimizer,
+}
+
+def build_circuit(n_qubits, device_name="lightning.qubit", diff_method="best", ansatz="rot_cnot", n_layers=1,
+                  reupload=False):
+    # default.qubit otherwise seeds itself from the global NumPy RNG, which would shift
+    # the weight initialisation and minibatch sampling that follow
+    device_kwargs = {"seed": None} if device_name == "default.qubit" else {}
+    dev = qml.device(device_name, wires=n_qubits, **device_kwargs)
+
+    block = ANSATZES[ansatz]
+
+    @qml.qnode(dev, diff_method=diff_method)
     def quantum_circuit(x, weights):
-        feature_map(x)
-        variational_block(weights)
+        # weights: (n_qubits, params) for one layer, (n_layers, n_qubits, params) otherwise
+        for layer in range(n_layers):
+            if layer == 0 or reupload:
+                feature_map(x, n_qubits)
+            block(weights[layer] if n_layers > 1 else weights, n_qubits)
         return qml.expval(qml.PauliZ(0))
 
-    weights = pnp.array(pnp.random.randn(n_qubits, 3), requires_grad=True)
+    return quantum_circuit
+
+def eval_chunk_rows(n_qubits):
+    return max(1, min(EVAL_CHUNK_ROWS, EVAL_CHUNK_AMPLITUDES >> n_qubits))
+
+def predict_batch(circuit, X, weights, chunk_rows=None):
+    # One broadcast circuit call per chunk of rows instead of one call per row
+    chunk_rows = chunk_rows or eval_chunk_rows(X.shape[1])
+    weights = pnp.array(weights, requires_grad=False)
+    with span("circuit_eval"):
+        probs = [
+            (np.asarray(circuit(pnp.array(X[i:i + chunk_rows], requires_grad=False), weights)) + 1) / 2
+            for i in range(0, len(X), chunk_rows)
+        ]
+    return np.concatenate(probs) if probs else np.empty(0)
+
+def load_training_arrays(project_name):
+    with span("load_training_data"):
+        return _load_training_arrays(project_name)
+
+def _load_training_arrays(project_name):
+    X, y = load_project_arrays(project_name)
+    if X is None:
+        # Projects the feature store cannot hold (e.g. rows without a Class) still train from SQLite
+        X, y = load_project_rows(project_name)
+        if X is None:
+            raise ValueError(f"No data found for project: {project_name}")
+    return X, y
+
+def prepare_training_data(project_name, X, y, preprocess_mode=None, sample_budget=None,
+                          n_components=N_COMPONENTS):
+    # Sampling, preprocessing (cached per data fingerprint) and the validation subset
+    total_samples = len(y)
+
+    # ---------------- Fast training: stratified sample budget ---------------- #
+    sample_budget = TRAINING_SAMPLE_BUDGET if sample_budget is None else int(sample_budget)
+    fast_mode = 0 < sample_budget < total_samples
+    if fast_mode:
+        sample_idx = stratified_sample_indices(y, sample_budget)
+        X, y = np.asarray(X[sample_idx]), np.asarray(y[sample_idx])
+        print(f"⚡ Fast training on {len(y)} of {total_samples} rows for {project_name}")
+
+    # ---------------- Preprocessing (cached per data fingerprint) ---------------- #
+    preprocess_mode = resolve_preprocess_mode(X, preprocess_mode)
+    version = preprocess_version(preprocess_mode, n_components)
+    # In fast mode the fingerprint covers the sample, which is all the pipeline was fitted on
+    fingerprint = data_fingerprint(X, y, f"{version}-budget{sample_budget}" if fast_mode else version)
+    cached = load_preprocessed(project_name, fingerprint)
+    if cached is not None:
+        print(f"♻️ Reusing cached preprocessing for {project_name}@{fingerprint}")
+        scaler, pca = cached["scaler"], cached["pca"]
+        X_train, X_test = cached["X_train"], cached["X_test"]
+        y_train, y_test = cached["y_train"], cached["y_test"]
+        preprocess_stats = {"mode": preprocess_mode, "cached": True}
+    else:
+        # Streaming mode scales the raw rows, so on the full project the ingest-time moments
+        # give the scaler without another pass over the data
+        scaler = None
+        if preprocess_mode == "streaming" and not fast_mode:
+            stats = get_project_stats(project_name)
+            if stats is not None and stats["rows"] == total_samples:
+                scaler = scaler_from_stats(stats)
+        scaler, pca, X_train, X_test, y_train, y_test, preprocess_stats = run_preprocessing(
+            X, y, preprocess_mode, n_components=n_components, scaler=scaler
+        )
+        save_preprocessed(project_name, fingerprint, scaler, pca, X_train, X_test, y_train, y_test)
+
+    # Per-epoch metrics run on a fixed subset in fast mode; the full test split only at the end
+    X_val, y_val = validation_subset(X_test, y_test) if fast_mode else (X_test, y_test)
+
+    return {
+        "fingerprint": fingerprint,
+        "scaler": scaler,
+        "pca": pca,
+        "X_train": X_train,
+        "y_train": y_train,
+        "X_test": X_test,
+        "y_test": y_test,
+        "X_val": X_val,
+        "y_val": y_val,
+        "sample_budget": sample_budget if fast_mode else None,
+        "cached": cached is not None,
+        "preprocessing": preprocess_stats,
+    }
+
+def make_predictors(n_qubits, ansatz="rot_cnot", batched=True, n_layers=1, reupload=False, backend="auto"):
+    # Returns (predict_all, loss_fn) for one circuit configuration
+    circuit = {"ansatz": ansatz, "n_layers": n_layers, "reupload": reupload}
+    if batched and backend == "auto":
+        # Gradients: one adjoint-differentiated call per minibatch on lightning.
+        # Evaluation: the same circuit broadcast over whole arrays on default.qubit.
+        train_circuit = build_circuit(n_qubits, "lightning.qubit", diff_method="adjoint", **circuit)
+        eval_circuit = build_circuit(n_qubits, "default.qubit", diff_method="backprop", **circuit)
+    elif batched and backend == "lightning.qubit":
+        train_circuit = eval_circuit = build_circuit(n_qubits, "lightning.qubit", diff_method="adjoint", **circuit)
+    elif batched:
+        train_circuit = eval_circuit = build_circuit(n_qubits, "default.qubit", diff_method="backprop", **circuit)
+    else:
+        device_name = "default.qubit" if backend == "default.qubit" else "lightning.qubit"
+        train_circuit = eval_circuit = build_circuit(n_qubits, device_name, **circuit)
 
     def predict(x, weights):
         x = pnp.array(x, requires_grad=False)  # ✅ FIX: Ensure compatibility
-        return (quantum_circuit(x, weights) + 1) / 2
+        return (train_circuit(x, weights) + 1) / 2
+
+    def predict_all(X, weights):
+        if batched:
+            return predict_batch(eval_circuit, X, weights)
+        return np.array([predict(x, weights) for x in X])
 
     def loss_fn(X, y, weights):
-        preds = [predict(x, weights) for x in X]
-        preds = pnp.clip(pnp.array(preds), 1e-6, 1 - 1e-6)
+        preds = predict(X, weights) if batched else pnp.array([predict(x, weights) for x in X])
+        preds = pnp.clip(preds, 1e-6, 1 - 1e-6)
         return -pnp.mean(y * pnp.log(preds) + (1 - y) * pnp.log(1 - preds))
 
-    # ---------------- Training ---------------- #
-    opt = qml.GradientDescentOptimizer(stepsize=0.1)
-    epochs = 10
-    batch_size = min(64, len(X_train))
+    return predict_all, loss_fn
 
-    loss_history, acc_history, f1_history, auc_history = [], [], [], []
+def fit_weights(X_train, y_train, X_val, y_val, weights, hyperparameters, predict_all, loss_fn, on_epoch=None):
+    # Minibatch training loop. on_epoch(epoch, metrics) may return True to stop early.
+    # Returns the final weights, the metric curves and the last validation predictions.
+    opt = OPTIMIZERS[hyperparameters["optimizer"]](stepsize=hyperparameters["stepsize"])
+    epochs = hyperparameters["epochs"]
+    batch_size = min(hyperparameters["batch_size"], len(X_train))
+
+    history = {"loss": [], "accuracy": [], "f1": [], "auc": []}
 
     for epoch in range(1, epochs + 1):
         epoch_start = time.time()
 
-        batch_size = min(batch_size, len(X_train))
         batch_idx = np.random.choice(len(X_train), batch_size, replace=False)
         X_batch, y_batch = X_train[batch_idx], y_train[batch_idx]
 
-        weights, batch_loss = opt.step_and_cost(lambda w: loss_fn(X_batch, y_batch, w), weights)
-        loss_history.append(float(batch_loss))
+        with span("gradient_step"):
+            weights, batch_loss = opt.step_and_cost(lambda w: loss_fn(X_batch, y_batch, w), weights)
+
+        y_val_probs = predict_all(X_val, weights)
+        with span("epoch_metrics"):
+            val_metrics = binary_metrics(
+                y_val, y_val_probs, approximate=len(y_val) > METRICS_EPOCH_EXACT_MAX_ROWS
+            )
+        acc_val, f1_val, auc_val = val_metrics["accuracy"], val_metrics["f1"], val_metrics["auc"]
+
+        history["loss"].append(float(batch_loss))
+        history["accuracy"].append(acc_val)
+        history["f1"].append(f1_val)
+        history["auc"].append(auc_val)
+
+        if on_epoch and on_epoch(epoch, {
+            "loss": float(batch_loss),
+            "accuracy": float(acc_val),
+            "f1": float(f1_val),
+            "auc": float(auc_val),
+            "duration_sec": round(time.time() - epoch_start, 2)
+        }):
+            break
+
+    return weights, history, y_val_probs
+
+def final_metrics(data, predict_all, weights, y_val_probs):
+    # Metrics with the ROC curve on the whole test split for the final weights
+    X_test, y_test = data["X_test"], data["y_test"]
+    if data["X_val"] is X_test:
+        # The last epoch already scored the whole test split with the final weights
+        return binary_metrics(y_test, y_val_probs, include_roc=True)
+    if len(X_test) > METRICS_EXACT_MAX_ROWS:
+        return streaming_metrics(
+            lambda X: predict_all(X, weights), X_test, y_test, EVAL_CHUNK_ROWS, include_roc=True
+        )
+    return binary_metrics(y_test, predict_all(X_test, weights), include_roc=True)
+
+def build_results(project_name, total_samples, data, final, history, include_confusion_matrix, details):
+    # The {summary, charts, classification_report} payload every trained model returns;
+    # details are the model-specific summary fields
+    def downsample(arr, step=10):
+        return arr[::step].tolist()
 
-        y_val_probs = np.array([predict(x, weights) for x in X_test])
-        y_val = (y_val_probs > 0.5).astype(int)
+    return {
+        "summary": {
+            "project": project_name,
+            "total_samples": total_samples,
+            "train_size": len(data["X_train"]),
+            "test_size": len(data["X_test"]),
+            "validation_size": len(data["X_val"]),
+            "sample_budget": data["sample_budget"],
+            "accuracy": round(final["accuracy"], 4),
+            "f1_score": round(final["f1"], 4),
+            "roc_auc": round(final["auc"], 4),
+            **details
+        },
+        "charts": {
+            "loss_curve": history["loss"],
+            "accuracy_curve": history["accuracy"],
+            "f1_curve": history["f1"],
+            "auc_curve": history["auc"],
+            "roc_curve": {
+                "fpr": downsample(final["fpr"], 10),
+                "tpr": downsample(final["tpr"], 10),
+            },
+            **({"confusion_matrix": final["confusion_matrix"]} if include_confusion_matrix else {}),
+        },
+        "classification_report": classification_report_dict(final["confusion_matrix"])
+    }
 
-        acc_val = accuracy_score(y_test, y_val)
-        f1_val = f1_score(y_test, y_val)
-        auc_val = roc_auc_score(y_test, y_val_probs) if len(np.unique(y_test)) > 1 else 0.5
+def run_qml_model(project_name, include_confusion_matrix=False, progress_callback=None, batched=True,
+                  warm_start=False, preprocess_mode=None, sample_budget=None, hyperparameters=None):
+    params = resolve_hyperparameters(hyperparameters)
+    X, y = load_training_arrays(project_name)
+    total_samples = len(y)
+    fraud_count = int(np.nansum(y))  # Count of frauds in original dataset
 
-        acc_history.append(acc_val)
-        f1_history.append(f1_val)
-        auc_history.append(auc_val)
+    data = prepare_training_data(project_name, X, y, preprocess_mode, sample_budget, params["n_components"])
+    fingerprint, pca = data["fingerprint"], data["pca"]
+    X_train, y_train = data["X_train"], data["y_train"]
 
+    # ---------------- Quantum Circuit ---------------- #
+    n_qubits = pca.n_components_
+    predict_all, loss_fn = make_predictors(n_qubits, batched=batched, backend=params["backend"],
+                                           **circuit_options(params))
+
+    shape = weight_shape(n_qubits, params["ansatz"], params["n_layers"])
+    saved_weights = load_warm_start_weights(project_name, fingerprint, shape, params) if warm_start else None
+    if saved_weights is not None:
+        print(f"🔥 Warm-starting {project_name} from saved weights")
+        weights = pnp.array(saved_weights, requires_grad=True)
+    else:
+        weights = pnp.array(pnp.random.randn(*shape), requires_grad=True)
+
+    # ---------------- Training ---------------- #
+    epochs = params["epochs"]
+    training_start = time.time()
+
+    def on_epoch(epoch, metrics):
         if progress_callback:
             progress_callback("training_progress", {
                 "project_name": project_name,
                 "epoch": epoch,
                 "total_epochs": epochs,
-                "loss": float(batch_loss),
-                "accuracy": float(acc_val),
-                "f1": float(f1_val),
-                "auc": float(auc_val),
+                **{name: metrics[name] for name in ("loss", "accuracy", "f1", "auc")},
                 "progress": round((epoch / epochs) * 100, 2),
-                "duration_sec": round(time.time() - epoch_start, 2)
+                "duration_sec": metrics["duration_sec"]
             })
 
-    # ---------------- Final Evaluation ---------------- #
-    y_pred_probs = np.array([predict(x, weights) for x in X_test])
-    y_pred = (y_pred_probs > 0.5).astype(int)
-
-    acc = accuracy_score(y_test, y_pred)
-    f1 = f1_score(y_test, y_pred)
-    roc = roc_auc_score(y_test, y_pred_probs) if len(np.unique(y_test)) > 1 else 0.5
-    fpr, tpr, _ = roc_curve(y_test, y_pred_probs) if len(np.unique(y_test)) > 1 else ([0, 1], [0, 1])
+    weights, history, y_val_probs = fit_weights(
+        X_train, y_train, data["X_val"], data["y_val"], weights, params, predict_all, loss_fn, on_epoch
+    )
+    loss_history = history["loss"]
+    training_sec = time.time() - training_start
 
-    cm = confusion_matrix(y_test, y_pred) if include_confusion_matrix else None
+    # ---------------- Final Evaluation ---------------- #
+    final = final_metrics(data, predict_all, weights, y_val_probs)
+    acc, f1, roc = final["accuracy"], final["f1"], final["auc"]
 
     if progress_callback:
         progress_callback("training_progress", {
@@ -144,39 +345,23 @@ def run_qml_model(project_name, include_confusion_matrix=False, progress_callbac
             "message": f"✅ Final Accuracy: {acc:.4f}, F1: {f1:.4f}, AUC: {roc:.4f}"
         })
 
-    def downsample(arr, step=10):
-        return arr[::step].tolist()
-
-    results = {
-        "summary": {
-            "project": project_name,
-            "total_samples": len(df),
-            "train_size": len(X_train),
-            "test_size": len(X_test),
-            "accuracy": round(acc, 4),
-            "f1_score": round(f1, 4),
-            "roc_auc": round(roc, 4),
-            "pca_variance": pca.explained_variance_ratio_.tolist()
-        },
-        "charts": {
-            "loss_curve": loss_history,
-            "accuracy_curve": acc_history,
-            "f1_curve": f1_history,
-            "auc_curve": auc_history,
-            "roc_curve": {
-                "fpr": downsample(fpr, 10),
-                "tpr": downsample(tpr, 10),
-            },
-            **({"confusion_matrix": cm.tolist()} if include_confusion_matrix else {}),
-        },
-        "classification_report": classification_report(y_test, y_pred, output_dict=True)
-    }
+    results = build_results(project_name, total_samples, data, final, history, include_confusion_matrix, {
+        "model": "quantum_circuit",
+        "pca_variance": pca.explained_variance_ratio_.tolist(),
+        "n_qubits": int(n_qubits),
+        "training_sec": round(training_sec, 2),
+        "model_fingerprint": fingerprint,
+        "preprocessing_cached": data["cached"],
+        "preprocessing": data["preprocessing"],
+        "warm_started": saved_weights is not None,
+        "hyperparameters": params
+    })
 
-    fraud_count = sum(y)  # Count of frauds in original dataset
+    save_model(project_name, fingerprint, weights, results["summary"], params)
 
     save_project_summary(
         project_name=project_name,
-        total_samples=len(df),
+        total_samples=total_samples,
         fraud_count=fraud_count,
         accuracy=acc,
         f1_score=f1,
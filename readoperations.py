@@ -0,0 +1,168 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+import db
+from createoperations import FEATURE_COLUMNS, TRANSACTION_COLUMNS
+from transactionstore import display_values, unpack_features
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+STREAM_FETCH_ROWS = 1000
+
+# Read specs for the list endpoints. Pages are keyset-paginated on `key` (never OFFSET), so
+# every page is an index seek no matter how deep the client has scrolled. `filters` maps
+# query-string names to columns; `columns` is the projection whitelist. `packed` columns
+# are read as their raw blob and decoded per batch instead of one SQL call per value.
+READ_SPECS = {
+    "transactions": {
+        "key": "id",
+        "descending": False,
+        "columns": ["id", "project_name"] + TRANSACTION_COLUMNS,
+        "filters": {"project_name": "project_name", "class": "Class"},
+        "packed": {"column": "features", "fields": FEATURE_COLUMNS},
+    },
+    "project_summary": {
+        "key": "id",
+        "descending": True,  # newest projects first, as before
+        "columns": ["id", "project_name", "total_samples", "fraud_count", "accuracy",
+                    "f1_score", "auc", "status", "created_at", "best_config", "best_score", "baseline_model",
+                    "baseline_accuracy", "baseline_f1_score", "baseline_auc"],
+        "filters": {"project_name": "project_name", "status": "status"},
+    },
+    "users": {
+        "key": "id",
+        "descending": False,
+        "columns": ["id", "username", "email"],  # passwords are never returned
+        "filters": {"email": "email"},
+    },
+}
+
+
+def parse_read_args(table, args):
+    spec = READ_SPECS[table]
+
+    columns = spec["columns"]
+    if args.get("columns"):
+        columns = [col.strip() for col in args["columns"].split(",") if col.strip()]
+        unknown = [col for col in columns if col not in spec["columns"]]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+    # The key is always returned so the client can ask for the next page
+    if spec["key"] not in columns:
+        columns = [spec["key"]] + columns
+
+    filters = {}
+    for name, column in spec["filters"].items():
+        if args.get(name) not in (None, ""):
+            filters[column] = args[name]
+
+    cursor = args.get("cursor")
+    limit = args.get("limit")
+    return {
+        "columns": columns,
+        "filters": filters,
+        "cursor": int(cursor) if cursor not in (None, "") else None,
+        "limit": int(limit) if limit not in (None, "") else None,
+    }
+
+
+def select_columns(table, columns):
+    # Columns to SELECT for the requested ones: packed fields are replaced by their blob
+    packed = READ_SPECS[table].get("packed")
+    if not packed or not any(col in packed["fields"] for col in columns):
+        return columns
+    return [col for col in columns if col not in packed["fields"]] + [packed["column"]]
+
+
+def decode_rows(table, columns, rows):
+    # Rows selected with select_columns() -> tuples in the requested column order
+    selected = select_columns(table, columns)
+    if selected is columns or not rows:
+        return rows
+    fields = READ_SPECS[table]["packed"]["fields"]
+    values = display_values(unpack_features([row[-1] for row in rows]))
+    if np.isnan(values).any():
+        values = np.where(np.isnan(values), None, values.astype(object))
+    by_column = {}
+    for col in columns:
+        if col in fields:
+            by_column[col] = values[:, fields.index(col)].tolist()
+        else:
+            position = selected.index(col)
+            by_column[col] = [row[position] for row in rows]
+    return list(zip(*(by_column[col] for col in columns)))
+
+
+def build_read_query(table, columns, filters, cursor=None, limit=None):
+    spec = READ_SPECS[table]
+    key = spec["key"]
+    columns = select_columns(table, columns)
+    where, params = [], []
+    for column, value in filters.items():
+        where.append(f"{column} = ?")
+        params.append(value)
+    if cursor is not None:
+        where.append(f"{key} {'<' if spec['descending'] else '>'} ?")
+        params.append(cursor)
+
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {key} {'DESC' if spec['descending'] else 'ASC'}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+
+def fetch_page(table, columns, filters, cursor=None, limit=None):
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    query, params = build_read_query(table, columns, filters, cursor, limit + 1)
+
+    rows = decode_rows(table, columns, db.fetch_all(query, params, as_dict=False))
+    rows = [dict(zip(columns, row)) for row in rows]
+
+    key = READ_SPECS[table]["key"]
+    next_cursor = rows[limit - 1][key] if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def fetch_best_config(project_name):
+    row = db.fetch_one("SELECT best_config FROM project_summary WHERE project_name = ?", (project_name,))
+    return json.loads(row["best_config"]) if row and row["best_config"] else None
+
+
+def iter_rows(table, columns, filters, cursor=None, limit=None):
+    # Generator over a live cursor: memory stays at one fetchmany() batch. Uses its own
+    # connection so a slow client cannot hold a pooled one for the whole download.
+    query, params = build_read_query(table, columns, filters, cursor, limit)
+    conn = db.connect()
+    try:
+        db_cursor = conn.execute(query, params)
+        while True:
+            batch = db_cursor.fetchmany(STREAM_FETCH_ROWS)
+            if not batch:
+                break
+            yield decode_rows(table, columns, batch)
+    finally:
+        conn.close()
+
+
+def stream_ndjson(table, columns, filters, cursor=None, limit=None):
+    for batch in iter_rows(table, columns, filters, cursor, limit):
+        yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in batch)
+
+
+def stream_csv(table, columns, filters, cursor=None, limit=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for batch in iter_rows(table, columns, filters, cursor, limit):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import db
+
+RESULT_BACKEND = os.getenv("RESULT_BACKEND", "sqlite")
+RESULT_TTL_SEC = float(os.getenv("RESULT_TTL_SEC", str(7 * 24 * 3600)))
+RESULT_HISTORY_PER_PROJECT = int(os.getenv("RESULT_HISTORY_PER_PROJECT", "20"))
+DECODED_CACHE_SIZE = 64
+
+
+def encode_payload(payload):
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_payload(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class ResultBackend:
+    # Stores one record per training run: {run_id, project_name, status, created_at, result}.
+    # Saving a run_id again replaces its record (a training stores its baseline first).
+
+    def save(self, project_name, run_id, status, payload):
+        raise NotImplementedError
+
+    def get(self, project_name, run_id=None):
+        # Latest run for the project when run_id is None
+        raise NotImplementedError
+
+    def history(self, project_name, limit=RESULT_HISTORY_PER_PROJECT):
+        raise NotImplementedError
+
+
+class MemoryResultBackend(ResultBackend):
+    def __init__(self, ttl_sec=RESULT_TTL_SEC, history_per_project=RESULT_HISTORY_PER_PROJECT):
+        self.ttl_sec = ttl_sec
+        self.history_per_project = history_per_project
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _live(self, project_name):
+        cutoff = time.time() - self.ttl_sec
+        return [run for run in self._runs.get(project_name, []) if run["created_at"] >= cutoff]
+
+    def save(self, project_name, run_id, status, payload):
+        record = {
+            "run_id": run_id,
+            "project_name": project_name,
+            "status": status,
+            "created_at": time.time(),
+            "result": payload,
+        }
+        with self._lock:
+            runs = [record] + [run for run in self._live(project_name) if run["run_id"] != run_id]
+            self._runs[project_name] = runs[:self.history_per_project]
+
+    def get(self, project_name, run_id=None):
+        with self._lock:
+            for run in self._live(project_name):
+                if run_id is None or run["run_id"] == run_id:
+                    return run
+        return None
+
+    def history(self, project_name, limit=RESULT_HISTORY_PER_PROJECT):
+        with self._lock:
+            return [{k: v for k, v in run.items() if k != "result"} for run in self._live(project_name)[:limit]]
+
+
+def create_task_runs_table():
+    with db.transaction() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS task_runs (
+                run_id TEXT PRIMARY KEY,
+                project_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_task_runs_project_created ON task_runs (project_name, created_at DESC)"
+        )
+
+
+class SQLiteResultBackend(ResultBackend):
+    # Payloads are stored as zlib-compressed JSON. Runs are immutable once written, so
+    # decoded payloads are kept in a small LRU and polling /task costs one indexed lookup.
+
+    def __init__(self, ttl_sec=RESULT_TTL_SEC, history_per_project=RESULT_HISTORY_PER_PROJECT):
+        self.ttl_sec = ttl_sec
+        self.history_per_project = history_per_project
+        self._decoded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, project_name, run_id, status, payload):
+        now = time.time()
+        blob = encode_payload(payload)
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO task_runs (run_id, project_name, status, payload, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, project_name, status, blob, now, now + self.ttl_sec)
+            )
+            # TTL eviction plus a per-project history cap, both done on write
+            conn.execute("DELETE FROM task_runs WHERE expires_at < ?", (now,))
+            conn.execute("""
+                DELETE FROM task_runs WHERE project_name = ? AND run_id NOT IN (
+                    SELECT run_id FROM task_runs WHERE project_name = ? ORDER BY created_at DESC LIMIT ?
+                )
+            """, (project_name, project_name, self.history_per_project))
+
+    def get(self, project_name, run_id=None):
+        if run_id is None:
+            record = db.fetch_one(
+                "SELECT run_id, project_name, status, created_at FROM task_runs "
+                "WHERE project_name = ? AND expires_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (project_name, time.time())
+            )
+        else:
+            record = db.fetch_one(
+                "SELECT run_id, project_name, status, created_at FROM task_runs "
+                "WHERE project_name = ? AND run_id = ? AND expires_at >= ?",
+                (project_name, run_id, time.time())
+            )
+        if record is None:
+            return None
+
+        # created_at is part of the key: a run saved again (baseline, then final results)
+        # must not be served from its earlier decoded payload
+        key = (record["run_id"], record["created_at"])
+        with self._lock:
+            cached = self._decoded.get(key)
+            if cached is not None:
+                self._decoded.move_to_end(key)
+        if cached is None:
+            blob = db.fetch_one(
+                "SELECT payload FROM task_runs WHERE run_id = ?", (record["run_id"],), as_dict=False
+            )[0]
+            cached = decode_payload(blob)
+            with self._lock:
+                self._decoded[key] = cached
+                while len(self._decoded) > DECODED_CACHE_SIZE:
+                    self._decoded.popitem(last=False)
+        record["result"] = cached
+        return record
+
+    def history(self, project_name, limit=RESULT_HISTORY_PER_PROJECT):
+        return db.fetch_all(
+            "SELECT run_id, project_name, status, created_at, length(payload) AS payload_bytes FROM task_runs "
+            "WHERE project_name = ? AND expires_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (project_name, time.time(), limit)
+        )
+
+
+def create_result_backend(name=RESULT_BACKEND):
+    if name == "memory":
+        return MemoryResultBackend()
+    if name == "sqlite":
+        return SQLiteResultBackend()
+    raise ValueError(f"Unknown result backend: {name}")
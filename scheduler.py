@@ -0,0 +1,360 @@
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import db
+
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+TRAINING_TIMEOUT_SEC = float(os.getenv("TRAINING_TIMEOUT_SEC", "3600"))
+POLL_INTERVAL_SEC = 0.2
+HEARTBEAT_SEC = 5
+STALE_AFTER_SEC = 30
+
+ACTIVE_STATUSES = ("queued", "running")
+# trainworker is imported from here whatever directory the server was started from
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TrainingJob:
+    # kind is "training" or "sweep"; it prefixes the job's events (training_complete, sweep_error, ...)
+    def __init__(self, project_name, options, priority=0, kind="training"):
+        self.job_id = uuid.uuid4().hex
+        self.project_name = project_name
+        self.kind = kind
+        self.options = options
+        self.priority = priority
+        self.status = "queued"
+        self.message = None
+        self.owner = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.finished_event = None
+        self.stream_done = False
+
+    @classmethod
+    def from_row(cls, row):
+        job = cls(row["project_name"], json.loads(row["options"]), row["priority"], row["kind"])
+        for name in ("job_id", "status", "message", "owner", "submitted_at", "started_at", "finished_at"):
+            setattr(job, name, row[name])
+        return job
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATUSES
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "project_name": self.project_name,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "options": self.options,
+            "message": self.message,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def create_training_jobs_table():
+    with db.transaction() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS training_jobs (
+                job_id TEXT PRIMARY KEY,
+                project_name TEXT NOT NULL,
+                kind TEXT NOT NULL DEFAULT 'training',
+                options TEXT NOT NULL DEFAULT '{}',
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'queued',
+                message TEXT,
+                owner TEXT,
+                submitted_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                heartbeat_at REAL
+            )
+        """)
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_training_jobs_active_project ON training_jobs (project_name) "
+            "WHERE status IN ('queued', 'running')"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_training_jobs_queue ON training_jobs (status, priority, submitted_at)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_training_jobs_project ON training_jobs (project_name, submitted_at DESC)"
+        )
+
+
+class TrainingScheduler:
+    # Runs at most max_workers trainings at once, each in its own `python -m trainworker`
+    # process so PennyLane simulation never competes with the web process's event loop.
+    #
+    # Job state lives in the training_jobs table, so every web worker sees the same queue:
+    #  * a partial unique index allows one queued/running job per project across workers;
+    #  * any worker's loop may claim the next queued job (lower priority number first, FIFO
+    #    within a priority) inside BEGIN IMMEDIATE while fewer than max_workers run in total;
+    #  * the claiming worker owns the subprocess and heartbeats the row; a cancel from any
+    #    worker flips the row and the owner terminates the process on its next pass;
+    #  * running jobs whose owner stopped heartbeating (crash, restart) are failed.
+
+    def __init__(self, on_event, max_workers=TRAINING_WORKERS, timeout_sec=TRAINING_TIMEOUT_SEC,
+                 start_background_task=None, sleep=time.sleep):
+        self.on_event = on_event
+        self.max_workers = max_workers
+        self.timeout_sec = timeout_sec
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._start_background_task = start_background_task or self._start_thread
+        self._sleep = sleep
+        self._running = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._last_heartbeat = 0
+
+    @staticmethod
+    def _start_thread(target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._start_background_task(self._run)
+
+    # ---------------- Public API ---------------- #
+    def submit(self, project_name, priority=0, kind="training", **options):
+        job = TrainingJob(project_name, options, priority, kind)
+        try:
+            db.execute_write(
+                "INSERT INTO training_jobs (job_id, project_name, kind, options, priority, status, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (job.job_id, project_name, kind, json.dumps(options), priority, job.submitted_at)
+            )
+        except sqlite3.IntegrityError:
+            existing = self.get_job(project_name)
+            if existing is not None and existing.active:
+                return existing, False
+            raise
+        self.start()
+        return job, True
+
+    def cancel(self, project_name):
+        now = time.time()
+        with db.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(
+                "SELECT * FROM training_jobs WHERE project_name = ? AND status IN ('queued', 'running')",
+                (project_name,)
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute(
+                "UPDATE training_jobs SET status = 'cancelled', message = ?, finished_at = ? WHERE job_id = ?",
+                ("Cancelled by user", now, row["job_id"])
+            )
+
+        with self._lock:
+            job = self._running.get(row["job_id"]) or TrainingJob.from_row(row)
+            job.status = "cancelled"
+            job.message = "Cancelled by user"
+            job.finished_at = now
+            process = job.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+        self.on_event(job, f"{job.kind}_cancelled", {"message": job.message})
+        return True
+
+    def get_job(self, project_name):
+        # Latest job for the project, whichever worker submitted or runs it
+        row = db.fetch_one(
+            "SELECT * FROM training_jobs WHERE project_name = ? ORDER BY submitted_at DESC LIMIT 1",
+            (project_name,)
+        )
+        if row is None:
+            return None
+        with self._lock:
+            local = self._running.get(row["job_id"])
+        return local if local is not None else TrainingJob.from_row(row)
+
+    def stats(self):
+        counts = dict(db.fetch_all(
+            "SELECT status, COUNT(*) FROM training_jobs WHERE status IN ('queued', 'running') GROUP BY status",
+            as_dict=False
+        ))
+        with self._lock:
+            local = len(self._running)
+        return {
+            "max_workers": self.max_workers,
+            "running": counts.get("running", 0),
+            "queued": counts.get("queued", 0),
+            "running_here": local,
+        }
+
+    # ---------------- Worker management ---------------- #
+    def _run(self):
+        while True:
+            try:
+                self._reap()
+                self._dispatch()
+            except Exception as e:
+                print("❌ Error in training scheduler:", e)
+            self._sleep(POLL_INTERVAL_SEC)
+
+    def _claim_next(self):
+        # Every worker polls this several times a second; an empty queue is answered by a
+        # read, so the poll never waits on the write lock held by an ingest or a trainworker
+        if db.fetch_one("SELECT 1 FROM training_jobs WHERE status = 'queued' LIMIT 1", as_dict=False) is None:
+            return None
+        now = time.time()
+        with db.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            running = conn.execute("SELECT COUNT(*) FROM training_jobs WHERE status = 'running'").fetchone()[0]
+            if running >= self.max_workers:
+                return None
+            row = conn.execute(
+                "SELECT * FROM training_jobs WHERE status = 'queued' ORDER BY priority, submitted_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE training_jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ? "
+                "WHERE job_id = ?",
+                (self.owner, now, now, row["job_id"])
+            )
+        job = TrainingJob.from_row(row)
+        job.status, job.owner, job.started_at = "running", self.owner, now
+        return job
+
+    def _dispatch(self):
+        while True:
+            job = self._claim_next()
+            if job is None:
+                return
+            with self._lock:
+                self._running[job.job_id] = job
+            self._launch(job)
+
+    def _launch(self, job):
+        # Same working directory as the server, so relative DATABASE_PATH / store paths agree
+        python_path = os.pathsep.join(filter(None, (APP_DIR, os.environ.get("PYTHONPATH"))))
+        try:
+            job.process = subprocess.Popen(
+                [sys.executable, "-m", "trainworker", job.project_name, "--kind", job.kind,
+                 "--options", json.dumps(job.options)],
+                stdout=subprocess.PIPE,
+                cwd=os.getcwd(),
+                env={**os.environ, "PYTHONPATH": python_path},
+                text=True,
+            )
+        except Exception as e:
+            self._finish(job, "error", f"Could not start training worker: {e}")
+            return
+        print(f"🎬 Training worker {job.process.pid} started for project: {job.project_name}")
+        self._start_background_task(self._pump_events, job)
+
+    def _pump_events(self, job):
+        try:
+            for line in job.process.stdout:
+                try:
+                    event, data = json.loads(line)
+                except ValueError:
+                    continue
+                if job.status != "running":
+                    continue
+                if event in (f"{job.kind}_complete", f"{job.kind}_error"):
+                    job.finished_event = (event, data)
+                else:
+                    self.on_event(job, event, data)
+        finally:
+            job.stream_done = True
+
+    def _sync_running(self, now):
+        # Pick up cancels made by other workers, heartbeat our jobs, fail orphaned ones
+        with self._lock:
+            local = dict(self._running)
+        if local:
+            placeholders = ",".join("?" * len(local))
+            statuses = dict(db.fetch_all(
+                f"SELECT job_id, status FROM training_jobs WHERE job_id IN ({placeholders})",
+                list(local), as_dict=False
+            ))
+            for job_id, job in local.items():
+                status = statuses.get(job_id, "cancelled")
+                if status != "running" and job.status == "running":
+                    job.status = status
+                    if job.process is not None and job.process.poll() is None:
+                        job.process.terminate()
+
+        if now - self._last_heartbeat < HEARTBEAT_SEC:
+            return
+        self._last_heartbeat = now
+        with db.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute(
+                "UPDATE training_jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'", (now, self.owner)
+            )
+            orphans = conn.execute(
+                "SELECT * FROM training_jobs WHERE status = 'running' AND heartbeat_at < ?",
+                (now - STALE_AFTER_SEC,)
+            ).fetchall()
+            conn.execute(
+                "UPDATE training_jobs SET status = 'error', message = ?, finished_at = ? "
+                "WHERE status = 'running' AND heartbeat_at < ?",
+                ("Training worker lost", now, now - STALE_AFTER_SEC)
+            )
+        for row in orphans:
+            job = TrainingJob.from_row(row)
+            job.status, job.message, job.finished_at = "error", "Training worker lost", now
+            self.on_event(job, f"{job.kind}_error", {"message": job.message})
+
+    def _reap(self):
+        now = time.time()
+        self._sync_running(now)
+        with self._lock:
+            local = list(self._running.values())
+        for job in local:
+            if job.status == "running" and now - job.started_at > self.timeout_sec:
+                job.process.terminate()
+                self._finish(job, "timeout", f"Training exceeded {self.timeout_sec:.0f}s timeout")
+                continue
+            # Wait for both process exit and end of its event stream before deciding the outcome
+            if job.process is None or job.process.poll() is None or not job.stream_done:
+                continue
+
+            if job.status != "running":
+                with self._lock:
+                    self._running.pop(job.job_id, None)
+            elif job.finished_event and job.finished_event[0] == f"{job.kind}_complete":
+                self._finish(job, "done", None, job.finished_event)
+            elif job.finished_event:
+                self._finish(job, "error", job.finished_event[1].get("message"), job.finished_event)
+            else:
+                self._finish(job, "error", f"Training worker exited with code {job.process.returncode}")
+
+    def _finish(self, job, status, message, final_event=None):
+        now = time.time()
+        db.execute_write(
+            "UPDATE training_jobs SET status = ?, message = ?, finished_at = ? WHERE job_id = ? AND status = 'running'",
+            (status, message, now, job.job_id)
+        )
+        with self._lock:
+            self._running.pop(job.job_id, None)
+            job.status = status
+            job.message = message
+            job.finished_at = now
+        if final_event is not None:
+            self.on_event(job, *final_event)
+        elif status != "cancelled":
+            self.on_event(job, f"{job.kind}_error", {"message": job.message})
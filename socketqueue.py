@@ -0,0 +1,80 @@
+import os
+import time
+
+import socketio
+
+import db
+
+# How the web workers share Socket.IO traffic. Each gunicorn worker holds its own client
+# connections, so an event emitted in one worker (e.g. the one running a training) must be
+# relayed to clients connected to the others:
+#   SOCKETIO_MESSAGE_QUEUE unset   -> single worker, nothing shared
+#   SOCKETIO_MESSAGE_QUEUE=sqlite  -> SQLiteManager below; all workers on one host, no extra service
+#   SOCKETIO_MESSAGE_QUEUE=redis://host:6379/0 (or amqp://...) -> Flask-SocketIO's own
+#                                     managers; needed across hosts (install redis / kombu)
+# With more than one worker (WEB_CONCURRENCY > 1) the queue defaults to sqlite, and the
+# server only accepts the websocket transport. A websocket is a single long-lived
+# connection, so any worker can own it and no sticky-session load balancer is needed.
+# Clients must connect with transports: ["websocket"].
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE") or ("sqlite" if WEB_CONCURRENCY > 1 else None)
+SQLITE_QUEUE_POLL_SEC = float(os.getenv("SQLITE_QUEUE_POLL_SEC", "0.05"))
+SQLITE_QUEUE_RETENTION_SEC = 60
+
+
+def create_socketio_messages_table():
+    with db.transaction() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS socketio_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+
+class SQLiteManager(socketio.PubSubManager):
+    # Pub/sub over an append-only socketio_messages table: publishing is one INSERT, and
+    # each worker's listener polls for rows past the last id it has seen
+    name = "sqlite"
+
+    def __init__(self, channel="socketio", write_only=False, logger=None, poll_interval=SQLITE_QUEUE_POLL_SEC):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.poll_interval = poll_interval
+        self._last_cleanup = 0
+
+    def _publish(self, data):
+        now = time.time()
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO socketio_messages (channel, payload, created_at) VALUES (?, ?, ?)",
+                (self.channel, self.json.dumps(data), now)
+            )
+            if now - self._last_cleanup > SQLITE_QUEUE_RETENTION_SEC:
+                self._last_cleanup = now
+                conn.execute("DELETE FROM socketio_messages WHERE created_at < ?", (now - SQLITE_QUEUE_RETENTION_SEC,))
+
+    def _listen(self):
+        last_id = db.fetch_one("SELECT COALESCE(MAX(id), 0) FROM socketio_messages", as_dict=False)[0]
+        while True:
+            rows = db.fetch_all(
+                "SELECT id, payload FROM socketio_messages WHERE channel = ? AND id > ? ORDER BY id",
+                (self.channel, last_id), as_dict=False
+            )
+            for message_id, payload in rows:
+                last_id = message_id
+                yield payload
+            self.server.sleep(self.poll_interval)
+
+
+def socketio_queue_options():
+    # Extra SocketIO(...) keyword arguments for the configured deployment mode
+    options = {}
+    if SOCKETIO_MESSAGE_QUEUE == "sqlite":
+        options["client_manager"] = SQLiteManager()
+    elif SOCKETIO_MESSAGE_QUEUE:
+        options["message_queue"] = SOCKETIO_MESSAGE_QUEUE
+    if WEB_CONCURRENCY > 1:
+        options["transports"] = ["websocket"]
+    return options
@@ -0,0 +1,190 @@
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+from pennylane import numpy as pnp
+
+from hyperparameters import SWEEP_SEED, circuit_options, expand_trials
+from insertoperations import save_best_config
+from metrics import binary_metrics
+from qmlmodel import (
+    fit_weights, load_training_arrays, make_predictors, prepare_training_data, weight_shape
+)
+
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+# Median pruning: from PRUNE_WARMUP_EPOCHS on, a trial whose validation AUC at an epoch is
+# below the median of every trial that reached that epoch stops early, once at least
+# PRUNE_MIN_TRIALS trials have reported there.
+PRUNE_WARMUP_EPOCHS = 3
+PRUNE_MIN_TRIALS = 4
+
+SHARED_ARRAYS = ("X_train", "y_train", "X_val", "y_val", "X_test", "y_test")
+
+# A sweep runs inside one trainworker process. Preprocessing runs once per distinct
+# n_components; its train/validation/test arrays are copied into shared memory a single
+# time and every trial process maps them instead of receiving a pickled copy.
+
+
+def share_arrays(arrays):
+    blocks, specs = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        specs[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, specs
+
+
+def _should_prune(epoch, score, scores):
+    return epoch >= PRUNE_WARMUP_EPOCHS and len(scores) >= PRUNE_MIN_TRIALS and score < np.median(scores)
+
+
+def _train_trial(trial_id, config, n_qubits, data, events, rungs, lock, batched):
+    predict_all, loss_fn = make_predictors(n_qubits, batched=batched, backend=config["backend"],
+                                           **circuit_options(config))
+    shape = weight_shape(n_qubits, config["ansatz"], config["n_layers"])
+    weights = pnp.array(pnp.random.randn(*shape), requires_grad=True)
+
+    def on_epoch(epoch, metrics):
+        events.put(("sweep_progress", {"trial_id": trial_id, "epoch": epoch,
+                                       "total_epochs": config["epochs"], **metrics}))
+        with lock:
+            scores = rungs.get(epoch, []) + [metrics["auc"]]
+            rungs[epoch] = scores
+        return _should_prune(epoch, metrics["auc"], scores)
+
+    weights, history, y_val_probs = fit_weights(
+        data["X_train"], data["y_train"], data["X_val"], data["y_val"], weights, config, predict_all, loss_fn,
+        on_epoch
+    )
+    result = {
+        "trial_id": trial_id,
+        "config": config,
+        "status": "pruned" if len(history["loss"]) < config["epochs"] else "completed",
+        "epochs_run": len(history["loss"]),
+        "val_auc": round(float(history["auc"][-1]), 4),
+        "val_f1": round(float(history["f1"][-1]), 4),
+        "loss": round(float(history["loss"][-1]), 4),
+    }
+    if result["status"] == "completed":
+        # Unless a sample budget took a smaller subset, the validation set is the test split
+        same_split = data["X_val"].shape == data["X_test"].shape
+        probs = y_val_probs if same_split else predict_all(data["X_test"], weights)
+        final = binary_metrics(data["y_test"], probs)
+        result["test_accuracy"] = round(final["accuracy"], 4)
+        result["test_f1"] = round(final["f1"], 4)
+        result["test_auc"] = round(final["auc"], 4)
+    return result
+
+
+def run_trial(trial_id, config, dataset, seed, events, rungs, lock, batched=True):
+    # Runs in a pool process. The arrays are views on the parent's shared memory and are
+    # released before the blocks are closed.
+    start = time.time()
+    blocks, data = [], {}
+    try:
+        for name, (shm_name, shape, dtype) in dataset["specs"].items():
+            shm = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(shm)
+            data[name] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        np.random.seed(seed)
+        result = _train_trial(trial_id, config, dataset["n_qubits"], data, events, rungs, lock, batched)
+    finally:
+        data.clear()
+        for shm in blocks:
+            shm.close()
+    result["duration_sec"] = round(time.time() - start, 2)
+    return result
+
+
+def _drain(events, emit, project_name):
+    while True:
+        try:
+            event, data = events.get_nowait()
+        except queue.Empty:
+            return
+        emit(event, {"project_name": project_name, **data})
+
+
+def run_sweep(project_name, space=None, search="grid", n_trials=None, sample_budget=None, preprocess_mode=None,
+              workers=SWEEP_WORKERS, batched=True, progress_callback=None):
+    sweep_start = time.time()
+    emit = progress_callback or (lambda event, data: None)
+    trials = expand_trials(space, search, n_trials)
+    X, y = load_training_arrays(project_name)
+
+    datasets, blocks = {}, []
+    results = []
+    try:
+        for n_components in sorted({config["n_components"] for config in trials}):
+            data = prepare_training_data(project_name, X, y, preprocess_mode, sample_budget, n_components)
+            shm_blocks, specs = share_arrays({name: data[name] for name in SHARED_ARRAYS})
+            blocks += shm_blocks
+            datasets[n_components] = {"specs": specs, "n_qubits": int(data["pca"].n_components_)}
+        print(f"🧪 Sweeping {len(trials)} trials for {project_name} on {min(workers, len(trials))} workers")
+
+        # spawn, not fork: the parent has already loaded PennyLane and its native threads
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Manager() as manager, \
+                ProcessPoolExecutor(max_workers=min(workers, len(trials)), mp_context=ctx) as pool:
+            events, rungs, lock = manager.Queue(), manager.dict(), manager.Lock()
+            futures = {
+                pool.submit(run_trial, trial_id, config, datasets[config["n_components"]], SWEEP_SEED + trial_id,
+                            events, rungs, lock, batched): trial_id
+                for trial_id, config in enumerate(trials)
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                _drain(events, emit, project_name)
+                for future in done:
+                    trial_id = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"trial_id": trial_id, "config": trials[trial_id], "status": "error",
+                                  "message": str(e)}
+                    results.append(result)
+                    emit("sweep_progress", {
+                        "project_name": project_name,
+                        "trial": result,
+                        "trials_done": len(results),
+                        "total_trials": len(trials),
+                        "progress": round(len(results) / len(trials) * 100, 2),
+                    })
+            _drain(events, emit, project_name)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    results.sort(key=lambda result: result["trial_id"])
+    completed = [result for result in results if result["status"] == "completed"]
+    best = max(completed, key=lambda result: (result["val_auc"], result["val_f1"]), default=None)
+    if best is not None:
+        save_best_config(project_name, best["config"], best["val_auc"])
+
+    wall_time = time.time() - sweep_start
+    return {
+        "summary": {
+            "project": project_name,
+            "kind": "sweep",
+            "search": search,
+            "trials": len(trials),
+            "completed": len(completed),
+            "pruned": sum(1 for result in results if result["status"] == "pruned"),
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "workers": min(workers, len(trials)),
+            "duration_sec": round(wall_time, 2),
+            "trial_time_sum_sec": round(sum(result.get("duration_sec", 0) for result in results), 2),
+            "best_config": best["config"] if best else None,
+            "best_trial": best,
+        },
+        "trials": results,
+    }
@@ -0,0 +1,181 @@
+import cProfile
+import io
+import os
+import pstats
+import resource
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from offload import native_threading
+
+# In-process metrics rendered in the Prometheus text format at /metrics (no client library
+# needed). Each process keeps its own registry: training workers send theirs back to the
+# web process as a "telemetry" event when they finish, and with several web workers every
+# worker reports its own series (scrape each, or sum them).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+METRIC_PREFIX = "backend_"
+HELP = {
+    "phase_duration_seconds": "Time spent in an instrumented phase (DB access, CSV parsing, preprocessing, circuits)",
+    "http_request_duration_seconds": "Flask request latency until the response is returned (streamed bodies excluded)",
+    "peak_rss_bytes": "Resident set size high-water mark",
+    "preprocess_peak_bytes": "Python heap high-water mark during preprocessing",
+}
+
+# Opt-in profiling of one training run (/train?profile=true): the cProfile dump is written
+# to PROFILE_DIR and the top PROFILE_TOP_N functions by cumulative time go into its results
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = 30
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        # Spans also close on tpool threads (scoring, see offload.py), so the lock is a native
+        # one; it only guards dictionary updates and is never held across a blocking call
+        self._lock = native_threading.Lock()
+        self._histograms = {}
+        self._maxima = {}
+        self._collectors = []
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def set_max(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._maxima[key] = max(self._maxima.get(key, 0), value)
+
+    def register_collector(self, collector):
+        # collector() -> [(name, labels_dict, value)], sampled at scrape time (queue depths)
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "histograms": [[name, dict(labels), h.counts, h.sum, h.count]
+                               for (name, labels), h in self._histograms.items()],
+                "maxima": [[name, dict(labels), value] for (name, labels), value in self._maxima.items()],
+            }
+
+    def merge(self, snapshot, **extra_labels):
+        # Fold another process's snapshot in (extra_labels tell the processes apart)
+        with self._lock:
+            for name, labels, counts, total, count in snapshot.get("histograms", []):
+                key = _key(name, {**labels, **extra_labels})
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+            for name, labels, value in snapshot.get("maxima", []):
+                key = _key(name, {**labels, **extra_labels})
+                self._maxima[key] = max(self._maxima.get(key, 0), value)
+
+    def render(self):
+        record_peak_rss(self)
+        lines, typed = [], set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {METRIC_PREFIX}{name} {HELP[name]}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            maxima = sorted(self._maxima.items())
+        for (name, labels), histogram in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_labels(labels)} {histogram.count}")
+        for (name, labels), value in maxima:
+            header(name, "gauge")
+            lines.append(f"{METRIC_PREFIX}{name}{_labels(labels)} {value}")
+        for collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print("❌ Error in metrics collector:", e)
+                continue
+            for name, labels, value in samples:
+                header(name, "gauge")
+                lines.append(f"{METRIC_PREFIX}{name}{_labels(_key(name, labels)[1])} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+registry = Registry()
+
+
+@contextmanager
+def span(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe("phase_duration_seconds", time.perf_counter() - start, phase=phase)
+
+
+def record_peak_rss(target=registry, process="web", include_children=True):
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN covers the finished training workers
+    target.set_max("peak_rss_bytes", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, process=process)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss if include_children else 0
+    if children:
+        target.set_max("peak_rss_bytes", children * 1024, process=f"{process}_children")
+
+
+def profile_call(name, fn, *args, **kwargs):
+    # Runs fn under cProfile; returns (fn's result, {"path", "top"}). name must be safe as a
+    # file name (callers pass a slug, e.g. featurestore.project_store_dir's). The profile is
+    # a by-product: failing to write it leaves fn's result intact and reports the error.
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        value = fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    path = os.path.join(PROFILE_DIR, f"{os.path.basename(name)}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(path)
+    except OSError as e:
+        print(f"⚠️ Could not save profile for {name}: {e}")
+        return value, {"path": None, "error": str(e), "top": report.getvalue()}
+    print(f"🔬 Saved profile for {name} at {path}")
+    return value, {"path": path, "top": report.getvalue()}
@@ -0,0 +1,27 @@
+# Run from the repo root: python -m pytest -q  (pip install pytest)
+# Every test gets its own SQLite database, migrated to the current schema, and runs inside
+# a temporary directory so the relative feature store, model registry and upload dirs stay
+# out of the checkout. In-process caches are emptied too: a fresh database starts its
+# versions and project ids over.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import db  # noqa: E402
+import migrations  # noqa: E402
+import projectstats  # noqa: E402
+import transactionstore  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db, "DATABASE_PATH", str(tmp_path / "test.db"))
+    migrations.migrate()
+    projectstats._cache.clear()
+    transactionstore._project_ids.clear()
+    yield tmp_path / "test.db"
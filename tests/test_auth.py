@@ -0,0 +1,50 @@
+import auth
+import db
+
+
+def test_session_token_round_trip():
+    user = {"id": 7, "username": "ada", "email": "ada@example.com"}
+    token = auth.issue_session_token(user)
+
+    assert auth.verify_session_token(token) == {"uid": 7, "username": "ada", "email": "ada@example.com"}
+    assert auth.session_user({"Authorization": f"Bearer {token}"})["uid"] == 7
+
+
+def test_session_token_rejects_tampering_and_expiry(monkeypatch):
+    token = auth.issue_session_token({"id": 7, "username": "ada", "email": "ada@example.com"})
+    payload, _, signature = token.rpartition(".")
+
+    assert auth.verify_session_token(payload + "." + signature[::-1]) is None
+    assert auth.verify_session_token("not-a-token") is None
+    assert auth.session_user({"Authorization": token}) is None  # no Bearer scheme
+    assert auth.session_user({}) is None
+
+    monkeypatch.setattr(auth, "SESSION_TOKEN_TTL_SEC", -1)
+    assert auth.verify_session_token(token) is None
+
+
+def test_signup_login_token(monkeypatch):
+    # pbkdf2 with few rounds keeps the test fast; the stored format is the same
+    monkeypatch.setattr(auth, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    assert auth.user_signup("ada", "Ada@Example.com", "s3cret")[1] == 201
+    assert auth.user_signup("ada2", "ada@example.com", "other")[1] == 409  # emails are case-insensitive
+
+    body, status = auth.login_user("ada@example.com", "s3cret")
+    assert status == 200
+    assert auth.verify_session_token(body["token"])["uid"] == body["user"]["id"]
+    assert auth.login_user("ada@example.com", "wrong")[1] == 401
+    assert auth.login_user("nobody@example.com", "s3cret")[1] == 401
+
+
+def test_duplicate_emails_skip_the_unique_index(capsys):
+    db.execute_write("DROP INDEX idx_users_email")
+    db.execute_write("INSERT INTO users (username, email, password) VALUES ('a', 'Ada@example.com', 'x')")
+    db.execute_write("INSERT INTO users (username, email, password) VALUES ('b', 'ada@example.com', 'y')")
+
+    auth.create_users_email_index()  # warns instead of stopping the migration
+    assert "Unique email index skipped" in capsys.readouterr().out
+    assert db.fetch_one("SELECT 1 FROM sqlite_master WHERE name = 'idx_users_email'") is None
+
+    db.execute_write("DELETE FROM users WHERE username = 'b'")
+    auth.create_users_email_index()
+    assert db.fetch_one("SELECT 1 FROM sqlite_master WHERE name = 'idx_users_email'") is not None
@@ -0,0 +1,92 @@
+import numpy as np
+
+import db
+from benchmarks.synthetic import make_creditcard_frame
+from deleteoperations import delete_project_data
+from ingestjobs import create_ingest_job, find_ingested_file, run_ingest_job
+from insertoperations import file_fingerprint, insert_csv_to_transactions_table
+from projectstats import get_project_stats
+from transactionstore import load_project_rows
+
+
+def write_csv(tmp_path, frame, name, **to_csv):
+    path = str(tmp_path / name)
+    frame.to_csv(path, index=False, **to_csv)
+    return path
+
+
+def project_rows(project_name):
+    return db.fetch_one(
+        "SELECT COUNT(*) AS n FROM transactions WHERE project_name = ?", (project_name,)
+    )["n"]
+
+
+def ingest_file(path, project_name, mode="append"):
+    job_id, created = create_ingest_job(project_name, path, file_fingerprint(path), mode)
+    assert created
+    return job_id, run_ingest_job(job_id)
+
+
+def test_completed_file_is_recognised_by_content(tmp_path):
+    frame = make_creditcard_frame(40, seed=1)
+    path = write_csv(tmp_path, frame, "first.csv")
+    file_hash = file_fingerprint(path)
+    assert file_fingerprint(write_csv(tmp_path, frame, "renamed.csv")) == file_hash
+
+    job_id, result = ingest_file(path, "alpha")
+    assert result["status"] == "success"
+    assert find_ingested_file("alpha", file_hash)["job_id"] == job_id
+    assert find_ingested_file("beta", file_hash) is None  # per project
+
+
+def test_same_file_while_queued_returns_the_running_job(tmp_path):
+    path = write_csv(tmp_path, make_creditcard_frame(10), "upload.csv")
+    job_id, created = create_ingest_job("alpha", path, "hash-1")
+    again, created_again = create_ingest_job("alpha", path, "hash-1")
+
+    assert created and not created_again
+    assert again == job_id
+    assert create_ingest_job("beta", path, "hash-1")[1]
+
+
+def test_repeated_chunks_are_skipped(tmp_path):
+    frame = make_creditcard_frame(30, seed=2)
+    first = insert_csv_to_transactions_table(write_csv(tmp_path, frame, "a.csv"), "alpha", chunksize=10)
+    stats = get_project_stats("alpha")
+
+    # Same values, different text: caught by the chunk fingerprints, not the file hash
+    second = insert_csv_to_transactions_table(
+        write_csv(tmp_path, frame, "b.csv", float_format="%.12f"), "alpha", chunksize=10
+    )
+    assert (first["rows"], second["rows"], second["duplicate_rows"]) == (30, 0, 30)
+    assert project_rows("alpha") == 30
+    assert get_project_stats("alpha")["version"] == stats["version"]  # aggregates untouched
+
+    # Chunks are per project
+    assert insert_csv_to_transactions_table(write_csv(tmp_path, frame, "c.csv"), "beta", chunksize=10)["rows"] == 30
+
+
+def test_replace_mode_keeps_only_the_new_file(tmp_path):
+    ingest_file(write_csv(tmp_path, make_creditcard_frame(50, seed=3), "old.csv"), "alpha")
+    new = make_creditcard_frame(20, seed=4)
+    _, result = ingest_file(write_csv(tmp_path, new, "new.csv"), "alpha", mode="replace")
+
+    assert result["status"] == "success"
+    X, y = load_project_rows("alpha")
+    np.testing.assert_array_equal(y, new["Class"].to_numpy())
+    assert len(X) == 20
+    assert get_project_stats("alpha")["rows"] == 20
+
+
+def test_delete_forgets_files_and_chunks(tmp_path):
+    frame = make_creditcard_frame(15, seed=5)
+    path = write_csv(tmp_path, frame, "upload.csv")
+    file_hash = file_fingerprint(path)
+    ingest_file(path, "alpha")
+
+    delete_project_data("alpha")
+    assert project_rows("alpha") == 0
+    assert find_ingested_file("alpha", file_hash) is None
+
+    _, result = ingest_file(write_csv(tmp_path, frame, "again.csv"), "alpha")
+    assert (result["rows"], result["duplicate_rows"]) == (15, 0)
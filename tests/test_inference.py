@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+from benchmarks.synthetic import make_creditcard_frame
+from createoperations import FEATURE_COLUMNS
+from hyperparameters import resolve_hyperparameters, weight_shape
+from inference import ModelCache, model_cache, predict_fraud_probabilities, rows_to_features
+from modelregistry import data_fingerprint, save_model, save_preprocessed
+
+PARAMS = resolve_hyperparameters({"n_components": 2})
+
+
+@pytest.fixture
+def frame():
+    return make_creditcard_frame(200, fraud_ratio=0.1, seed=3)
+
+
+def save_trained_model(project_name, frame, seed, fingerprint=None):
+    # What run_qml_model leaves in the registry, without the training
+    X, y = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64), frame["Class"].to_numpy()
+    scaler = StandardScaler().fit(X)
+    pca = PCA(n_components=2).fit(scaler.transform(X))
+    fingerprint = fingerprint or data_fingerprint(X, y)
+    save_preprocessed(project_name, fingerprint, scaler, pca, X, X, y, y)
+    weights = np.random.default_rng(seed).normal(size=weight_shape(2, PARAMS["ansatz"], PARAMS["n_layers"]))
+    save_model(project_name, fingerprint, weights, {"hyperparameters": PARAMS}, PARAMS)
+    return fingerprint
+
+
+def test_scores_rows(frame):
+    fingerprint = save_trained_model("alpha", frame, seed=0)
+    returned, probs = predict_fraud_probabilities("alpha", rows_to_features(frame.head(10)))
+
+    assert returned == fingerprint
+    assert probs.shape == (10,)
+    assert np.all((probs >= 0) & (probs <= 1))
+    # Batch scoring gives every row the score it gets on its own
+    _, single = predict_fraud_probabilities("alpha", rows_to_features(frame.iloc[[3]]))
+    assert single[0] == pytest.approx(probs[3])
+
+
+def test_retraining_on_the_same_data_is_picked_up(frame):
+    fingerprint = save_trained_model("alpha", frame, seed=0)
+    features = rows_to_features(frame.head(20))
+    _, before = predict_fraud_probabilities("alpha", features)
+
+    save_trained_model("alpha", frame, seed=1, fingerprint=fingerprint)
+    returned, after = predict_fraud_probabilities("alpha", features)
+
+    assert returned == fingerprint
+    assert not np.allclose(before, after)
+
+
+def test_cache_hits_until_the_model_changes(frame):
+    cache = ModelCache(capacity=2)
+    fingerprint = save_trained_model("alpha", frame, seed=0)
+    first = cache.get("alpha")
+    assert cache.get("alpha") is first
+
+    save_trained_model("alpha", frame, seed=1, fingerprint=fingerprint)
+    second = cache.get("alpha")
+    assert second is not first
+    assert len(cache._models) == 1  # the replaced version is dropped, not left to age out
+
+
+def test_unknown_project_and_bad_rows(frame):
+    with pytest.raises(LookupError):
+        model_cache.get("missing")
+    with pytest.raises(ValueError, match="Missing columns"):
+        rows_to_features([{"Time": 1.0}])
+    with pytest.raises(ValueError, match="No transactions"):
+        rows_to_features(frame.head(0))
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import db
+from benchmarks.synthetic import make_creditcard_frame
+from createoperations import FEATURE_COLUMNS, TRANSACTION_COLUMNS
+from insertoperations import chunk_to_columns, count_csv_rows, insert_csv_to_transactions_table
+from transactionstore import load_project_rows
+
+
+def write_csv(tmp_path, frame, name="upload.csv"):
+    path = str(tmp_path / name)
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_chunk_to_columns_is_column_major():
+    frame = make_creditcard_frame(5, seed=1)
+    features, labels = chunk_to_columns(frame)
+
+    assert features.shape == (len(FEATURE_COLUMNS), 5)
+    assert features.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(features[FEATURE_COLUMNS.index("Amount")], frame["Amount"].to_numpy())
+    assert labels.dtype == np.int64
+
+    frame["Class"] = frame["Class"].astype(np.float64)
+    frame.loc[2, "Class"] = np.nan  # unlabelled rows keep float labels
+    _, labels = chunk_to_columns(frame)
+    assert labels.dtype == np.float64 and np.isnan(labels[2])
+
+
+def test_ingest_stores_every_row_across_chunks(tmp_path):
+    frame = make_creditcard_frame(250, fraud_ratio=0.1, seed=4)
+    path = write_csv(tmp_path, frame)
+
+    result = insert_csv_to_transactions_table(path, "alpha", chunksize=64)
+    assert result["status"] == "success"
+    assert (result["rows"], result["duplicate_rows"]) == (250, 0)
+    assert not os.path.exists(path)
+
+    X, y = load_project_rows("alpha")
+    np.testing.assert_array_equal(y, frame["Class"].to_numpy())
+    np.testing.assert_array_equal(X, frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+
+
+def test_view_returns_the_uploaded_values(tmp_path):
+    frame = make_creditcard_frame(3, seed=2)
+    frame.loc[0, "Amount"] = 149.62
+    insert_csv_to_transactions_table(write_csv(tmp_path, frame), "alpha")
+
+    rows = db.fetch_all(
+        f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions WHERE project_name = ? ORDER BY id", ("alpha",)
+    )
+    assert [row["Class"] for row in rows] == frame["Class"].tolist()
+    assert rows[0]["Amount"] == 149.62  # float32, shown at its own precision
+    np.testing.assert_allclose([row["V1"] for row in rows], frame["V1"], rtol=1e-6)
+
+
+def test_missing_columns_and_bad_values_are_not_resumable(tmp_path):
+    frame = make_creditcard_frame(3)
+    result = insert_csv_to_transactions_table(write_csv(tmp_path, frame.drop(columns=["V7"])), "alpha")
+    assert result["status"] == "error" and not result["resumable"]
+    assert "V7" in result["message"]
+
+    frame = frame.astype({"Amount": object})
+    frame.loc[1, "Amount"] = "12,50"
+    result = insert_csv_to_transactions_table(write_csv(tmp_path, frame), "alpha")
+    assert result["status"] == "error" and not result["resumable"]
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM transaction_rows")["n"] == 0
+
+
+@pytest.mark.parametrize("ending", ["\n", ""])
+def test_count_csv_rows(tmp_path, ending):
+    frame = make_creditcard_frame(7)
+    path = str(tmp_path / "rows.csv")
+    with open(path, "w") as f:
+        f.write(frame.to_csv(index=False).rstrip("\n") + ending)
+
+    assert count_csv_rows(path) == 7
+    assert len(pd.read_csv(path)) == 7
@@ -0,0 +1,120 @@
+import functools
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+import ingestjobs
+import insertoperations
+from benchmarks.synthetic import make_creditcard_frame
+from createoperations import FEATURE_COLUMNS
+from featurestore import load_project_arrays
+
+CHUNK_ROWS = 100
+
+
+@pytest.fixture
+def frame():
+    frame = make_creditcard_frame(450, fraud_ratio=0.1, seed=7)
+    # A quoted field spanning lines: rows and physical lines no longer match up
+    frame["note"] = ["first line\nsecond line" if i % 3 == 0 else "-" for i in range(len(frame))]
+    return frame
+
+
+@pytest.fixture
+def upload(tmp_path, frame):
+    path = str(tmp_path / "upload.csv")
+    frame.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(ingestjobs, "insert_csv_to_transactions_table",
+                        functools.partial(insertoperations.insert_csv_to_transactions_table, chunksize=CHUNK_ROWS))
+
+
+def fail_on_chunk(monkeypatch, chunk_number, error):
+    # Raise once, while preparing the given chunk, before anything of it commits
+    pack_features, calls = insertoperations.pack_features, []
+
+    def flaky(features):
+        calls.append(1)
+        if len(calls) == chunk_number:
+            raise error
+        return pack_features(features)
+
+    monkeypatch.setattr(insertoperations, "pack_features", flaky)
+
+
+def assert_project_matches(project_name, frame):
+    X, y = load_project_arrays(project_name)
+    assert len(y) == len(frame)
+    np.testing.assert_array_equal(y, frame["Class"].to_numpy())
+    np.testing.assert_allclose(X, frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32), rtol=1e-6)
+
+
+def test_resume_continues_after_last_committed_chunk(monkeypatch, upload, frame):
+    job_id, _ = ingestjobs.create_ingest_job("alpha", upload, "hash-alpha")
+    fail_on_chunk(monkeypatch, 3, sqlite3.OperationalError("database is locked"))
+
+    result = ingestjobs.run_ingest_job(job_id)
+    job = ingestjobs.get_ingest_job(job_id)
+    assert result["status"] == "error" and result["resumable"]
+    assert job["status"] == "queued"
+    assert (job["rows_done"], job["chunks_done"]) == (2 * CHUNK_ROWS, 2)
+    assert os.path.exists(upload)  # kept for the retry
+
+    result = ingestjobs.run_ingest_job(job_id)  # the injected error only fires once
+    job = ingestjobs.get_ingest_job(job_id)
+    assert result["status"] == "success"
+    assert result["rows"] == len(frame) - 2 * CHUNK_ROWS
+    assert result["duplicate_rows"] == 0
+    assert (job["status"], job["rows_done"]) == ("completed", len(frame))
+    assert not os.path.exists(upload)
+    assert_project_matches("alpha", frame)
+
+
+def test_invalid_file_fails_for_good(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    with open(path, "w") as f:
+        f.write("Time,V1\n1,2\n")
+    job_id, _ = ingestjobs.create_ingest_job("alpha", path, "hash-bad")
+
+    result = ingestjobs.run_ingest_job(job_id)
+    assert result["status"] == "error" and not result["resumable"]
+    assert ingestjobs.get_ingest_job(job_id)["status"] == "error"
+    assert not os.path.exists(path)
+
+
+def test_cancel_stops_a_running_ingest(upload):
+    job_id, _ = ingestjobs.create_ingest_job("alpha", upload, "hash-alpha")
+
+    def progress(event, data):
+        if data["chunks_done"] == 2:
+            assert ingestjobs.cancel_ingest_job(job_id)
+
+    result = ingestjobs.run_ingest_job(job_id, progress_callback=progress)
+    job = ingestjobs.get_ingest_job(job_id)
+    assert result["status"] == "cancelled"
+    assert (job["status"], job["rows_done"]) == ("cancelled", 2 * CHUNK_ROWS)
+    assert not os.path.exists(upload)
+    assert not ingestjobs.cancel_ingest_job(job_id)
+
+
+def test_chunk_work_runs_off_the_event_loop(monkeypatch, upload, frame):
+    # Under eventlet run_blocking hands these to the OS thread pool; here it just records them
+    calls = []
+
+    def run_blocking(fn, *args, **kwargs):
+        calls.append(fn.__name__)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(insertoperations, "run_blocking", run_blocking)
+    monkeypatch.setattr(ingestjobs, "run_blocking", run_blocking)
+    job_id, _ = ingestjobs.create_ingest_job("alpha", upload, "hash-alpha")
+
+    assert ingestjobs.run_ingest_job(job_id)["status"] == "success"
+    n_chunks = -(-len(frame) // CHUNK_ROWS)
+    assert calls == ["count_csv_rows"] + ["read_next_chunk", "write_chunk"] * n_chunks + ["read_next_chunk"]
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score, roc_auc_score, roc_curve
+
+from metrics import StreamingMetrics, binary_metrics, classification_report_dict, streaming_metrics
+
+
+@pytest.fixture
+def labelled_scores():
+    rng = np.random.default_rng(11)
+    y = (rng.random(3000) < 0.2).astype(np.int64)
+    # Rounded scores give plenty of ties, the case a naive sort-and-count gets wrong
+    scores = np.round(np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1), 2)
+    return y, scores
+
+
+def test_exact_metrics_match_sklearn(labelled_scores):
+    y, scores = labelled_scores
+    metrics = binary_metrics(y, scores, include_roc=True)
+    predicted = (scores > 0.5).astype(int)
+
+    assert metrics["auc"] == pytest.approx(roc_auc_score(y, scores))
+    assert metrics["accuracy"] == pytest.approx(accuracy_score(y, predicted))
+    assert metrics["f1"] == pytest.approx(f1_score(y, predicted))
+    assert metrics["confusion_matrix"] == confusion_matrix(y, predicted).tolist()
+
+    fpr, tpr, _ = roc_curve(y, scores)
+    np.testing.assert_allclose(metrics["fpr"], fpr)
+    np.testing.assert_allclose(metrics["tpr"], tpr)
+
+
+def test_histogram_metrics_stay_close(labelled_scores):
+    y, scores = labelled_scores
+    exact = binary_metrics(y, scores)
+    approximate = binary_metrics(y, scores, approximate=True)
+
+    assert approximate["confusion_matrix"] == exact["confusion_matrix"]
+    assert approximate["auc"] == pytest.approx(exact["auc"], abs=1e-3)
+
+
+def test_chunked_scoring_equals_one_pass(labelled_scores):
+    y, scores = labelled_scores
+    whole = StreamingMetrics()
+    whole.update(y, scores)
+
+    # predict() is handed X chunk by chunk; here X is the scores themselves
+    chunked = streaming_metrics(lambda chunk: chunk, scores, y, chunk_rows=128)
+    assert chunked == whole.result()
+
+
+def test_single_class_and_empty_inputs():
+    metrics = binary_metrics(np.zeros(4, int), np.array([0.1, 0.2, 0.7, 0.9]))
+    assert metrics["auc"] == 0.5
+    assert metrics["confusion_matrix"] == [[2, 2], [0, 0]]
+
+    empty = binary_metrics(np.empty(0, int), np.empty(0))
+    assert (empty["accuracy"], empty["f1"], empty["auc"]) == (0.0, 0.0, 0.5)
+
+
+def test_classification_report_matches_sklearn(labelled_scores):
+    y, scores = labelled_scores
+    predicted = (scores > 0.5).astype(int)
+    report = classification_report_dict(confusion_matrix(y, predicted))
+    expected = classification_report(y, predicted, output_dict=True)
+
+    assert report["accuracy"] == pytest.approx(expected["accuracy"])
+    for key in ("0", "1", "macro avg", "weighted avg"):
+        assert report[key] == pytest.approx(expected[key])
@@ -0,0 +1,87 @@
+import pytest
+
+import progressrelay
+from progressrelay import ProgressRelay, project_room
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(progressrelay, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def relay(clock, sent):
+    # Not started: each test runs the delivery loop's steps itself
+    return ProgressRelay(lambda event, data, room: sent.append((event, data, room)), min_interval=1.0)
+
+
+def deliver(relay):
+    relay._drain()
+    relay._flush()
+
+
+def test_progress_is_coalesced_and_throttled(relay, sent, clock):
+    room = project_room("alpha")
+    for rows in (100, 200, 300):
+        relay.publish("ingest_progress", {"rows_done": rows}, room=room, key="job-1")
+    deliver(relay)
+    assert sent == [("ingest_progress", {"rows_done": 300}, room)]  # only the newest
+
+    relay.publish("ingest_progress", {"rows_done": 400}, room=room, key="job-1")
+    clock.now += 0.5
+    deliver(relay)
+    assert len(sent) == 1  # inside the interval: held back
+
+    clock.now += 0.6
+    deliver(relay)
+    assert sent[-1] == ("ingest_progress", {"rows_done": 400}, room)
+    assert relay.stats() == {"published": 4, "emitted": 2, "pending": 0, "queued": 0}
+
+
+def test_final_event_flushes_its_room_first(relay, sent, clock):
+    alpha, beta = project_room("alpha"), project_room("beta")
+    relay.publish("ingest_progress", {"rows_done": 100}, room=alpha, key="job-1")
+    relay.publish("ingest_progress", {"rows_done": 100}, room=beta, key="job-2")
+    deliver(relay)
+
+    relay.publish("ingest_progress", {"rows_done": 200}, room=alpha, key="job-1")
+    relay.publish("ingest_progress", {"rows_done": 200}, room=beta, key="job-2")
+    relay.publish("ingest_complete", {"rows": 200}, room=alpha)
+    relay._drain()
+
+    # alpha's held-back progress goes out before its completion; beta's stays throttled
+    assert [(event, room) for event, _, room in sent[2:]] == [("ingest_progress", alpha), ("ingest_complete", alpha)]
+    assert relay.stats()["pending"] == 1
+
+
+def test_new_job_after_completion_is_not_throttled(relay, sent):
+    room = project_room("alpha")
+    relay.publish("training_progress", {"epoch": 1}, room=room, key="run-1")
+    relay.publish("training_complete", {}, room=room)
+    relay.publish("training_progress", {"epoch": 1}, room=room, key="run-1")
+    deliver(relay)
+
+    assert [event for event, _, _ in sent] == ["training_progress", "training_complete", "training_progress"]
+
+
+def test_start_runs_one_delivery_loop(clock):
+    started = []
+    relay = ProgressRelay(lambda *args: None, start_background_task=started.append)
+    relay.start()
+    relay.start()
+    assert started == [relay._run]
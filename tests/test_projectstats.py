@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import db
+from benchmarks.synthetic import make_creditcard_frame, write_creditcard_csv
+from createoperations import FEATURE_COLUMNS
+from deleteoperations import delete_project_data
+from insertoperations import insert_csv_to_transactions_table
+from projectstats import get_project_stats, scaler_from_stats
+
+
+def ingest(tmp_path, project_name, n_rows, seed=0, chunksize=64):
+    path = write_creditcard_csv(str(tmp_path / f"{project_name}-{seed}.csv"), n_rows, fraud_ratio=0.1, seed=seed)
+    assert insert_csv_to_transactions_table(path, project_name, chunksize=chunksize)["status"] == "success"
+    # Values as stored (float32), which is what the aggregates are built from
+    frame = make_creditcard_frame(n_rows, fraud_ratio=0.1, seed=seed)
+    return frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32).astype(np.float64), frame["Class"].to_numpy()
+
+
+def test_aggregates_match_the_data(tmp_path):
+    X, y = ingest(tmp_path, "alpha", 300)
+    stats = get_project_stats("alpha")
+
+    assert (stats["rows"], stats["labelled_rows"], stats["fraud_count"]) == (300, 300, int(y.sum()))
+    amount = stats["columns"]["Amount"]
+    column = FEATURE_COLUMNS.index("Amount")
+    assert amount["count"] == 300
+    assert amount["mean"] == pytest.approx(X[:, column].mean())
+    assert amount["variance"] == pytest.approx(X[:, column].var())
+
+    scaler = scaler_from_stats(stats)
+    np.testing.assert_allclose(scaler.mean_, X.mean(axis=0), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(scaler.var_, X.var(axis=0), rtol=1e-9)
+
+
+def test_cache_follows_every_ingest(tmp_path):
+    ingest(tmp_path, "alpha", 100)
+    first = get_project_stats("alpha")
+    assert get_project_stats("alpha") is first  # unchanged version: served from the cache
+
+    ingest(tmp_path, "alpha", 50, seed=1)
+    second = get_project_stats("alpha")
+    assert second["rows"] == 150
+    assert second["version"] > first["version"]
+
+
+def test_delete_then_reingest_never_serves_old_numbers(tmp_path):
+    # One chunk per ingest: before and after the delete the project sees a single update
+    ingest(tmp_path, "alpha", 100, chunksize=1000)
+    before = get_project_stats("alpha")
+    assert before["rows"] == 100
+
+    delete_project_data("alpha")
+    assert get_project_stats("alpha") is None
+
+    ingest(tmp_path, "alpha", 300, seed=2, chunksize=1000)
+    after = get_project_stats("alpha")
+    assert after["rows"] == 300
+    assert after["version"] > before["version"]
+
+
+def test_missing_stats_are_rebuilt_from_transactions(tmp_path):
+    ingest(tmp_path, "alpha", 120)
+    expected = get_project_stats("alpha")
+    db.execute_write("DELETE FROM project_stats WHERE project_name = ?", ("alpha",))
+
+    rebuilt = get_project_stats("alpha")
+    assert rebuilt["rows"] == 120
+    assert rebuilt["columns"]["V1"]["mean"] == pytest.approx(expected["columns"]["V1"]["mean"])
+    assert get_project_stats("unknown") is None
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+import pytest
+
+import db
+from benchmarks.synthetic import make_creditcard_frame
+from insertoperations import insert_csv_to_transactions_table
+from readoperations import fetch_page, parse_read_args, stream_csv, stream_ndjson
+
+
+@pytest.fixture
+def frame(tmp_path):
+    frame = make_creditcard_frame(25, fraud_ratio=0.3, seed=5)
+    for name, part in (("alpha", frame.iloc[:15]), ("beta", frame.iloc[15:])):
+        path = str(tmp_path / f"{name}.csv")
+        part.to_csv(path, index=False)
+        assert insert_csv_to_transactions_table(path, name)["status"] == "success"
+    return frame
+
+
+def read_all_pages(table, limit, **args):
+    rows, cursor = [], None
+    while True:
+        page, cursor = fetch_page(table, cursor=cursor, limit=limit, **args)
+        rows.extend(page)
+        if cursor is None:
+            return rows
+
+
+def test_pages_cover_every_row_once(frame):
+    args = parse_read_args("transactions", {"project_name": "alpha", "columns": "Amount,Class"})
+    assert args["columns"] == ["id", "Amount", "Class"]  # the cursor key is always returned
+
+    rows = read_all_pages("transactions", 4, columns=args["columns"], filters=args["filters"])
+    assert [row["id"] for row in rows] == sorted({row["id"] for row in rows})
+    assert len(rows) == 15
+    assert [row["Amount"] for row in rows] == pytest.approx(frame["Amount"].iloc[:15].tolist())
+    assert [row["Class"] for row in rows] == frame["Class"].iloc[:15].tolist()
+
+
+def test_filters_and_last_page(frame):
+    args = parse_read_args("transactions", {"class": "1", "columns": "project_name"})
+    rows, cursor = fetch_page("transactions", **args)
+    assert cursor is None
+    assert len(rows) == int(frame["Class"].sum())
+    assert set(rows[0]) == {"id", "project_name"}
+
+    page, cursor = fetch_page("transactions", ["id"], {}, limit=25)
+    assert len(page) == 25 and cursor is None  # exactly one full page: no empty next page
+
+
+def test_descending_table_pages_newest_first():
+    for name in ("a", "b", "c"):
+        db.execute_write("INSERT INTO project_summary (project_name) VALUES (?)", (name,))
+
+    first, cursor = fetch_page("project_summary", ["id", "project_name"], {}, limit=2)
+    rest, last = fetch_page("project_summary", ["id", "project_name"], {}, cursor=cursor, limit=2)
+    assert [row["project_name"] for row in first + rest] == ["c", "b", "a"]
+    assert last is None
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError, match="Unknown columns"):
+        parse_read_args("users", {"columns": "password"})
+    with pytest.raises(ValueError):
+        parse_read_args("users", {"cursor": "abc"})
+
+
+def test_streams_match_the_pages(frame):
+    columns = ["id", "project_name", "V3", "Class"]
+    expected, _ = fetch_page("transactions", columns, {}, limit=100)
+
+    ndjson = [json.loads(line) for line in "".join(stream_ndjson("transactions", columns, {})).splitlines()]
+    assert ndjson == expected
+
+    reader = csv.reader(io.StringIO("".join(stream_csv("transactions", columns, {}, cursor=expected[9]["id"]))))
+    assert next(reader) == columns
+    assert [int(row[0]) for row in reader] == [row["id"] for row in expected[10:]]
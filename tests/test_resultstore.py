@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import db
+import resultstore
+from resultstore import MemoryResultBackend, SQLiteResultBackend, create_result_backend
+
+
+class Clock:
+    # Distinct, controllable created_at values: runs saved back to back never tie
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resultstore, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=[MemoryResultBackend, SQLiteResultBackend])
+def backend(request, clock):
+    return request.param(ttl_sec=100, history_per_project=3)
+
+
+def test_latest_run_and_lookup_by_id(backend):
+    backend.save("alpha", "run-1", "completed", {"accuracy": 0.9})
+    backend.save("alpha", "run-2", "completed", {"accuracy": 0.8})
+    backend.save("beta", "run-3", "error", {"message": "boom"})
+
+    assert backend.get("alpha")["run_id"] == "run-2"
+    assert backend.get("alpha", "run-1")["result"] == {"accuracy": 0.9}
+    assert backend.get("alpha", "run-3") is None  # another project's run
+    assert backend.get("missing") is None
+
+
+def test_saving_a_run_again_replaces_it(backend):
+    backend.save("alpha", "run-1", "running", {"baseline": {"auc": 0.7}})
+    assert backend.get("alpha", "run-1")["result"] == {"baseline": {"auc": 0.7}}
+
+    backend.save("alpha", "run-1", "completed", {"baseline": {"auc": 0.7}, "summary": {"auc": 0.8}})
+    record = backend.get("alpha", "run-1")
+    assert record["status"] == "completed"
+    assert record["result"]["summary"] == {"auc": 0.8}  # not the earlier decoded payload
+    assert [run["run_id"] for run in backend.history("alpha")] == ["run-1"]
+
+
+def test_history_is_capped_newest_first(backend):
+    for i in range(5):
+        backend.save("alpha", f"run-{i}", "completed", {"i": i})
+
+    history = backend.history("alpha")
+    assert [run["run_id"] for run in history] == ["run-4", "run-3", "run-2"]
+    assert "result" not in history[0]
+    assert [run["run_id"] for run in backend.history("alpha", limit=1)] == ["run-4"]
+
+
+def test_expired_runs_are_not_served(backend, clock):
+    backend.save("alpha", "run-1", "completed", {})
+    clock.now += 101
+
+    assert backend.get("alpha") is None
+    assert backend.history("alpha") == []
+
+
+def test_sqlite_payloads_are_compressed(clock):
+    payload = {"history": [{"epoch": i, "loss": 0.5} for i in range(200)]}
+    SQLiteResultBackend().save("alpha", "run-1", "completed", payload)
+
+    stored = db.fetch_one("SELECT payload FROM task_runs WHERE run_id = ?", ("run-1",), as_dict=False)[0]
+    assert resultstore.decode_payload(stored) == payload
+    assert len(stored) < len(json.dumps(payload)) / 5
+
+
+def test_unknown_backend_name():
+    assert isinstance(create_result_backend("memory"), MemoryResultBackend)
+    with pytest.raises(ValueError, match="Unknown result backend"):
+        create_result_backend("redis")
@@ -0,0 +1,158 @@
+import time
+
+import pytest
+
+import db
+from scheduler import STALE_AFTER_SEC, TrainingScheduler
+
+
+class FakeProcess:
+    # Stands in for the trainworker subprocess: exited with returncode, or still running (None)
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+        self.terminated = False
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.terminated = True
+        self.returncode = -15
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def scheduler(events):
+    # No background loop: the tests drive claiming and reaping themselves
+    return TrainingScheduler(lambda job, event, data: events.append((job.job_id, event, data)),
+                             max_workers=1, start_background_task=lambda *args: None)
+
+
+def job_row(job_id):
+    return db.fetch_one("SELECT status, owner, message FROM training_jobs WHERE job_id = ?", (job_id,))
+
+
+def claim(scheduler, process):
+    job = scheduler._claim_next()
+    job.process = process
+    with scheduler._lock:
+        scheduler._running[job.job_id] = job
+    return job
+
+
+def test_submit_queues_one_job_per_project(scheduler):
+    job, created = scheduler.submit("alpha", warm_start=True)
+    again, created_again = scheduler.submit("alpha")
+
+    assert created and not created_again
+    assert again.job_id == job.job_id
+    assert job_row(job.job_id)["status"] == "queued"
+    assert scheduler.get_job("alpha").options == {"warm_start": True}
+    assert scheduler.stats()["queued"] == 1
+
+
+def test_claim_order_and_worker_cap(scheduler):
+    low, _ = scheduler.submit("low", priority=5)
+    high, _ = scheduler.submit("high", priority=0)
+
+    claimed = scheduler._claim_next()
+    assert claimed.job_id == high.job_id
+    assert job_row(high.job_id)["status"] == "running"
+    assert job_row(high.job_id)["owner"] == scheduler.owner
+    # max_workers=1 and one job running: the next stays queued
+    assert scheduler._claim_next() is None
+    assert job_row(low.job_id)["status"] == "queued"
+
+
+def test_completed_job_is_done_after_process_and_stream_end(scheduler, events):
+    scheduler.submit("alpha")
+    job = claim(scheduler, FakeProcess(returncode=None))
+    job.finished_event = ("training_complete", {"results": {"summary": {}}})
+
+    scheduler._reap()  # still running
+    assert job_row(job.job_id)["status"] == "running"
+
+    job.process.returncode, job.stream_done = 0, True
+    scheduler._reap()
+    assert job_row(job.job_id)["status"] == "done"
+    assert events == [(job.job_id, "training_complete", {"results": {"summary": {}}})]
+    assert scheduler.stats()["running_here"] == 0
+
+
+def test_worker_exit_without_outcome_is_an_error(scheduler, events):
+    scheduler.submit("alpha")
+    job = claim(scheduler, FakeProcess(returncode=1))
+    job.stream_done = True
+
+    scheduler._reap()
+    row = job_row(job.job_id)
+    assert row["status"] == "error"
+    assert row["message"] == "Training worker exited with code 1"
+    assert events[-1][1] == "training_error"
+
+
+def test_cancel_queued_and_running(scheduler, events):
+    queued, _ = scheduler.submit("queued")
+    assert scheduler.cancel("queued")
+    assert job_row(queued.job_id)["status"] == "cancelled"
+    assert not scheduler.cancel("queued")
+
+    scheduler.submit("running")
+    job = claim(scheduler, FakeProcess())
+    assert scheduler.cancel("running")
+    assert job.process.terminated
+    assert job_row(job.job_id)["status"] == "cancelled"
+    assert [event for _, event, _ in events] == ["training_cancelled", "training_cancelled"]
+
+    # A cancelled project accepts a new submission
+    _, created = scheduler.submit("queued")
+    assert created
+
+
+def test_orphaned_running_job_is_failed(scheduler, events):
+    job, _ = scheduler.submit("alpha")
+    stale = time.time() - STALE_AFTER_SEC - 1
+    db.execute_write(
+        "UPDATE training_jobs SET status = 'running', owner = 'gone:1', started_at = ?, heartbeat_at = ? "
+        "WHERE job_id = ?", (stale, stale, job.job_id)
+    )
+
+    scheduler._sync_running(time.time())
+    assert job_row(job.job_id)["status"] == "error"
+    assert events == [(job.job_id, "training_error", {"message": "Training worker lost"})]
+
+
+def test_cancel_from_another_worker_stops_the_process(scheduler):
+    scheduler.submit("alpha")
+    job = claim(scheduler, FakeProcess())
+    db.execute_write("UPDATE training_jobs SET status = 'cancelled' WHERE job_id = ?", (job.job_id,))
+
+    scheduler._sync_running(time.time())
+    assert job.status == "cancelled"
+    assert job.process.terminated
+
+
+def test_empty_queue_poll_takes_no_write_lock(scheduler, monkeypatch):
+    def no_writes():
+        raise AssertionError("BEGIN IMMEDIATE on an empty queue")
+
+    monkeypatch.setattr(db, "transaction", no_writes)
+    assert scheduler._claim_next() is None
+
+
+def test_worker_starts_outside_the_repo_directory(scheduler, database, monkeypatch):
+    # conftest runs every test from a temporary directory; the worker must still import
+    monkeypatch.setenv("DATABASE_PATH", str(database))
+    scheduler.submit("no-such-project")
+    job = scheduler._claim_next()
+    scheduler._launch(job)
+    scheduler._pump_events(job)
+    job.process.wait(120)
+
+    event, data = job.finished_event
+    assert event == "training_error"
+    assert "No module named" not in data["message"]
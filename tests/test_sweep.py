@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import db
+from benchmarks.synthetic import write_creditcard_csv
+from hyperparameters import SWEEP_MAX_TRIALS, expand_trials, validate_sweep_options
+from insertoperations import insert_csv_to_transactions_table
+from sweep import PRUNE_MIN_TRIALS, PRUNE_WARMUP_EPOCHS, _should_prune, run_sweep
+
+
+def test_grid_and_random_search():
+    grid = expand_trials({"stepsize": [0.05, 0.1], "n_layers": [1, 2, 3]})
+    assert len(grid) == 6
+    assert {(trial["stepsize"], trial["n_layers"]) for trial in grid} == {
+        (s, n) for s in (0.05, 0.1) for n in (1, 2, 3)
+    }
+    assert all(trial["epochs"] == 10 for trial in grid)  # defaults fill the rest
+
+    picked = expand_trials({"stepsize": [0.01, 0.05, 0.1, 0.5], "n_layers": [1, 2]}, "random", n_trials=3)
+    assert len(picked) == 3
+    assert picked == expand_trials({"stepsize": [0.01, 0.05, 0.1, 0.5], "n_layers": [1, 2]}, "random", n_trials=3)
+    assert expand_trials({"epochs": 3}) == expand_trials({"epochs": [3]})  # a single value needs no list
+
+
+def test_bad_spaces():
+    with pytest.raises(ValueError, match="Unknown hyperparameters"):
+        expand_trials({"learning_rate": [0.1]})
+    with pytest.raises(ValueError, match="at least one value"):
+        expand_trials({"stepsize": []})
+    with pytest.raises(ValueError, match="use search=random"):
+        expand_trials({"stepsize": list(range(1, SWEEP_MAX_TRIALS + 2))})
+
+
+@pytest.mark.parametrize("options, message", [
+    ({"space": ["stepsize"]}, "space must be an object"),
+    ({"space": {"stepsize": [[0.1]]}}, "Values for stepsize"),
+    ({"space": {"ansatz": None}}, "Values for ansatz"),
+    ({"search": "bayes"}, "Unknown search"),
+    ({"n_trials": "5"}, "n_trials must be an integer"),
+    ({"n_trials": True}, "n_trials must be an integer"),
+    ({"n_trials": 0}, "n_trials must be an integer"),
+    ({"sample_budget": 2.5}, "sample_budget must be an integer"),
+    ({"sample_budget": -1}, "sample_budget must be an integer"),
+    ({"preprocess_mode": "fast"}, "Unknown preprocessing mode"),
+])
+def test_sweep_options_are_type_checked(options, message):
+    with pytest.raises(ValueError, match=message):
+        validate_sweep_options(**{"space": {}, **options})
+
+
+def test_valid_sweep_options():
+    validate_sweep_options({"stepsize": [0.05, 0.1], "reupload": True}, "random", n_trials=4,
+                           sample_budget=0, preprocess_mode="streaming")
+    validate_sweep_options({})
+
+
+def test_median_pruning():
+    scores = [0.6, 0.7, 0.8, 0.9][:PRUNE_MIN_TRIALS]
+    assert _should_prune(PRUNE_WARMUP_EPOCHS, 0.5, scores)
+    assert not _should_prune(PRUNE_WARMUP_EPOCHS, 0.95, scores)
+    assert not _should_prune(PRUNE_WARMUP_EPOCHS - 1, 0.5, scores)  # still warming up
+    assert not _should_prune(PRUNE_WARMUP_EPOCHS, 0.5, scores[:PRUNE_MIN_TRIALS - 1])  # too few to compare
+
+
+def test_sweep_runs_trials_and_saves_the_best_config(tmp_path):
+    path = write_creditcard_csv(str(tmp_path / "data.csv"), 300, fraud_ratio=0.2, seed=6)
+    insert_csv_to_transactions_table(path, "alpha")
+    events = []
+
+    results = run_sweep("alpha", space={"epochs": [1], "stepsize": [0.05, 0.2]}, workers=2,
+                        progress_callback=lambda event, data: events.append((event, data)))
+    summary = results["summary"]
+
+    assert (summary["trials"], summary["completed"], summary["failed"]) == (2, 2, 0)
+    assert [trial["trial_id"] for trial in results["trials"]] == [0, 1]
+    assert summary["best_config"] in [trial["config"] for trial in results["trials"]]
+    assert events[-1][1]["trials_done"] == 2
+
+    saved = db.fetch_one("SELECT best_config, best_score FROM project_summary WHERE project_name = ?", ("alpha",))
+    assert json.loads(saved["best_config"]) == summary["best_config"]
+    assert saved["best_score"] == summary["best_trial"]["val_auc"]
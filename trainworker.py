@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+
+# Entry point for one training job in its own process:
+#   python -m trainworker <project_name> [--kind training|sweep] [--options JSON]
+# Every line written to stdout is a JSON event [event, data]; regular prints go to stderr
+# so they end up in the server log instead of the event stream.
+#
+# A training job first fits the classical baseline (classicalmodel) unless CLASSICAL_BASELINE
+# is off or the job says baseline=false. A failed baseline is reported and the circuit still trains.
+# The baseline's results also travel in the job's outcome under "baseline", so the run record
+# keeps both models.
+CLASSICAL_BASELINE = os.getenv("CLASSICAL_BASELINE", "true").lower() in ("1", "true", "yes")
+BASELINE_OPTIONS = ("preprocess_mode", "sample_budget", "hyperparameters")
+
+
+def _to_json(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("project_name")
+    parser.add_argument("--kind", choices=("training", "sweep"), default="training")
+    parser.add_argument("--options", default="{}")
+    args = parser.parse_args(argv)
+
+    events = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    sys.stdout = sys.stderr
+
+    def emit(event, data):
+        events.write(json.dumps([event, data], default=_to_json) + "\n")
+
+    # lightning.qubit sizes its OpenMP pool from OMP_NUM_THREADS when the library loads, so
+    # the override has to be in the environment before PennyLane is imported (sweep trial
+    # processes inherit it)
+    if os.getenv("LIGHTNING_NUM_THREADS"):
+        os.environ["OMP_NUM_THREADS"] = os.environ["LIGHTNING_NUM_THREADS"]
+
+    from telemetry import profile_call, record_peak_rss, registry
+
+    options = json.loads(args.options)
+    baseline = None
+    try:
+        if args.kind == "sweep":
+            from sweep import run_sweep
+
+            results = run_sweep(args.project_name, progress_callback=emit, **options)
+        else:
+            from qmlmodel import run_qml_model
+
+            profile = options.pop("profile", False)
+            if options.pop("baseline", CLASSICAL_BASELINE):
+                # Seconds instead of minutes: its results go out before the circuit starts
+                from classicalmodel import run_classical_model
+
+                try:
+                    baseline = run_classical_model(
+                        args.project_name, include_confusion_matrix=True,
+                        **{name: options[name] for name in BASELINE_OPTIONS if name in options}
+                    )
+                    emit("baseline_complete", {"results": baseline})
+                except Exception as e:
+                    emit("baseline_error", {"message": str(e)})
+            train_args = (args.project_name,)
+            train_kwargs = {"include_confusion_matrix": True, "progress_callback": emit, **options}
+            if profile:
+                from featurestore import project_store_dir
+
+                # Same slug and digest as the feature store and registry directories
+                profile_name = os.path.basename(project_store_dir(args.project_name))
+                results, report = profile_call(profile_name, run_qml_model, *train_args, **train_kwargs)
+                results["profile"] = report
+            else:
+                results = run_qml_model(*train_args, **train_kwargs)
+            if baseline is not None:
+                results["baseline"] = baseline
+        outcome = (f"{args.kind}_complete", {"results": results})
+    except Exception as e:
+        outcome = (f"{args.kind}_error", {"message": str(e), **({"baseline": baseline} if baseline else {})})
+    # Phase timings and memory high-water marks go back to the web process before the outcome
+    record_peak_rss(registry, process="trainworker", include_children=False)
+    emit("telemetry", registry.snapshot())
+    emit(*outcome)
+    return 0 if outcome[0] == f"{args.kind}_complete" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
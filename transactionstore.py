@@ -0,0 +1,73 @@
+import numpy as np
+
+import db
+from createoperations import FEATURE_COLUMNS
+
+# Packed row layout of transaction_rows: the 30 feature columns as one little-endian
+# float32 vector (120 bytes) in `features`, Class as its own INTEGER column (it is filtered
+# on), and the project as an integer id into `projects`. The column-wise `transactions`
+# view over it keeps the old schema readable; bulk reads select its raw `features` column
+# and decode a whole batch with one np.frombuffer call.
+FEATURE_DTYPE = np.dtype("<f4")
+ROW_BYTES = FEATURE_DTYPE.itemsize * len(FEATURE_COLUMNS)
+
+_project_ids = {}
+
+
+def pack_features(features):
+    # features: (n_features, n_rows) float64 as produced by insertoperations.chunk_to_columns.
+    # Returns the float32 block (n_rows, n_features) and one blob per row.
+    block = np.ascontiguousarray(features.T, dtype=FEATURE_DTYPE)
+    return block, [row.tobytes() for row in block]
+
+
+def unpack_features(blobs):
+    # Blobs of one fetch batch -> (n_rows, n_features) float64
+    if not blobs:
+        return np.empty((0, len(FEATURE_COLUMNS)))
+    return np.frombuffer(b"".join(blobs), dtype=FEATURE_DTYPE).reshape(-1, len(FEATURE_COLUMNS)).astype(np.float64)
+
+
+def display_values(values):
+    # float32 holds ~7 significant digits: round to them so a stored 149.62 is returned as
+    # 149.62 and not 149.6199951171875 (same rule as db.blob_float32 in the view)
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** np.where(np.isfinite(magnitude), db.FLOAT32_DIGITS - 1 - magnitude, 0)
+        return np.round(values * scale) / scale
+
+
+def project_id(conn, project_name, create=False):
+    # Ids are never reused or deleted, so they are cached for the life of the process
+    cached = _project_ids.get(project_name)
+    if cached is not None:
+        return cached
+    if create:
+        conn.execute("INSERT OR IGNORE INTO projects (name) VALUES (?)", (project_name,))
+    row = conn.execute("SELECT id FROM projects WHERE name = ?", (project_name,)).fetchone()
+    if row is None:
+        return None
+    _project_ids[project_name] = row[0]
+    return row[0]
+
+
+def iter_project_blocks(conn, project_name, fetch_rows):
+    # (X float64 (n, n_features), Class float64 with NaN for NULL) per fetch batch, in id order
+    cursor = conn.execute(
+        "SELECT features, Class FROM transactions WHERE project_name = ? ORDER BY id", (project_name,)
+    )
+    while True:
+        rows = cursor.fetchmany(fetch_rows)
+        if not rows:
+            return
+        blobs, labels = zip(*rows)
+        yield unpack_features(list(blobs)), np.array(labels, dtype=np.float64)
+
+
+def load_project_rows(project_name, fetch_rows=50000):
+    with db.read_connection() as conn:
+        blocks = list(iter_project_blocks(conn, project_name, fetch_rows))
+    if not blocks:
+        return None, None
+    return np.concatenate([X for X, _ in blocks]), np.concatenate([y for _, y in blocks])